@@ -0,0 +1,623 @@
+"""Событийный бэктест: воспроизведение свечей через тот же набор методов, что у Trade.
+
+SimulatedTrade исполняет ордера локально по историческим свечам (KlineFrame), поэтому стратегия,
+написанная для Trade, проверяется на истории без обращения к API. sweep прогоняет сетку
+параметров стратегии в пуле процессов.
+"""
+
+import heapq
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from dzg import SymbolRegistry, interval_ms, to_ms
+from klines import KlineFrame
+
+
+def _error(message: str) -> dict:
+    return {
+        "status_code": None,
+        "error": message,
+        "response_text": None
+    }
+
+
+def _ok(data) -> dict:
+    return {"status_code": 200, "data": data}
+
+
+def _public(record: dict) -> dict:
+    """Запись без служебных полей симулятора (ключи с "_")."""
+    return {key: value for key, value in record.items() if not key.startswith("_")}
+
+
+def stats(equity: np.ndarray, history: list) -> dict:
+    """Итоги прогона: доходность, максимальная просадка, число закрытых позиций, доля прибыльных, комиссии."""
+    if not len(equity):
+        return {"final_equity": None, "total_return": 0.0, "max_drawdown": 0.0, "trades": 0, "win_rate": None, "fees": 0.0}
+    peak = np.maximum.accumulate(equity)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = np.where(peak > 0, 1.0 - equity / peak, 0.0)
+    profits = [position["rpl"] - position["fee"] for position in history]
+    return {
+        "final_equity": float(equity[-1]),
+        "total_return": float(equity[-1] / equity[0] - 1.0) if equity[0] else 0.0,
+        "max_drawdown": float(drawdown.max()),
+        "trades": len(history),
+        "win_rate": sum(profit > 0 for profit in profits) / len(profits) if profits else None,
+        "fees": float(sum(position["fee"] for position in history)),
+    }
+
+
+class SimulatedTrade:
+    """Симулятор счёта с методами Trade (CreateOrder, EditOrder, CancelOrder, LeverageOrdersEdit,
+    LeverageTradeEdit, TradingPositionClose и чтение счёта/ордеров/позиций/свечей).
+
+    Ответы имеют ту же форму, что у Trade: {"status_code": 200, "data": ...} или словарь ошибки.
+    Каждое исполнение открывает отдельную позицию с плечом (leverage по умолчанию - self.leverage),
+    маржа = объём * цена / плечо, комиссия fee - доля объёма сделки на открытии и на закрытии.
+
+    Модель исполнения (без заглядывания вперёд): стратегия вызывается после закрытия свечи;
+    MARKET и TradingPositionClose исполняются по цене закрытия этой свечи со slippage;
+    LIMIT и STOP - начиная со следующей свечи, когда low/high достигают цены (при гэпе - по open);
+    stopLoss и takeProfit позиции проверяются со следующей после открытия свечи, если в одной свече
+    достигнуты оба - срабатывает stopLoss. Гарантированный и скользящий стоп, distance-параметры
+    и ликвидация не моделируются.
+    """
+
+    def __init__(
+        self,
+        frames: dict,
+        balance: float = 10_000.0,
+        currency: str = "USD",
+        fee: float|dict|None = None,
+        slippage: float = 0.0,
+        leverage: int = 1,
+        exchange_info: None|dict = None,
+        ):
+        """frames - {symbol: KlineFrame} одного интервала; времена разных символов объединяются в общую шкалу;
+        balance начальный баланс в currency;
+        fee комиссия (доля, 0.001 = 0.1%) - число, словарь по символам или None (из exchange_info, иначе 0);
+        slippage проскальзывание (доля цены) против нас для MARKET, STOP и stopLoss;
+        exchange_info ответ ExchangeInfo: проверка ордеров по SymbolRules и поиск символов по name;
+        """
+        self.frames = frames
+        self.initial_balance = float(balance)
+        self.currency = currency
+        self.fee = fee
+        self.slippage = slippage
+        self.leverage = leverage
+        self.symbols = SymbolRegistry(ttl=None)
+        if exchange_info:
+            self.symbols.load(exchange_info)
+        self.times = np.unique(np.concatenate([frame.open_time for frame in frames.values()]))
+        self.bar_ms = int(np.diff(self.times).min()) if len(self.times) > 1 else 60_000
+        # для каждого символа: индекс последней свечи на шаге шкалы и шаг шкалы каждой свечи
+        self._rows = {symbol: np.searchsorted(frame.open_time, self.times, side="right") - 1 for symbol, frame in frames.items()}
+        self._steps = {symbol: np.searchsorted(self.times, frame.open_time) for symbol, frame in frames.items()}
+        self.reset()
+
+    def reset(self):
+        """Возврат к начальному состоянию счёта перед новым прогоном."""
+        self.step = -1
+        self.cash = self.initial_balance
+        self._orders: dict = {}
+        self._positions: dict = {}
+        self._history: list = []
+        self._fills: list = []
+        self._ledger: list = []  # (шаг, изменение cash): комиссии и реализованный результат
+        self._ids = itertools.count(1)
+        self._requests = itertools.count(1)
+        self._sequence = itertools.count()  # порядок событий одного шага в _advance
+
+    @property
+    def time(self) -> int:
+        """Текущее время симуляции в мс - закрытие текущей свечи."""
+        return int(self.times[self.step]) + self.bar_ms
+
+    def _row(self, symbol: str, step: None|int = None) -> int:
+        step = self.step if step is None else step
+        return int(self._rows[symbol][step]) if step >= 0 else -1
+
+    def price(self, symbol: str) -> None|float:
+        """Последняя цена закрытия символа на текущем шаге."""
+        row = self._row(symbol)
+        return float(self.frames[symbol].close[row]) if row >= 0 else None
+
+    def frame(self, symbol: str) -> KlineFrame:
+        """Свечи символа до текущей включительно (срез без копирования)."""
+        return self.frames[symbol][:self._row(symbol) + 1]
+
+    def _fee_rate(self, symbol: str) -> float:
+        if isinstance(self.fee, dict):
+            return self.fee.get(symbol, 0.0)
+        if self.fee is not None:
+            return self.fee
+        rules = self.symbols.rules(symbol) if self.symbols.loaded else None
+        return rules.fee if rules is not None else 0.0
+
+    def _slipped(self, price: float, buy: bool) -> float:
+        return price * (1 + self.slippage) if buy else price * (1 - self.slippage)
+
+    def _equity_now(self) -> tuple:
+        """(эквити, занятая маржа) по текущим ценам закрытия."""
+        upl = margin = 0.0
+        for position in self._positions.values():
+            upl += position["openQuantity"] * (self.price(position["symbol"]) - position["openPrice"])
+            margin += position["margin"]
+        return self.cash + upl, margin
+
+    def _free(self) -> float:
+        equity, margin = self._equity_now()
+        return equity - margin
+
+    def GetSymbol(self, name: str):
+        """Код символа из frames по коду или по name из exchange_info; ошибка - как у Trade.GetSymbol."""
+        code = name if name in self.frames else self.symbols.symbol(name) if self.symbols.loaded else None
+        if code not in self.frames:
+            return {"error": f"unknown symbol {name!r}"}
+        return code
+
+    def _resolve(self, symbol: str) -> str|dict:
+        code = self.GetSymbol(symbol)
+        return _error(code["error"]) if isinstance(code, dict) else code
+
+    def _check(self, symbol: str, type_: None|str, quantity, price, leverage) -> tuple:
+        """SymbolRules.check, если известен exchange_info; возвращает (quantity, price, ошибка или None)."""
+        rules = self.symbols.rules(symbol) if self.symbols.loaded else None
+        if rules is None:
+            return quantity, price, None
+        try:
+            quantity, price = rules.check(type_, quantity, price, leverage)
+        except ValueError as ex:
+            return quantity, price, _error(f"Order rejected: {ex}")
+        return quantity, price, None
+
+    # --- исполнение ---
+
+    def _open(self, order: dict, price: float, at: int, row: int) -> None|dict:
+        """Открытие позиции по исполненному ордеру; None, если не хватает свободной маржи."""
+        quantity = order["origQty"]
+        rate = self._fee_rate(order["symbol"])
+        fee = quantity * price * rate
+        margin = quantity * price / order["_leverage"]
+        if margin + fee > self._free():
+            order["status"] = "REJECTED"
+            return None
+        self.cash -= fee
+        self._ledger.append((self.step, -fee))
+        position = {
+            "id": str(next(self._ids)),
+            "symbol": order["symbol"],
+            "orderId": order["orderId"],
+            "accountId": None,
+            "state": "ACTIVE",
+            "currency": self.currency,
+            "openQuantity": quantity if order["side"] == "BUY" else -quantity,
+            "openPrice": price,
+            "stopLoss": order.get("stopLoss"),
+            "takeProfit": order.get("takeProfit"),
+            "leverage": order["_leverage"],
+            "margin": margin,
+            "fee": fee,
+            "rpl": 0.0,
+            "createdTimestamp": order["transactTime"],
+            "openTimestamp": at,
+            "_step": self.step,
+            "_row": row + 1,  # stopLoss и takeProfit - со следующей свечи
+        }
+        self._positions[position["id"]] = position
+        order.update(status="FILLED", executedQty=quantity, price=price)
+        self._fill(order["symbol"], order["orderId"], order["side"] == "BUY", quantity, price, fee, at, order["type"] == "LIMIT")
+        return position
+
+    def _close(self, position: dict, price: float, at: int):
+        quantity = position["openQuantity"]
+        fee = abs(quantity) * price * self._fee_rate(position["symbol"])
+        pnl = quantity * (price - position["openPrice"])
+        self.cash += pnl - fee
+        self._ledger.append((self.step, pnl - fee))
+        del self._positions[position["id"]]
+        position.update(
+            state="CLOSED", closeQuantity=quantity, closePrice=price, closeTimestamp=at,
+            rpl=pnl, fee=position["fee"] + fee, _close_step=self.step,
+        )
+        self._history.append(position)
+        self._fill(position["symbol"], position["orderId"], quantity < 0, abs(quantity), price, fee, at, False)
+
+    def _fill(self, symbol: str, order_id: str, buyer: bool, quantity: float, price: float, fee: float, at: int, maker: bool):
+        self._fills.append({
+            "symbol": symbol, "id": str(len(self._fills) + 1), "orderId": order_id, "price": price, "qty": quantity,
+            "quoteQty": quantity * price, "commission": fee, "commissionAsset": self.currency, "time": at,
+            "buyer": buyer, "maker": maker,
+        })
+
+    def _hit(self, symbol: str, start: int, stop: int, level: float, below: bool) -> None|int:
+        """Первая свеча в [start, stop), где low <= level (below) или high >= level."""
+        series = self.frames[symbol].low if below else self.frames[symbol].high
+        if stop - start <= 16:
+            for row in range(start, stop):
+                if series[row] <= level if below else series[row] >= level:
+                    return row
+            return None
+        for chunk in range(start, stop, 4096):
+            window = series[chunk:min(stop, chunk + 4096)]
+            mask = window <= level if below else window >= level
+            index = int(mask.argmax())
+            if mask[index]:
+                return chunk + index
+        return None
+
+    def _schedule(self, events: list, item: dict, start: int, stop: int):
+        """Ближайшее срабатывание ордера или stopLoss/takeProfit позиции в свечах [start, stop)."""
+        symbol = item["symbol"]
+        start = max(start, item["_row"])
+        if "id" not in item:  # ордер, иначе позиция
+            below = (item["type"] == "LIMIT") == (item["side"] == "BUY")
+            triggers = [(item["price"], below, item["type"] == "STOP", "fill")]
+        else:
+            long = item["openQuantity"] > 0
+            triggers = [
+                (item["stopLoss"], long, True, "stopLoss"),
+                (item["takeProfit"], not long, False, "takeProfit"),
+            ]
+        best = None
+        for level, below, slipped, reason in triggers:
+            if level is None:
+                continue
+            row = self._hit(symbol, start, stop if best is None else best[0] + 1, level, below)
+            if row is not None and (best is None or row < best[0]):
+                best = (row, level, below, slipped, reason)
+        if best is None:
+            return
+        row, level, below, slipped, reason = best
+        price = float(self.frames[symbol].open[row])
+        price = min(price, level) if below else max(price, level)
+        if slipped:
+            price = self._slipped(price, not below)
+        key = item["id"] if "id" in item else item["orderId"]
+        heapq.heappush(events, (int(self._steps[symbol][row]), next(self._sequence), key, row, price, reason))
+
+    def _advance(self, target: int):
+        """Исполнение ордеров и стопов по свечам шагов (self.step, target] в порядке времени."""
+        if not self._orders and not self._positions:
+            self.step = target
+            return
+        items = list(itertools.chain(self._orders.values(), self._positions.values()))
+        symbols = {item["symbol"] for item in items}
+        stops = {symbol: self._row(symbol, target) + 1 for symbol in symbols}
+        events = []
+        for item in items:
+            symbol = item["symbol"]
+            start = self._row(symbol) + 1
+            if start < stops[symbol]:
+                self._schedule(events, item, start, stops[symbol])
+        while events:
+            self.step, _, key, row, price, reason = heapq.heappop(events)
+            if reason == "fill":
+                order = self._orders.pop(key)
+                position = self._open(order, price, int(self.frames[order["symbol"]].open_time[row]), row)
+                if position is not None:
+                    self._schedule(events, position, row + 1, stops[position["symbol"]])
+            else:
+                position = self._positions[key]
+                self._close(position, price, int(self.frames[position["symbol"]].open_time[row]))
+        self.step = target
+
+    # --- методы Trade ---
+
+    def AccountInfo(self):
+        """Баланс счёта: free - эквити за вычетом маржи, locked - маржа открытых позиций."""
+        equity, margin = self._equity_now()
+        return _ok({"balances": [{"accountId": None, "asset": self.currency, "free": equity - margin, "locked": margin}]})
+
+    def CreateOrder(
+        self,
+        symbol: str,
+        side: str,
+        type_: str,
+        quantity: float,
+        resp_type: None|str=None,
+        leverage: None|int=None,
+        price: None|float=None,
+        stop_loss: None|float=None,
+        take_profit: None|float=None,
+        client_order_id: None|str=None):
+        """См. Trade.CreateOrder; MARKET исполняется по цене закрытия текущей свечи."""
+        symbol = self._resolve(symbol)
+        if isinstance(symbol, dict):
+            return symbol
+        if self.step < 0:
+            return _error("Order rejected: no market data yet")
+        if side not in ("BUY", "SELL") or type_ not in ("MARKET", "LIMIT", "STOP"):
+            return _error(f"Order rejected: unsupported {side} {type_}")
+        if type_ != "MARKET" and price is None:
+            return _error(f"Order rejected: {type_} order requires price")
+        leverage = leverage or self.leverage
+        quantity, price, error = self._check(symbol, type_, quantity, price, leverage)
+        if error is not None:
+            return error
+        if not quantity or quantity <= 0:
+            return _error(f"Order rejected: quantity {quantity}")
+        order = {
+            "symbol": symbol,
+            "orderId": str(next(self._ids)),
+            "clientOrderId": client_order_id,
+            "transactTime": self.time,
+            "price": price,
+            "origQty": quantity,
+            "executedQty": 0.0,
+            "status": "NEW",
+            "timeInForce": "GTC",
+            "type": type_,
+            "side": side,
+            "leverage": leverage,
+            "stopLoss": stop_loss,
+            "takeProfit": take_profit,
+            "_leverage": leverage,
+            "_row": self._row(symbol) + 1,
+        }
+        if type_ == "MARKET":
+            fill_price = self._slipped(self.price(symbol), side == "BUY")
+            if self._open(order, fill_price, self.time, self._row(symbol)) is None:
+                return _error("Order rejected: insufficient margin")
+        else:
+            self._orders[order["orderId"]] = order
+        return _ok(_public(order))
+
+    def EditOrder(
+        self,
+        order_id: str,
+        symbol: str,
+        side: str,
+        type_: str,
+        quantity: float,
+        price: None|float=None,
+        stop_loss: None|float=None,
+        take_profit: None|float=None
+        ):
+        """См. Trade.EditOrder: замена параметров неисполненного ордера."""
+        order = self._orders.get(order_id)
+        if order is None:
+            return _error(f"HTTP error: order {order_id} not found")
+        if side not in ("BUY", "SELL") or type_ not in ("LIMIT", "STOP") or price is None:
+            return _error(f"Order rejected: unsupported {side} {type_} {price}")
+        quantity, price, error = self._check(order["symbol"], type_, quantity, price, order["_leverage"])
+        if error is not None:
+            return error
+        order.update(side=side, type=type_, origQty=quantity, price=price, stopLoss=stop_loss, takeProfit=take_profit)
+        return _ok(_public(order))
+
+    def CancelOrder(self, order_id: str, symbol: str):
+        """См. Trade.CancelOrder."""
+        order = self._orders.pop(order_id, None)
+        if order is None:
+            return _error(f"HTTP error: order {order_id} not found")
+        order["status"] = "CANCELED"
+        return _ok(_public(order))
+
+    @staticmethod
+    def _unsupported(exp_time, guarant_stop_loss, profit_distance, stop_distance, trailing_stop_loss) -> None|dict:
+        if exp_time or guarant_stop_loss or profit_distance or stop_distance or trailing_stop_loss:
+            return _error("Request rejected: expiry, guaranteed/trailing stops and distances are not simulated")
+        return None
+
+    def LeverageOrdersEdit(
+        self,
+        order_id: str,
+        exp_time: None|str=None,
+        guarant_stop_loss: bool=False,
+        new_price: None|float=None,
+        profit_distance: None|int=None,
+        stop_distance: None|int=None,
+        stop_loss: None|float=None,
+        take_profit: None|float=None,
+        trailing_stop_loss: bool=False,
+        ):
+        """См. Trade.LeverageOrdersEdit: новая цена и stopLoss/takeProfit неисполненного ордера."""
+        error = self._unsupported(exp_time, guarant_stop_loss, profit_distance, stop_distance, trailing_stop_loss)
+        if error is not None:
+            return error
+        order = self._orders.get(order_id)
+        if order is None:
+            return _error(f"HTTP error: order {order_id} not found")
+        if new_price is not None:
+            order["price"] = new_price
+        order.update(stopLoss=stop_loss, takeProfit=take_profit)
+        return _ok({"requestId": next(self._requests), "state": "PROCESSED"})
+
+    def LeverageTradeEdit(
+        self,
+        position_id: str,
+        exp_time: None|str=None,
+        guarant_stop_loss: bool=False,
+        new_price: None|float=None,
+        profit_distance: None|int=None,
+        stop_distance: None|int=None,
+        stop_loss: None|float=None,
+        take_profit: None|float=None,
+        trailing_stop_loss: bool=False,
+        ):
+        """См. Trade.LeverageTradeEdit: новые stopLoss/takeProfit открытой позиции."""
+        error = self._unsupported(exp_time, guarant_stop_loss, profit_distance, stop_distance, trailing_stop_loss)
+        if error is not None:
+            return error
+        position = self._positions.get(position_id)
+        if position is None:
+            return _error(f"HTTP error: position {position_id} not found")
+        position.update(stopLoss=stop_loss, takeProfit=take_profit)
+        return _ok({"requestId": next(self._requests), "state": "PROCESSED"})
+
+    def TradingPositionClose(self, position_id):
+        """См. Trade.TradingPositionClose; закрытие по цене закрытия текущей свечи."""
+        position = self._positions.get(position_id)
+        if position is None:
+            return _error(f"HTTP error: position {position_id} not found")
+        price = self._slipped(self.price(position["symbol"]), position["openQuantity"] < 0)
+        self._close(position, price, self.time)
+        return _ok({"requestId": next(self._requests), "state": "PROCESSED"})
+
+    def ListOfOpenOrders(self, symbol: None|str = None):
+        """См. Trade.ListOfOpenOrders."""
+        if symbol is not None:
+            symbol = self._resolve(symbol)
+            if isinstance(symbol, dict):
+                return symbol
+        return _ok([_public(order) for order in self._orders.values() if symbol is None or order["symbol"] == symbol])
+
+    def ListOfLeverageTrades(self):
+        """Открытые позиции с upl по текущей цене закрытия."""
+        return _ok({"positions": [
+            dict(_public(position), upl=position["openQuantity"] * (self.price(position["symbol"]) - position["openPrice"]))
+            for position in self._positions.values()
+        ]})
+
+    def ListOfHistoricalPositions(
+        self,
+        from_: None| int = None,
+        symbol: None| str = None,
+        to: None| int = None,
+        limit: None| int = None
+        ):
+        """См. Trade.ListOfHistoricalPositions."""
+        if symbol is not None:
+            symbol = self._resolve(symbol)
+            if isinstance(symbol, dict):
+                return symbol
+        history = [
+            _public(position) for position in self._history
+            if (symbol is None or position["symbol"] == symbol)
+            and (from_ is None or position["closeTimestamp"] >= from_) and (to is None or position["closeTimestamp"] <= to)
+        ]
+        return _ok({"history": history[-limit:] if limit else history})
+
+    def ListOfTrades(
+        self,
+        symbol: str,
+        start_time: None| int = None,
+        end_time: None| int = None,
+        limit: None| int = None
+        ):
+        """См. Trade.ListOfTrades."""
+        symbol = self._resolve(symbol)
+        if isinstance(symbol, dict):
+            return symbol
+        fills = [
+            fill for fill in self._fills
+            if fill["symbol"] == symbol and (start_time is None or fill["time"] >= start_time)
+            and (end_time is None or fill["time"] <= end_time)
+        ]
+        return _ok(fills[-(limit or 500):])
+
+    def Klines(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: None| int = None,
+        end_time: None| int = None,
+        limit: None| int = None,
+        price_type: None| int = None,
+        type_: None| int = None,
+        frame: bool = False,
+        ):
+        """См. Trade.Klines: свечи до текущей включительно; другой interval получается через KlineFrame.resample."""
+        code = self._resolve(symbol)
+        if isinstance(code, dict):
+            return code
+        data = self.frame(code)
+        if start_time is not None or end_time is not None:
+            lo = np.searchsorted(data.open_time, to_ms(start_time)) if start_time is not None else 0
+            hi = np.searchsorted(data.open_time, to_ms(end_time), side="right") if end_time is not None else len(data)
+            data = data[lo:hi]
+        if len(data) > 1 and interval_ms(interval) != int(data.open_time[1] - data.open_time[0]):
+            data = data.resample(interval)
+        data = data[-(limit or 500):]
+        return _ok(data if frame else data.to_rows())
+
+    def ServerTime(self):
+        """Время симуляции."""
+        return _ok({"serverTime": self.time})
+
+    # --- прогон ---
+
+    def run(self, strategy, start=None, end=None, every: int = 1) -> dict:
+        """Прогон стратегии: strategy(self) вызывается после закрытия каждой every-й свечи шкалы в [start, end].
+        Возвращает result()."""
+        self.reset()
+        first = int(np.searchsorted(self.times, to_ms(start))) if start is not None else 0
+        last = int(np.searchsorted(self.times, to_ms(end), side="right")) - 1 if end is not None else len(self.times) - 1
+        self.step = first - 1
+        for step in range(first, last + 1, every):
+            self._advance(step)
+            strategy(self)
+        self._advance(last)
+        return self.result(first, last)
+
+    def equity(self, first: int = 0, last: None|int = None) -> np.ndarray:
+        """Эквити на закрытии каждого шага [first, last] (по умолчанию - до текущего).
+        Считается векторно по журналу операций, без пересчёта на каждом шаге прогона."""
+        last = self.step if last is None else last
+        count = last - first + 1
+        if count <= 0:
+            return np.empty(0)
+        cash = np.zeros(count)
+        if self._ledger:
+            steps, amounts = np.array(self._ledger).T
+            np.add.at(cash, steps.astype(np.int64) - first, amounts)
+        equity = self.initial_balance + np.cumsum(cash)
+        for symbol, frame in self.frames.items():
+            positions = [p for p in itertools.chain(self._history, self._positions.values()) if p["symbol"] == symbol]
+            if not positions:
+                continue
+            quantity, cost = np.zeros(count + 1), np.zeros(count + 1)
+            for position in positions:
+                opened, closed = position["_step"] - first, position.get("_close_step", last + 1) - first
+                quantity[opened] += position["openQuantity"]
+                quantity[closed] -= position["openQuantity"]
+                cost[opened] += position["openQuantity"] * position["openPrice"]
+                cost[closed] -= position["openQuantity"] * position["openPrice"]
+            close = frame.close[np.maximum(self._rows[symbol][first:last + 1], 0)]
+            equity += np.cumsum(quantity)[:count] * close - np.cumsum(cost)[:count]
+        return equity
+
+    def result(self, first: int = 0, last: None|int = None) -> dict:
+        """{"time", "equity", "positions" (закрытые), "open_positions", "fills", "stats"}."""
+        last = self.step if last is None else last
+        equity = self.equity(first, last)
+        history = [_public(position) for position in self._history]
+        return {
+            "time": self.times[first:last + 1],
+            "equity": equity,
+            "positions": history,
+            "open_positions": self.ListOfLeverageTrades()["data"]["positions"],
+            "fills": self._fills,
+            "stats": stats(equity, history),
+        }
+
+
+_WORKER: dict = {}
+
+
+def _init_worker(frames: dict, options: dict):
+    # свечи передаются в процесс один раз, а не с каждой задачей
+    _WORKER["frames"] = frames
+    _WORKER["options"] = options
+
+
+def _run_params(factory, params: dict, run_options: dict) -> dict:
+    trade = SimulatedTrade(_WORKER["frames"], **_WORKER["options"])
+    return {"params": params, "stats": trade.run(factory(**params), **run_options)["stats"]}
+
+
+def sweep(factory, frames: dict, grid: dict, processes: None|int = None, run_options: None|dict = None, **options) -> list:
+    """Прогон стратегии по всем сочетаниям параметров grid ({имя: [значения]}) в пуле процессов.
+    factory(**params) возвращает стратегию; factory должна импортироваться по имени (функция или класс модуля).
+    options - аргументы SimulatedTrade, run_options - аргументы run. Результаты - [{"params", "stats"}] в порядке сетки.
+    """
+    names = list(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+    run_options = run_options or {}
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(frames, options)) as executor:
+        futures = [executor.submit(_run_params, factory, params, run_options) for params in combos]
+        return [future.result() for future in futures]
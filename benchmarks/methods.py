@@ -0,0 +1,137 @@
+"""Замер методов Trade против локального MockDzengi: пропускная способность, перцентили задержки и память.
+
+python benchmarks/methods.py --iterations 200 --concurrency 8 --latency 0.005
+python benchmarks/methods.py --cases GetSymbol RefreshSymbols --json results.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dzg import Config, Trade  # noqa: E402
+from mock_server import MockDzengi  # noqa: E402
+
+START_MS = 1_704_067_200_000  # 2024-01-01
+
+
+def _create_cancel(trade: Trade):
+    order = trade.CreateOrder("Symbol 1", "BUY", "LIMIT", 0.1, price=100.0)
+    if "error" in order:
+        return order
+    return trade.CancelOrder(order["data"]["orderId"], "Symbol 1")
+
+
+# имя -> функция(trade); symbol задаётся по name, чтобы включать поиск в кэше символов
+CASES = {
+    "ServerTime": lambda trade: trade.ServerTime(),
+    "GetSymbol": lambda trade: trade.GetSymbol("Symbol 1"),
+    # прежняя цена GetSymbol: /exchangeInfo на каждый вызов (RefreshSymbols идёт мимо кэша ответов)
+    "RefreshSymbols": lambda trade: trade.RefreshSymbols(),
+    "ExchangeInfo(cached)": lambda trade: trade.ExchangeInfo(),
+    "AccountInfo": lambda trade: trade.AccountInfo(),
+    "ListOfLeverageTrades": lambda trade: trade.ListOfLeverageTrades(),
+    "AccountState.refresh": lambda trade: trade.track_account(interval=None).refresh(),  # /account + позиции + ордера
+    "ListOfOpenOrders": lambda trade: trade.ListOfOpenOrders(),
+    "OrderBook": lambda trade: trade.OrderBook("Symbol 1"),
+    "PriceChange": lambda trade: trade.PriceChange("Symbol 1"),
+    "PriceChange(all)": lambda trade: trade.PriceChange(),
+    "Klines(1000)": lambda trade: trade.Klines("Symbol 1", "1m", START_MS, limit=1000),
+    "ListOfTrades": lambda trade: trade.ListOfTrades("Symbol 1", START_MS, START_MS + 86_400_000, limit=500),
+    "ListOfHistoricalPositions": lambda trade: trade.ListOfHistoricalPositions(START_MS, "Symbol 1", START_MS + 86_400_000),
+    "CreateOrder+CancelOrder": _create_cancel,
+    "LeverageOrdersEdit": lambda trade: trade.LeverageOrdersEdit("order-1", new_price=100.0),
+    "snapshot(20)": lambda trade: trade.snapshot([f"Symbol {i}" for i in range(20)], include=("ticker", "depth")),
+}
+
+
+def _percentile(values: list, q: float) -> float:
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def measure(trade: Trade, call, iterations: int, concurrency: int) -> dict:
+    """iterations вызовов call(trade) в concurrency потоках; задержки в мс."""
+    call(trade)  # прогрев: соединения, кэш символов
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    counter = iter(range(iterations))
+
+    def worker():
+        nonlocal errors
+        local, failed = [], 0
+        for _ in counter:
+            started = time.perf_counter()
+            result = call(trade)
+            local.append((time.perf_counter() - started) * 1000)
+            failed += isinstance(result, dict) and "error" in result
+        with lock:
+            latencies.extend(local)
+            errors += failed
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    for _ in range(min(iterations, 20)):
+        result = call(trade)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": _percentile(latencies, 0.95),
+        "p99_ms": _percentile(latencies, 0.99),
+        "peak_kib": peak / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа сервера в секундах")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--positions", type=int, default=20, help="открытых позиций в /tradingPositions")
+    parser.add_argument("--cases", nargs="*", default=None, help=f"подмножество из: {', '.join(CASES)}")
+    parser.add_argument("--json", default=None, help="записать результаты в файл JSON")
+    args = parser.parse_args()
+
+    results = {}
+    with MockDzengi(latency=args.latency, symbols=args.symbols, error_rate=args.error_rate) as mock:
+        url = mock.start()
+        for i in range(args.positions):
+            mock.open_position({"orderId": f"order-{i}", "symbol": "SYM1.", "side": "BUY", "origQty": "0.1", "price": "100"})
+        config = Config(api_key="key", secret_key="secret", url=url)
+        with Trade(config=config, pool_size=max(args.concurrency, 10), clock_sync_interval=None) as trade:
+            print(f"{'case':<28}{'calls/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak KiB':>10}{'errors':>8}")
+            for name in args.cases or CASES:
+                result = results[name] = measure(trade, CASES[name], args.iterations, args.concurrency)
+                print(
+                    f"{name:<28}{result['throughput']:>10.1f}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+                    f"{result['p99_ms']:>10.2f}{result['peak_kib']:>10.1f}{result['errors']:>8}"
+                )
+            results["_metrics"] = trade.metrics.to_dict()
+        results["_server_calls"] = dict(mock.calls)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
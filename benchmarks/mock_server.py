@@ -0,0 +1,406 @@
+"""Локальный сервер, имитирующий REST API dzengi (/api/v2) для тестов и замеров без сети.
+
+python benchmarks/mock_server.py --port 8080 --latency 0.02 --error-rate 0.01
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PREFIX = "/api/v2/"
+DAY_MS = 86_400_000
+INTERVALS_MS = {"m": 60_000, "h": 3_600_000, "d": DAY_MS, "w": 7 * DAY_MS}
+
+
+class MockDzengi:
+    """Имитация API: детерминированные данные, задержка, размер ответов и внедрение ошибок.
+
+    latency задержка ответа в секундах (число или пара (min, max) для равномерного разброса);
+    symbols число инструментов в /exchangeInfo; depth число уровней стакана;
+    trades_per_day плотность сделок для /myTrades и /tradingPositionsHistory;
+    error_rate доля ответов error_status (503) на любой путь; errors - доли по отдельным путям;
+    disconnects доли запросов по путям, на которые сервер закрывает соединение без ответа
+    (запрос прочитан и обработан, ответ потерян);
+    rate_limit лимит REQUEST_WEIGHT в минуту, сообщаемый клиенту в rateLimits;
+    """
+
+    def __init__(
+        self,
+        latency: float|tuple = 0.0,
+        symbols: int = 100,
+        depth: int = 20,
+        trades_per_day: int = 500,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        errors: None|dict = None,
+        disconnects: None|dict = None,
+        rate_limit: int = 1_000_000,
+        seed: int = 0,
+        ):
+        self.latency = latency
+        self.depth = depth
+        self.trades_per_day = trades_per_day
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.errors = errors or {}
+        self.disconnects = disconnects or {}
+        self.rate_limit = rate_limit
+        self.calls: Counter = Counter()
+        self.orders: dict = {}
+        self.positions: dict = {}  # id -> открытая позиция (MARKET-ордера открывают позиции)
+        self.closed: list = []  # закрытые позиции для /tradingPositionsHistory
+        self.fills: list = []  # сделки по исполненным ордерам для /myTrades
+        self._levels: dict = {}  # orderId -> (stopLoss, takeProfit) открытого ордера
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self.symbols = [self._symbol(i) for i in range(symbols)]
+
+    @staticmethod
+    def _symbol(index: int) -> dict:
+        return {
+            "symbol": f"SYM{index}.",
+            "name": f"Symbol {index}",
+            "status": "TRADING",
+            "type": "LEVERAGE",
+            "baseAsset": f"S{index}",
+            "quoteAsset": "USD",
+            "tickSize": 0.01,
+            "makerFee": 0.1,
+            "takerFee": 0.2,
+            "orderTypes": ["LIMIT", "MARKET", "STOP"],
+            "filters": [
+                {"filterType": "LOT_SIZE", "minQty": "0.01", "maxQty": "10000", "stepSize": "0.01"},
+                {"filterType": "PRICE_FILTER", "minPrice": "0.01", "maxPrice": "1000000", "tickSize": "0.01"},
+                {"filterType": "MIN_NOTIONAL", "minNotional": "1"},
+            ],
+        }
+
+    # --- жизненный цикл -------------------------------------------------------------------------
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Запуск в фоновом потоке; возвращает базовый url API."""
+        mock = self
+
+        class Handler(_Handler):
+            server_mock = mock
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="mock-dzengi", daemon=True).start()
+        return f"http://{host}:{self._server.server_port}/api/v2"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- обработка ------------------------------------------------------------------------------
+
+    def delay(self) -> float:
+        if isinstance(self.latency, tuple):
+            return self._random.uniform(*self.latency)
+        return self.latency
+
+    def fail(self, path: str) -> bool:
+        rate = self.errors.get(path, self.error_rate)
+        return bool(rate) and self._random.random() < rate
+
+    def disconnect(self, path: str) -> bool:
+        rate = self.disconnects.get(path, 0.0)
+        return bool(rate) and self._random.random() < rate
+
+    def handle(self, method: str, path: str, query: dict) -> tuple:
+        """(статус, тело) ответа на запрос; статус None - закрыть соединение без ответа, тело bytes отдаётся как есть."""
+        with self._lock:
+            self.calls[path] += 1
+        if self.fail(path):
+            return self.error_status, {"code": -1, "msg": "injected error"}
+        handler = getattr(self, f"_{method.lower()}_{path.replace('/', '_')}", None) \
+            or getattr(self, f"_any_{path.replace('/', '_')}", None)
+        if handler is None:
+            return 404, {"code": -1, "msg": f"unknown path {path}"}
+        try:
+            body = handler(query)
+        except (KeyError, ValueError) as ex:
+            return 400, {"code": -1, "msg": f"bad request: {ex!r}"}
+        return (None, None) if self.disconnect(path) else (200, body)
+
+    def _any_time(self, query: dict):
+        return {"serverTime": int(time.time() * 1000)}
+
+    def _any_exchangeInfo(self, query: dict):
+        return {
+            "timezone": "UTC",
+            "serverTime": int(time.time() * 1000),
+            "rateLimits": [
+                {"rateLimitType": "REQUEST_WEIGHT", "interval": "MINUTE", "intervalNum": 1, "limit": self.rate_limit},
+                {"rateLimitType": "ORDERS", "interval": "SECOND", "intervalNum": 1, "limit": self.rate_limit},
+            ],
+            "symbols": self.symbols,
+        }
+
+    def _any_account(self, query: dict):
+        return {
+            "makerCommission": 0.2,
+            "takerCommission": 0.2,
+            "balances": [
+                {"accountId": "1", "asset": "USD", "free": "10000.0", "locked": "0.0", "default": True},
+                {"accountId": "2", "asset": "EUR", "free": "500.0", "locked": "0.0", "default": False},
+            ],
+        }
+
+    def _price(self, symbol: str, at_ms: int = 0) -> float:
+        base = 100 + sum(symbol.encode()) % 1000
+        return round(base + 5 * ((at_ms // 60_000) % 20 - 10) / 10, 2)
+
+    def _post_order(self, query: dict):
+        order = {
+            "symbol": query["symbol"],
+            "orderId": str(uuid.uuid4()),
+            "clientOrderId": query.get("newClientOrderId"),
+            "transactTime": int(time.time() * 1000),
+            "price": query.get("price", str(self._price(query["symbol"]))),
+            "origQty": query["quantity"],
+            "executedQty": "0" if query.get("type") != "MARKET" else query["quantity"],
+            "status": "NEW" if query.get("type") != "MARKET" else "FILLED",
+            "timeInForce": "GTC",
+            "type": query["type"],
+            "side": query["side"],
+        }
+        if order["status"] == "NEW":
+            with self._lock:
+                self.orders[order["orderId"]] = order
+                self._levels[order["orderId"]] = (query.get("stopLoss"), query.get("takeProfit"))
+        else:
+            self._fill(order, query.get("stopLoss"), query.get("takeProfit"))
+        return order
+
+    def fill(self, order_id: str) -> dict:
+        """Исполнение открытого ордера по его цене: сделка в /myTrades и позиция."""
+        with self._lock:
+            order = self.orders.pop(order_id)
+            levels = self._levels.pop(order_id)
+        return self._fill(dict(order, executedQty=order["origQty"], status="FILLED"), *levels)
+
+    def _fill(self, order: dict, stop_loss=None, take_profit=None) -> dict:
+        fill = {
+            "symbol": order["symbol"], "id": str(uuid.uuid4()), "orderId": order["orderId"], "price": order["price"],
+            "qty": order["origQty"], "quoteQty": str(float(order["price"]) * float(order["origQty"])),
+            "commission": "0", "commissionAsset": "USD", "time": int(time.time() * 1000),
+            "buyer": order["side"] == "BUY", "maker": order["type"] != "MARKET",
+        }
+        with self._lock:
+            self.fills.append(fill)
+        return self.open_position(order, stop_loss, take_profit)
+
+    def open_position(self, order: dict, stop_loss=None, take_profit=None) -> dict:
+        """Позиция по исполненному ордеру order."""
+        quantity = float(order["origQty"]) * (1 if order["side"] == "BUY" else -1)
+        now = int(time.time() * 1000)
+        position = {
+            "id": str(uuid.uuid4()), "accountId": "1", "symbol": order["symbol"], "orderId": order["orderId"],
+            "state": "ACTIVE", "currency": "USD", "openQuantity": str(quantity), "openPrice": order["price"],
+            "stopLoss": stop_loss, "takeProfit": take_profit, "createdTimestamp": now, "openTimestamp": now,
+        }
+        with self._lock:
+            self.positions[position["id"]] = position
+        return position
+
+    def close_position(self, position_id: str, price=None) -> dict:
+        """Закрытие позиции по цене price (по умолчанию - текущей)."""
+        with self._lock:
+            position = self.positions.pop(position_id)
+        price = price if price is not None else self._price(position["symbol"])
+        closed = dict(
+            position, state="CLOSED", closePrice=str(price), closeQuantity=position["openQuantity"],
+            rpl=str(round((float(price) - float(position["openPrice"])) * float(position["openQuantity"]), 2)),
+            closeTimestamp=int(time.time() * 1000),
+        )
+        with self._lock:
+            self.closed.append(closed)
+        return closed
+
+    def _delete_order(self, query: dict):
+        with self._lock:
+            order = self.orders.pop(query["orderId"], None)
+            self._levels.pop(query["orderId"], None)
+        if order is None:
+            raise KeyError(query["orderId"])
+        return dict(order, status="CANCELED")
+
+    def _any_openOrders(self, query: dict):
+        with self._lock:
+            orders = list(self.orders.values())
+        return [order for order in orders if "symbol" not in query or order["symbol"] == query["symbol"]]
+
+    def _any_klines(self, query: dict):
+        interval = query["interval"]
+        step = int(interval[:-1] or 1) * INTERVALS_MS[interval[-1]]
+        limit = min(int(query.get("limit", 500)), 1000)
+        end = int(query.get("endTime", time.time() * 1000))
+        if "startTime" in query:
+            start = int(query["startTime"])
+            start += -start % step  # первая свеча, открытая не раньше startTime
+        else:
+            start = end - end % step - step * (limit - 1)  # последние limit свечей
+        rows = []
+        for open_time in range(start, min(end, start + step * (limit - 1)) + 1, step):
+            price = self._price(query["symbol"], open_time)
+            rows.append([open_time, price, price + 0.5, price - 0.5, price + 0.1, 10.0])
+        return rows
+
+    def _any_depth(self, query: dict):
+        price = self._price(query["symbol"])
+        return {
+            "lastUpdateId": int(time.time() * 1000),
+            "bids": [[str(round(price - 0.01 * (i + 1), 2)), "1.5"] for i in range(self.depth)],
+            "asks": [[str(round(price + 0.01 * (i + 1), 2)), "1.5"] for i in range(self.depth)],
+        }
+
+    def _ticker(self, symbol: str) -> dict:
+        price = self._price(symbol)
+        return {
+            "symbol": symbol, "priceChange": "0.5", "priceChangePercent": "0.4", "weightedAvgPrice": str(price),
+            "prevClosePrice": str(price - 0.5), "lastPrice": str(price), "bidPrice": str(price - 0.01),
+            "askPrice": str(price + 0.01), "openPrice": str(price - 0.5), "highPrice": str(price + 1),
+            "lowPrice": str(price - 1), "volume": "1000", "quoteVolume": str(price * 1000),
+            "openTime": int(time.time() * 1000) - DAY_MS, "closeTime": int(time.time() * 1000),
+        }
+
+    def _any_ticker_24hr(self, query: dict):
+        if "symbol" in query:
+            return self._ticker(query["symbol"])
+        return [self._ticker(element["symbol"]) for element in self.symbols]
+
+    def _history_times(self, start: int, end: int, limit: int) -> list:
+        """Детерминированные времена событий в [start, end] с плотностью trades_per_day."""
+        spacing = max(DAY_MS // max(self.trades_per_day, 1), 1)
+        first = start + -start % spacing
+        return list(range(first, end + 1, spacing))[:limit]
+
+    def _any_myTrades(self, query: dict):
+        start, end = int(query.get("startTime", 0)), int(query.get("endTime", time.time() * 1000))
+        with self._lock:
+            fills = [fill for fill in self.fills if fill["symbol"] == query["symbol"] and start <= fill["time"] <= end]
+        limit = int(query.get("limit", 500))
+        return sorted(fills + [
+            {
+                "symbol": query["symbol"], "id": str(at), "orderId": f"order-{at}", "price": str(self._price(query["symbol"], at)),
+                "qty": "0.1", "quoteQty": "10", "commission": "0.02", "commissionAsset": "USD", "time": at,
+                "buyer": at % 2 == 0, "maker": False,
+            }
+            for at in self._history_times(start, end, limit)
+        ], key=lambda trade: trade["time"])[:limit]
+
+    def _any_tradingPositionsHistory(self, query: dict):
+        start, end = int(query.get("from", 0)), int(query.get("to", time.time() * 1000))
+        symbol = query.get("symbol", self.symbols[0]["symbol"])
+        with self._lock:
+            closed = [
+                position for position in self.closed
+                if position["symbol"] == symbol and start <= position["createdTimestamp"] <= end
+            ]
+        return {"history": closed + [
+            {
+                "id": f"position-{at}", "symbol": symbol, "state": "CLOSED", "openQuantity": "0.1",
+                "openPrice": str(self._price(symbol, at)), "closePrice": str(self._price(symbol, at + 60_000)),
+                "rpl": "0.5", "createdTimestamp": at, "closeTimestamp": at + 60_000,
+            }
+            for at in self._history_times(start, end, int(query.get("limit", 100)))
+        ]}
+
+    def _any_tradingPositions(self, query: dict):
+        with self._lock:
+            return {"positions": list(self.positions.values())}
+
+    def _any_tradingFees(self, query: dict):
+        return [{"symbol": query.get("symbol"), "makerFee": 0.1, "takerFee": 0.2}]
+
+    def _any_tradingLimits(self, query: dict):
+        return {"symbol": query.get("symbol"), "minLeverage": 1, "maxLeverage": 100}
+
+    def _any_currencies(self, query: dict):
+        return [{"name": "US Dollar", "displaySymbol": "USD", "precision": 2, "type": "FIAT"}]
+
+    def _processed(self, query: dict):
+        return {"requestId": self._random.randrange(1 << 30), "state": "PROCESSED"}
+
+    def _post_closeTradingPosition(self, query: dict):
+        if query["positionId"] in self.positions:
+            self.close_position(query["positionId"])
+        return self._processed(query)
+
+    _post_updateTradingOrder = _post_updateTradingPosition = _processed
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, как у настоящего API
+    disable_nagle_algorithm = True  # иначе заголовки и тело уходят с задержкой ACK (~40 мс)
+    server_mock: MockDzengi = None
+
+    def log_message(self, *args):
+        pass
+
+    def _respond(self):
+        url = urlparse(self.path)
+        if not url.path.startswith(PREFIX):
+            status, body = 404, {"code": -1, "msg": "not found"}
+        else:
+            query = {name: values[0] for name, values in parse_qs(url.query).items()}
+            delay = self.server_mock.delay()
+            if delay:
+                time.sleep(delay)
+            status, body = self.server_mock.handle(self.command, url.path[len(PREFIX):], query)
+            if status is None:
+                self.close_connection = True
+                return
+        content = body if isinstance(body, bytes) else json.dumps(body).encode()  # bytes - тело как есть (не JSON)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_DELETE = _respond
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа в секундах")
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--depth", type=int, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    args = parser.parse_args()
+
+    mock = MockDzengi(
+        latency=args.latency, symbols=args.symbols, depth=args.depth,
+        error_rate=args.error_rate, error_status=args.error_status,
+    )
+    print(mock.start(args.host, args.port), flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()
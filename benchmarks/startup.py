@@ -0,0 +1,67 @@
+"""Замер времени запуска: import dzg и создание Trade в свежем интерпретаторе.
+
+python benchmarks/startup.py --runs 20 --max-import-ms 50
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import dzg
+imported = time.perf_counter()
+trade = dzg.Trade(config=dzg.Config(api_key="key", secret_key="secret", url="http://127.0.0.1:9/api/v2"))
+created = time.perf_counter()
+heavy = [name for name in ("requests", "asyncio", "dotenv", "numpy", "aiohttp") if name in sys.modules]
+print(json.dumps({"import_ms": (imported - started) * 1000, "trade_ms": (created - imported) * 1000, "heavy": heavy}))
+"""
+
+
+def run_probe() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def import_profile(top: int) -> list:
+    """Самые медленные модули по python -X importtime."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import dzg"], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines()[1:]:  # первая строка - заголовок
+        _, cumulative_us, name = line.removeprefix("import time:").split("|")
+        rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-import-ms", type=float, default=None, help="завершиться с ошибкой, если медиана выше")
+    parser.add_argument("--profile", type=int, default=0, help="показать N самых медленных импортов")
+    args = parser.parse_args()
+
+    samples = [run_probe() for _ in range(args.runs)]
+    for key in ("import_ms", "trade_ms"):
+        values = sorted(sample[key] for sample in samples)
+        print(f"{key:<10} median={statistics.median(values):8.2f}  min={values[0]:8.2f}  max={values[-1]:8.2f}")
+    print("loaded after Trade():", ", ".join(samples[-1]["heavy"]) or "-")
+    if args.profile:
+        for cumulative_us, name in import_profile(args.profile):
+            print(f"{cumulative_us / 1000:8.2f} ms  {name}")
+
+    median = statistics.median(sample["import_ms"] for sample in samples)
+    if args.max_import_ms is not None and median > args.max_import_ms:
+        sys.exit(f"import dzg: {median:.2f} ms > {args.max_import_ms} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,785 +1,3290 @@
-import requests
+import csv
+import importlib
 import os
-from dotenv import load_dotenv
 import time
 import hmac
 import hashlib
+import random
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+from datetime import datetime
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP
 from urllib.parse import quote
 
 
-load_dotenv()  # Загружает переменные из .env
+class _LazyModule:
+    """Модуль, импортируемый при первом обращении к атрибуту (ускоряет import dzg)."""
 
-api_key: str = os.getenv("API_key")
-secret_key: str = os.getenv("secret_key")
-account_id: str = os.getenv("account_id")
-url: str = os.getenv("url")
+    def __init__(self, name: str):
+        self._name = name
 
+    def __getattr__(self, attr: str):
+        return getattr(importlib.import_module(self._name), attr)
 
-class Trade:
-    def __init__(self, api_key: str, secret_key: str, url: str = url):
-        """Инициализация класса Trade с API-ключами и выбором режима (демо или реальный)."""
+
+requests = _LazyModule("requests")
+asyncio = _LazyModule("asyncio")
+futures = _LazyModule("concurrent.futures")
+json = _LazyModule("json")
+copy = _LazyModule("copy")
+logging = _LazyModule("logging")
+
+
+class Config:
+    """Параметры подключения: ключи API, id аккаунта и адрес API.
+    from_env читает их из переменных окружения (и .env) в момент вызова, а не при импорте.
+    """
+
+    ENV = {"api_key": "API_key", "secret_key": "secret_key", "account_id": "account_id", "url": "url"}
+
+    def __init__(
+        self,
+        api_key: None|str = None,
+        secret_key: None|str = None,
+        account_id: None|str = None,
+        url: None|str = None,
+        ):
         self.api_key = api_key
         self.secret_key = secret_key
-        # self.url = "https://demo-api-adapter.dzengi.com/api/v2"
-        self.url = url
-        self.recv_window = 5000  
         self.account_id = account_id
+        self.url = url
+
+    @classmethod
+    def from_env(cls, dotenv: bool = True, path: None|str = None):
+        """Чтение параметров из окружения; dotenv=True - предварительно загрузить .env (path)."""
+        if dotenv:
+            from dotenv import load_dotenv
+
+            load_dotenv(path)  # Загружает переменные из .env
+        return cls(**{field: os.getenv(name) for field, name in cls.ENV.items()})
+
+    def __repr__(self):
+        return f"Config(account_id={self.account_id!r}, url={self.url!r})"
+
+
+def __getattr__(name: str):
+    """Прежние переменные модуля api_key, secret_key, account_id и url, читаемые из окружения по запросу."""
+    if name in Config.ENV:
+        return getattr(Config.from_env(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+INTERVAL_UNITS_MS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
+
+class DzengiError(Exception):
+    """Ошибка запроса к API; исходный словарь ответа в self.response."""
+
+    def __init__(self, response: dict):
+        super().__init__(response.get("error"))
+        self.response = response
+
+
+def interval_ms(interval: str) -> int:
+    """Длительность интервала свечи (1m, 15m, 1h, 1d, 1w) в миллисекундах."""
+    return int(interval[:-1] or 1) * INTERVAL_UNITS_MS[interval[-1]]
+
+
+def to_ms(value: int|float|datetime) -> int:
+    """Перевод datetime или времени в миллисекундах в int миллисекунд."""
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    return int(value)
+
+
+def _decimal(value) -> None|Decimal:
+    """Decimal из строки/числа ответа API; None для отсутствующих и нулевых значений."""
+    if value in (None, ""):
+        return None
+    value = Decimal(str(value))
+    return value or None
+
+
+def _fee_rate(data) -> None|float:
+    """Комиссия тейкера (доля) из ответа /tradingFees или описания символа (словарь или модель из models);
+    значения API в процентах."""
+    if not hasattr(data, "get"):  # список записей (list или ModelList) или None
+        data = data[0] if data else {}
+    for key in ("takerFee", "tradingFee", "fee"):
+        value = data.get(key)
+        if value not in (None, ""):
+            return float(value) / 100
+    return None
+
+
+class SymbolRules:
+    """Торговые правила символа для проверки ордеров без обращения к API.
+
+    Строится по фильтрам LOT_SIZE, PRICE_FILTER и MIN_NOTIONAL из /exchangeInfo;
+    update дополняет правила данными /tradingLimits и /tradingFees.
+    """
+
+    def __init__(self, element: dict):
+        filters = {item.get("filterType"): item for item in element.get("filters") or []}
+        lot = filters.get("LOT_SIZE", {})
+        price = filters.get("PRICE_FILTER", {})
+        self.symbol = element.get("symbol")
+        self.min_qty = _decimal(lot.get("minQty"))
+        self.max_qty = _decimal(lot.get("maxQty"))
+        self.step_size = _decimal(lot.get("stepSize"))
+        self.min_price = _decimal(price.get("minPrice"))
+        self.max_price = _decimal(price.get("maxPrice"))
+        self.tick_size = _decimal(price.get("tickSize") or element.get("tickSize"))
+        self.min_notional = _decimal(filters.get("MIN_NOTIONAL", {}).get("minNotional"))
+        self.min_leverage = _decimal(element.get("minLeverage"))
+        self.max_leverage = _decimal(element.get("maxLeverage"))
+        self.order_types = element.get("orderTypes")
+        self.fee = _fee_rate(element) or 0.0
+        self.limits_loaded = False
+
+    def update(self, limits: None|dict = None, fees=None):
+        """Уточнение правил ответами /tradingLimits (границы плеча и объёма) и /tradingFees (комиссия)."""
+        if limits is not None and not hasattr(limits, "get"):
+            limits = limits[0] if limits else None
+        if limits:
+            for attr, key in (
+                ("min_qty", "minQuantity"), ("max_qty", "maxQuantity"),
+                ("min_leverage", "minLeverage"), ("max_leverage", "maxLeverage"),
+            ):
+                value = _decimal(limits.get(key))
+                if value is not None:
+                    setattr(self, attr, value)
+        fee = _fee_rate(fees)
+        if fee is not None:
+            self.fee = fee
+        self.limits_loaded = True
+
+    def round_quantity(self, quantity: float) -> float:
+        """Округление объёма вниз до stepSize."""
+        if self.step_size is None:
+            return float(quantity)
+        return float((Decimal(str(quantity)) / self.step_size).to_integral_value(ROUND_DOWN) * self.step_size)
+
+    def round_price(self, price: float) -> float:
+        """Округление цены до ближайшего tickSize."""
+        if self.tick_size is None:
+            return float(price)
+        return float((Decimal(str(price)) / self.tick_size).to_integral_value(ROUND_HALF_UP) * self.tick_size)
+
+    def check(self, type_: None|str, quantity, price=None, leverage=None) -> tuple:
+        """Проверка ордера; возвращает (quantity, price), округлённые до шага и тика.
+        Нарушение правил - ValueError с описанием."""
+        if self.order_types and type_ and type_ not in self.order_types:
+            raise ValueError(f"{self.symbol}: order type {type_} not in {self.order_types}")
+        if quantity is not None:
+            quantity = self.round_quantity(quantity)
+            if quantity <= 0 or self.min_qty is not None and quantity < self.min_qty:
+                raise ValueError(f"{self.symbol}: quantity {quantity} below minQty {self.min_qty}")
+            if self.max_qty is not None and quantity > self.max_qty:
+                raise ValueError(f"{self.symbol}: quantity {quantity} above maxQty {self.max_qty}")
+        if price is not None:
+            price = self.round_price(price)
+            if price <= 0 or self.min_price is not None and price < self.min_price:
+                raise ValueError(f"{self.symbol}: price {price} below minPrice {self.min_price}")
+            if self.max_price is not None and price > self.max_price:
+                raise ValueError(f"{self.symbol}: price {price} above maxPrice {self.max_price}")
+            if quantity is not None and self.min_notional is not None and quantity * price < self.min_notional:
+                raise ValueError(f"{self.symbol}: notional {quantity * price} below minNotional {self.min_notional}")
+        if leverage is not None:
+            if self.min_leverage is not None and leverage < self.min_leverage \
+                    or self.max_leverage is not None and leverage > self.max_leverage:
+                raise ValueError(f"{self.symbol}: leverage {leverage} outside {self.min_leverage}..{self.max_leverage}")
+        return quantity, price
+
+    def max_quantity(self, amount: float, price: float, leverage: None|int = None) -> float:
+        """Наибольший объём, который можно купить на amount по цене price с учётом комиссии и плеча
+        (округлён вниз до stepSize; 0, если меньше minQty)."""
+        quantity = self.round_quantity(amount * (leverage or 1) / (price * (1 + self.fee)))
+        return 0.0 if self.min_qty is not None and quantity < self.min_qty else quantity
+
+
+def write_csv(records, path: str, fields: None|list = None, rows_per_file: None|int = None) -> list:
+    """Потоковая запись записей (словари или модели из models) в CSV; память не зависит от числа записей.
+    fields - колонки (по умолчанию ключи первой записи); rows_per_file - разбиение на файлы
+    path с суффиксом -00000, -00001, ... по rows_per_file строк. Возвращает список записанных файлов."""
+    root, ext = os.path.splitext(path)
+    paths, file, writer, written = [], None, None, 0
+    try:
+        for record in records:
+            if hasattr(record, "to_dict"):
+                record = record.to_dict()
+            if writer is None or rows_per_file and written == rows_per_file:
+                if file is not None:
+                    file.close()
+                paths.append(f"{root}-{len(paths):05d}{ext}" if rows_per_file else path)
+                file = open(paths[-1], "w", newline="", encoding="utf-8")
+                fields = fields or list(record)
+                writer = csv.DictWriter(file, fields, extrasaction="ignore")
+                writer.writeheader()
+                written = 0
+            writer.writerow(record)
+            written += 1
+    finally:
+        if file is not None:
+            file.close()
+    return paths
+
+
+class SymbolRegistry:
+    """Кэш символов из /exchangeInfo с индексами по name и по коду symbol.
+
+    Загружается один раз, по истечении ttl обновляется в фоновом потоке,
+    пока запросы продолжают обслуживаться из старых данных.
+    """
+
+    def __init__(self, loader=None, ttl: None|float = 300.0):
+        self._loader = loader  # функция, возвращающая ответ ExchangeInfo (None - данные передаются через load)
+        self.ttl = ttl
+        self.exchange_info: dict = {}
+        self._by_name: dict = {}
+        self._by_symbol: dict = {}
+        self._rules: dict = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self._loaded_at)
+
+    @property
+    def expired(self) -> bool:
+        return self.ttl is not None and time.monotonic() - self._loaded_at > self.ttl
+
+    def load(self, data: dict) -> bool:
+        """Перестроение индексов по данным /exchangeInfo."""
+        if not data or "symbols" not in data:
+            return False
+        by_name, by_symbol = {}, {}
+        for element in data["symbols"]:
+            by_name.setdefault(element.get("name"), element)
+            by_symbol[element.get("symbol")] = element
+        with self._lock:
+            self.exchange_info = data
+            self._by_name, self._by_symbol = by_name, by_symbol
+            self._rules = {}  # правила пересобираются по новым фильтрам при следующем обращении
+            self._loaded_at = time.monotonic()
+        return True
+
+    def refresh(self) -> bool:
+        """Синхронная загрузка /exchangeInfo и перестроение индексов."""
+        response = self._loader()
+        return self.load(response.get("data") if isinstance(response, dict) else None)
+
+    def refresh_async(self):
+        """Запуск обновления в фоне, если оно ещё не идёт."""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def worker():
+            try:
+                self.refresh()
+            except Exception:
+                pass  # остаёмся на старых данных до следующей попытки
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=worker, name="dzg-symbols", daemon=True).start()
+
+    def _ensure_loaded(self):
+        if not self.loaded:
+            self.refresh()
+        elif self.expired:
+            self.refresh_async()
+
+    def get(self, name: str) -> None|dict:
+        """Описание символа по name или по коду symbol."""
+        if self._loader is not None:
+            self._ensure_loaded()
+        return self._by_name.get(name) or self._by_symbol.get(name)
+
+    def symbol(self, name: str) -> None|str:
+        """Код symbol для запросов по name (или по самому коду)."""
+        element = self.get(name)
+        return element.get("symbol") if element else None
+
+    def rules(self, name: str) -> None|SymbolRules:
+        """Торговые правила символа (см. SymbolRules), строятся один раз на загрузку /exchangeInfo."""
+        element = self.get(name)
+        if element is None:
+            return None
+        code = element.get("symbol")
+        rules = self._rules.get(code)
+        if rules is None:
+            rules = self._rules[code] = SymbolRules(element)
+        return rules
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+
+class Endpoint:
+    """Описание эндпоинта API для общего конвейера запросов.
+
+    params - пары (аргумент метода, параметр запроса) в порядке следования в запросе;
+    account - добавлять ли accountId; url_key - ключ, под которым в ответ кладётся url;
+    idempotent - повтор запроса безопасен; idempotency_key - аргумент, при наличии которого
+    повтор безопасен и для неидемпотентного запроса (например, клиентский id ордера);
+    validated - ордер проверяется по SymbolRules до отправки;
+    model - имя модели из models для разбора ответа при включённых типизированных ответах;
+    cache_ttl - время хранения ответа в ResponseCache в секундах (0 - только объединение
+    одновременных запросов, None - без кэша); действует только для GET;
+    public - ответ не зависит от ключа API (рыночные данные): в ResponseCache он общий для всех
+    ключей, ответы остальных эндпоинтов кэшируются отдельно по api_key.
+    """
+
+    __slots__ = (
+        "path", "method", "signed", "weight", "unscoped_weight", "params", "account", "url_key",
+        "idempotent", "idempotency_key", "validated", "model", "cache_ttl", "public", "name",
+    )
+
+    def __init__(
+        self,
+        path: str,
+        method: str = "GET",
+        signed: bool = True,
+        weight: int = 1,
+        unscoped_weight: None|int = None,
+        params: tuple = (),
+        account: bool = False,
+        url_key: None|str = None,
+        idempotent: None|bool = None,
+        idempotency_key: None|str = None,
+        validated: bool = False,
+        model: None|str = None,
+        cache_ttl: None|float = None,
+        public: bool = False,
+        ):
+        self.path = path
+        self.method = method
+        self.signed = signed
+        self.weight = weight
+        self.unscoped_weight = unscoped_weight  # вес запроса без symbol (данные по всем инструментам)
+        self.params = params
+        self.account = account
+        self.url_key = url_key
+        self.idempotent = method == "GET" if idempotent is None else idempotent
+        self.idempotency_key = idempotency_key
+        self.validated = validated
+        self.model = model
+        self.cache_ttl = cache_ttl if method == "GET" else None
+        self.public = public
+        self.name = path  # заменяется ключом ENDPOINTS
+
+
+_SYMBOL = (("symbol", "symbol"),)
+_LEVERAGE_EDIT_PARAMS = (
+    ("exp_time", "expireTimestamp"),
+    ("new_price", "newPrice"),
+    ("take_profit", "takeProfit"),
+    ("guarant_stop_loss", "guaranteedStopLoss"),
+    ("stop_loss", "stopLoss"),
+    ("profit_distance", "profitDistance"),
+    ("stop_distance", "stopDistance"),
+    ("trailing_stop_loss", "trailingStopLoss"),
+)
+
+ENDPOINTS = {
+    "AccountInfo": Endpoint("account", weight=5),
+    "CancelOrder": Endpoint(
+        "order", "DELETE",
+        params=(("order_id", "orderId"), ("symbol", "symbol")),
+        account=True,
+        idempotent=True,
+        model="Order",
+    ),
+    "CreateOrder": Endpoint(
+        "order", "POST",
+        params=(
+            ("symbol", "symbol"),
+            ("side", "side"),
+            ("type_", "type"),
+            ("quantity", "quantity"),
+            ("resp_type", "newOrderRespType"),
+            ("price", "price"),
+            ("leverage", "leverage"),
+            ("stop_loss", "stopLoss"),
+            ("take_profit", "takeProfit"),
+            ("client_order_id", "newClientOrderId"),
+        ),
+        account=True,
+        url_key="url",
+        idempotency_key="client_order_id",
+        validated=True,
+        model="Order",
+    ),
+    "EditOrder": Endpoint(
+        "order", "POST",
+        params=(
+            ("order_id", "orderId"),
+            ("type_", "type"),
+            ("symbol", "symbol"),
+            ("side", "side"),
+            ("quantity", "quantity"),
+            ("price", "price"),
+            ("stop_loss", "stopLoss"),
+            ("take_profit", "takeProfit"),
+        ),
+        account=True,
+        validated=True,
+        model="Order",
+    ),
+    "ExchangeInfo": Endpoint("exchangeInfo", url_key="link", model="SymbolInfo", cache_ttl=10.0, public=True),
+    "Klines": Endpoint(
+        "klines",
+        params=(
+            ("symbol", "symbol"),
+            ("interval", "interval"),
+            ("start_time", "startTime"),
+            ("end_time", "endTime"),
+            ("limit", "limit"),
+            ("price_type", "priceType"),
+            ("type_", "type"),
+        ),
+        model="Kline",
+        public=True,
+    ),
+    "LeverageOrdersEdit": Endpoint(
+        "updateTradingOrder", "POST",
+        params=(("order_id", "orderId"),) + _LEVERAGE_EDIT_PARAMS,
+        account=True,
+        url_key="url",
+        idempotent=True,
+    ),
+    "LeverageTradeEdit": Endpoint(
+        "updateTradingPosition", "POST",
+        params=(("position_id", "positionId"),) + _LEVERAGE_EDIT_PARAMS,
+        account=True,
+        url_key="url",
+        idempotent=True,
+    ),
+    "ListOfCurrencies": Endpoint("currencies"),
+    "ListOfFees": Endpoint("tradingFees", signed=False, params=_SYMBOL),
+    "ListOfHistoricalPositions": Endpoint(
+        "tradingPositionsHistory",
+        weight=5,
+        params=(("symbol", "symbol"), ("from_", "from"), ("to", "to"), ("limit", "limit")),
+        url_key="url",
+        model="Position",
+    ),
+    "ListOfLeverageTrades": Endpoint("tradingPositions", weight=5, account=True, model="Position"),
+    "ListOfLimits": Endpoint("tradingLimits", signed=False, params=_SYMBOL),
+    "ListOfOpenOrders": Endpoint("openOrders", unscoped_weight=40, params=_SYMBOL, model="Order"),
+    "ListOfTrades": Endpoint(
+        "myTrades",
+        weight=5,
+        params=(("symbol", "symbol"), ("start_time", "startTime"), ("end_time", "endTime"), ("limit", "limit")),
+        model="Fill",
+    ),
+    "OrderBook": Endpoint("depth", params=_SYMBOL, cache_ttl=0.2, public=True),
+    "PriceChange": Endpoint("ticker/24hr", unscoped_weight=40, params=_SYMBOL, model="Ticker", cache_ttl=1.0, public=True),
+    "ServerTime": Endpoint("time", signed=False, cache_ttl=0.0, public=True),
+    "TradingPositionClose": Endpoint(
+        "closeTradingPosition", "POST",
+        params=(("position_id", "positionId"),),
+        account=True,
+    ),
+}
+
+
+for _name, _endpoint in ENDPOINTS.items():
+    _endpoint.name = _name
+
+
+class TokenBucket:
+    """Корзина токенов: capacity токенов, равномерно восполняемых за period секунд."""
+
+    def __init__(self, capacity: float, period: float):
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, cost: float, reserve: float = 0.0) -> float:
+        """Сколько секунд ждать, пока в корзине будет cost токенов сверх reserve."""
+        self._refill(time.monotonic())
+        missing = cost + reserve * self.capacity - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def consume(self, cost: float):
+        self.tokens -= cost
+
+
+class RateLimiter:
+    """Клиентский ограничитель частоты запросов по rateLimits из /exchangeInfo.
+
+    REQUEST_WEIGHT списывается весом эндпоинта, RAW_REQUESTS - единицей на запрос,
+    ORDERS - единицей на торговый запрос. Торговые запросы (выставление, изменение
+    и отмена ордеров) имеют приоритет: запросам рыночных данных недоступна доля
+    reserve каждой корзины, и они ждут, пока в очереди есть торговые запросы.
+    Один ограничитель может быть общим для нескольких ключей API: корзины ORDERS ведутся
+    отдельно по key, остальные (вес и число запросов) - общие для всех ключей.
+    """
+
+    HIGH = 0
+    LOW = 1
+    INTERVALS = {"SECOND": 1, "MINUTE": 60, "HOUR": 3600, "DAY": 86400}
+    ORDER_ENDPOINTS = {"order", "updateTradingOrder", "updateTradingPosition", "closeTradingPosition"}
+    ENDPOINT_WEIGHTS = {endpoint.path: endpoint.weight for endpoint in ENDPOINTS.values()}
+    # вес запросов без symbol, которые возвращают данные по всем инструментам
+    UNSCOPED_WEIGHTS = {endpoint.path: endpoint.unscoped_weight for endpoint in ENDPOINTS.values() if endpoint.unscoped_weight}
+    DEFAULT_LIMITS = [
+        {"rateLimitType": "REQUEST_WEIGHT", "interval": "MINUTE", "intervalNum": 1, "limit": 1200},
+        {"rateLimitType": "ORDERS", "interval": "SECOND", "intervalNum": 1, "limit": 10},
+    ]
+
+    def __init__(self, rate_limits: None|list = None, weights: None|dict = None, reserve: float = 0.2):
+        """rate_limits в формате rateLimits из /exchangeInfo (по умолчанию DEFAULT_LIMITS);
+        weights переопределяет веса эндпоинтов;
+        reserve доля корзины, доступная только торговым запросам;
+        """
+        self.weights = {**self.ENDPOINT_WEIGHTS, **(weights or {})}
+        self.reserve = reserve
+        self.used_weight: dict = {}  # суммарный вес по эндпоинтам
+        self.waited = 0.0  # суммарное время ожидания в секундах
+        self._lock = threading.Lock()
+        self._high_waiting = 0
+        self._blocked_until = 0.0
+        self._order_buckets: dict = {}  # key -> корзины ORDERS
+        self.configure(rate_limits or self.DEFAULT_LIMITS)
+
+    def configure(self, rate_limits: list):
+        """Пересоздание корзин по rateLimits из /exchangeInfo."""
+        with self._lock:
+            limits = [
+                (limit.get("rateLimitType"), float(limit["limit"]),
+                 self.INTERVALS.get(limit.get("interval"), 60) * int(limit.get("intervalNum", 1)))
+                for limit in rate_limits
+            ]
+            self._order_limits = [limit for limit in limits if limit[0] == "ORDERS"]
+            self._buckets = self._build([limit for limit in limits if limit[0] != "ORDERS"], getattr(self, "_buckets", []))
+            self._order_buckets = {
+                key: self._build(self._order_limits, buckets) for key, buckets in self._order_buckets.items()
+            }
+
+    @staticmethod
+    def _build(limits: list, previous: list) -> list:
+        """Корзины по (вид, ёмкость, период) с сохранением уже израсходованных токенов из previous."""
+        previous = {(kind, bucket.period): bucket for kind, bucket in previous}
+        buckets = []
+        for kind, capacity, period in limits:
+            bucket = TokenBucket(capacity, period)
+            if (kind, period) in previous:
+                # переносится уже израсходованная часть, а не остаток: при росте лимита токенов становится больше
+                old = previous[(kind, period)]
+                bucket.tokens = max(0.0, bucket.capacity - (old.capacity - old.tokens))
+            buckets.append((kind, bucket))
+        return buckets
+
+    def weight(self, path: str, query: str = "") -> int:
+        """Вес запроса к эндпоинту path."""
+        if path in self.UNSCOPED_WEIGHTS and "symbol=" not in query:
+            return self.UNSCOPED_WEIGHTS[path]
+        return self.weights.get(path, 1)
+
+    def priority(self, path: str) -> int:
+        return self.HIGH if path in self.ORDER_ENDPOINTS else self.LOW
+
+    def block(self, seconds: float):
+        """Остановка всех запросов на seconds (например, по Retry-After при 429)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def _try_acquire(self, path: str, weight: int, priority: int, key: None|str = None) -> float:
+        """Списание токенов, если их достаточно; иначе - время ожидания в секундах."""
+        with self._lock:
+            wait = self._blocked_until - time.monotonic()
+            if wait > 0:
+                return wait
+            buckets = self._buckets
+            if path in self.ORDER_ENDPOINTS:
+                if key not in self._order_buckets:
+                    self._order_buckets[key] = self._build(self._order_limits, [])
+                buckets = buckets + self._order_buckets[key]
+            reserve = self.reserve if priority != self.HIGH else 0.0
+            costs = []
+            for kind, bucket in buckets:
+                cost = weight if kind == "REQUEST_WEIGHT" else 1
+                wait = max(wait, bucket.delay(cost, reserve))
+                costs.append((bucket, cost))
+            if priority != self.HIGH and self._high_waiting:
+                wait = max(wait, 0.001)
+            if wait > 0:
+                return wait
+            for bucket, cost in costs:
+                bucket.consume(cost)
+            self.used_weight[path] = self.used_weight.get(path, 0) + weight
+            return 0.0
+
+    def acquire(self, path: str, query: str = "", priority: None|int = None, key: None|str = None) -> float:
+        """Блокирующее ожидание разрешения на запрос; возвращает время ожидания.
+        key - ключ API, по которому ведутся корзины ORDERS."""
+        weight = self.weight(path, query)
+        priority = self.priority(path) if priority is None else priority
+        waited = 0.0
+        wait = self._try_acquire(path, weight, priority, key)
+        queued = bool(wait) and priority == self.HIGH
+        if queued:
+            with self._lock:
+                self._high_waiting += 1
+        try:
+            while wait:
+                time.sleep(wait)
+                waited += wait
+                wait = self._try_acquire(path, weight, priority, key)
+        finally:
+            if queued:
+                with self._lock:
+                    self._high_waiting -= 1
+        self.waited += waited
+        return waited
+
+    async def acquire_async(self, path: str, query: str = "", priority: None|int = None, key: None|str = None) -> float:
+        """То же, что acquire, но без блокировки event loop."""
+        weight = self.weight(path, query)
+        priority = self.priority(path) if priority is None else priority
+        waited = 0.0
+        wait = self._try_acquire(path, weight, priority, key)
+        queued = bool(wait) and priority == self.HIGH
+        if queued:
+            with self._lock:
+                self._high_waiting += 1
+        try:
+            while wait:
+                await asyncio.sleep(wait)
+                waited += wait
+                wait = self._try_acquire(path, weight, priority, key)
+        finally:
+            if queued:
+                with self._lock:
+                    self._high_waiting -= 1
+        self.waited += waited
+        return waited
+
+
+def _retry_after(headers) -> float:
+    """Пауза из заголовка Retry-After (по умолчанию 1 секунда)."""
+    try:
+        return float(headers.get("Retry-After", 1))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def _unsent(error) -> bool:
+    """Ошибка requests, при которой соединение не было установлено и запрос не отправлен:
+    таймаут соединения или отказ в соединении/разрешении имени. Разрыв соединения после
+    отправки (ProtocolError, RemoteDisconnected) сюда не относится - сервер мог обработать запрос.
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.exceptions.ConnectionError) or not error.args:
+        return False
+    from urllib3.exceptions import NewConnectionError  # NameResolutionError - его подкласс
+
+    reason = getattr(error.args[0], "reason", error.args[0])  # MaxRetryError.reason
+    return isinstance(reason, NewConnectionError)
+
+
+class RetryPolicy:
+    """Политика повторов при временных сбоях: экспоненциальная задержка с полным джиттером.
+
+    Запрос, который гарантированно не дошёл до сервера (соединение не установлено, 429),
+    повторяется всегда. После разрыва соединения, таймаута чтения или 5xx повторяются только идемпотентные
+    запросы (Endpoint.idempotent) и запросы с ключом идемпотентности (например, CreateOrder
+    с client_order_id), чтобы повтор не создал второй ордер.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    UNSENT = "unsent"  # запрос не был обработан сервером
+    FAILED = "failed"  # результат запроса неизвестен
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.2, max_delay: float = 5.0):
+        """attempts максимальное число попыток (1 - без повторов);
+        base_delay, max_delay начальная и максимальная задержка в секундах;
+        """
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """Пауза перед повтором номер attempt (с нуля)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def classify(self, status_code: None|int) -> None|str:
+        """Вид сбоя по HTTP-статусу: UNSENT, FAILED или None, если повтор бессмыслен."""
+        if status_code == 429:
+            return self.UNSENT
+        if status_code in self.RETRY_STATUSES:
+            return self.FAILED
+        return None
+
+    def should_retry(self, endpoint: Endpoint, params: dict, failure: None|str, attempt: int) -> bool:
+        if failure is None or attempt + 1 >= self.attempts:
+            return False
+        if failure == self.UNSENT or endpoint.idempotent:
+            return True
+        return bool(endpoint.idempotency_key and params.get(endpoint.idempotency_key))
+
+
+class CircuitBreaker:
+    """Размыкатель цепи для хоста API.
+
+    После failure_threshold сбоев подряд (ошибки соединения, таймауты, 5xx) запросы
+    отклоняются без отправки в течение reset_timeout секунд; затем пропускается один
+    пробный запрос, и цепь замыкается при его успехе.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Можно ли отправлять запрос сейчас."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True  # пробный запрос
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class ClockSync:
+    """Оценка смещения локальных часов относительно сервера по /time.
+
+    offset (мс) = время сервера - локальное время в середине запроса; сглаживается
+    экспоненциально, замеры с аномально большим временем ответа отбрасываются.
+    """
+
+    def __init__(self, interval: None|float = 60.0, alpha: float = 0.3):
+        """interval период фоновой синхронизации в секундах (None - только вручную через sync);
+        alpha коэффициент сглаживания;
+        """
+        self.interval = interval
+        self.alpha = alpha
+        self.offset = 0.0
+        self.rtt = None
+        self.samples = 0
+        self.synced_at = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def add_sample(self, sent: float, server_ms: float, received: float):
+        """Учёт замера: sent и received - локальное время (сек) отправки и получения ответа /time."""
+        rtt = (received - sent) * 1000
+        offset = server_ms - (sent + received) * 500
+        with self._lock:
+            if self.rtt is None:
+                self.offset, self.rtt = offset, rtt
+            else:
+                is_outlier = rtt > 2 * self.rtt + 50  # задержка в сети искажает смещение
+                self.rtt += self.alpha * (rtt - self.rtt)
+                if is_outlier:
+                    return
+                self.offset += self.alpha * (offset - self.offset)
+            self.samples += 1
+            self.synced_at = time.monotonic()
+
+    def sync(self, server_time) -> bool:
+        """Один замер; server_time - функция, возвращающая ответ ServerTime."""
+        sent = time.time()
+        response = server_time()
+        received = time.time()
+        server_ms = (response.get("data") or {}).get("serverTime")
+        if server_ms is None:
+            return False
+        self.add_sample(sent, server_ms, received)
+        return True
+
+    def start(self, server_time):
+        """Запуск фоновой синхронизации (однократно)."""
+        with self._lock:
+            if self._thread is not None or self.interval is None:
+                return
+            self._thread = threading.Thread(target=self._run, args=(server_time,), name="dzg-clock", daemon=True)
+        self._thread.start()
+
+    def _run(self, server_time):
+        while not self._stop.is_set():
+            try:
+                self.sync(server_time)
+            except Exception:
+                pass  # до следующей попытки используем прежнюю оценку
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def stale(self) -> bool:
+        return self.interval is not None and time.monotonic() - self.synced_at > self.interval
+
+    def now_ms(self) -> int:
+        """Текущее время сервера в миллисекундах по локальным часам и смещению."""
+        return int(time.time() * 1000 + self.offset)
+
+
+class LocalOrderBook:
+    """Локальный стакан с упорядоченными уровнями цен.
+
+    Цены каждой стороны хранятся в отсортированном списке (поиск уровня - бисекция),
+    объёмы - в словаре цена -> объём. Обновляется сравнением последовательных снимков
+    /depth (apply_snapshot) или дельтами из потока (apply_updates).
+
+    Поиск уровня - O(log n), но вставка и удаление уровня в apply_updates сдвигают список - O(n).
+    Для глубины стаканов биржи (десятки - сотни уровней) такой сдвиг дешевле дерева или кучи
+    на чистом Python; apply_snapshot пересобирает список цен одной сортировкой, а не вставками.
+    """
+
+    def __init__(self, symbol: None|str = None):
+        self.symbol = symbol
+        self.updated_at = 0.0
+        self._prices = {"bids": [], "asks": []}  # по возрастанию цены
+        self._volumes = {"bids": {}, "asks": {}}
+        self._lock = threading.Lock()
+
+    def _set(self, side: str, price: float, qty: float):
+        prices, volumes = self._prices[side], self._volumes[side]
+        if qty > 0:
+            if price not in volumes:
+                prices.insert(bisect_left(prices, price), price)
+            volumes[price] = qty
+        elif price in volumes:
+            del volumes[price]
+            del prices[bisect_left(prices, price)]
+
+    def apply_updates(self, bids: list = (), asks: list = ()):
+        """Применение дельт [[цена, объём], ...]; объём 0 удаляет уровень."""
+        with self._lock:
+            for side, levels in (("bids", bids), ("asks", asks)):
+                for price, qty in levels:
+                    self._set(side, float(price), float(qty))
+            self.updated_at = time.time()
+
+    def apply_snapshot(self, data: dict) -> int:
+        """Приведение стакана к снимку /depth; меняются только отличающиеся уровни.
+        Возвращает число изменённых уровней."""
+        changed = 0
+        with self._lock:
+            for side in ("bids", "asks"):
+                snapshot = {float(price): float(qty) for price, qty in data.get(side, []) if float(qty) > 0}
+                volumes = self._volumes[side]
+                removed = [price for price in volumes if price not in snapshot]
+                updated = [price for price, qty in snapshot.items() if volumes.get(price) != qty]
+                if removed or any(price not in volumes for price in updated):
+                    # состав уровней изменился - одна сортировка вместо вставок и удалений по одному
+                    self._volumes[side] = snapshot
+                    self._prices[side] = sorted(snapshot)
+                else:
+                    volumes.update((price, snapshot[price]) for price in updated)
+                changed += len(removed) + len(updated)
+            self.updated_at = time.time()
+        return changed
+
+    def best_bid(self) -> None|tuple:
+        """(цена, объём) лучшей заявки на покупку."""
+        with self._lock:
+            prices = self._prices["bids"]
+            return (prices[-1], self._volumes["bids"][prices[-1]]) if prices else None
+
+    def best_ask(self) -> None|tuple:
+        """(цена, объём) лучшей заявки на продажу."""
+        with self._lock:
+            prices = self._prices["asks"]
+            return (prices[0], self._volumes["asks"][prices[0]]) if prices else None
+
+    def mid(self) -> None|float:
+        bid, ask = self.best_bid(), self.best_ask()
+        return (bid[0] + ask[0]) / 2 if bid and ask else None
+
+    def spread(self) -> None|float:
+        bid, ask = self.best_bid(), self.best_ask()
+        return ask[0] - bid[0] if bid and ask else None
+
+    def depth_at(self, price: float) -> float:
+        """Объём на уровне price (с любой стороны), 0 если уровня нет."""
+        with self._lock:
+            return self._volumes["bids"].get(price) or self._volumes["asks"].get(price) or 0.0
+
+    def levels(self, side: str, count: None|int = None) -> list:
+        """Лучшие count уровней стороны bids/asks в виде [(цена, объём), ...] от лучшего."""
+        with self._lock:
+            prices = self._prices[side]
+            ordered = prices[::-1] if side == "bids" else prices
+            ordered = ordered[:count] if count is not None else ordered
+            return [(price, self._volumes[side][price]) for price in ordered]
+
+    def cumulative_volume(self, side: str, price: None|float = None, count: None|int = None) -> float:
+        """Суммарный объём стороны от лучшей цены до price включительно (или по count уровням)."""
+        with self._lock:
+            prices = self._prices[side]
+            if price is not None:
+                # bids - уровни не ниже price, asks - уровни не выше price
+                prices = prices[bisect_left(prices, price):] if side == "bids" else prices[:bisect_right(prices, price)]
+            if count is not None:
+                prices = prices[-count:] if side == "bids" else prices[:count]
+            volumes = self._volumes[side]
+            return sum(volumes[level] for level in prices)
+
+    def __len__(self):
+        return len(self._prices["bids"]) + len(self._prices["asks"])
+
+
+class AccountState:
+    """Локальное состояние аккаунта: балансы, открытые позиции и ордера.
+
+    Обновляется в фоне раз в interval секунд (запросами /account, /tradingPositions и /openOrders)
+    и сразу по подтверждениям собственных запросов (apply). Снимки неизменяемы: каждое
+    обновление публикует новый словарь, поэтому чтение не блокируется и всегда согласовано.
+    """
+
+    SECTIONS = (("balances", "asset"), ("positions", "id"), ("orders", "orderId"))
+    # запросы, меняющие состояние аккаунта
+    TRACKED = ("CreateOrder", "CancelOrder", "EditOrder", "LeverageOrdersEdit", "LeverageTradeEdit", "TradingPositionClose")
+    JOURNAL_TTL = 60.0  # секунды; загрузка, идущая дольше, не получит более старые подтверждения
+
+    def __init__(self, loader=None, interval: None|float = 5.0):
+        """loader - функция, возвращающая ответы (AccountInfo, ListOfLeverageTrades, ListOfOpenOrders);
+        interval период фонового обновления в секундах (None - только вручную через refresh);
+        """
+        self._loader = loader
+        self.interval = interval
+        self._state = {"balances": {}, "positions": {}, "orders": {}, "version": 0, "updated_at": 0.0}
+        self._lock = threading.Lock()
+        self._journal = deque()  # (время, раздел, ключ, запись или None - удалена) по подтверждениям apply
+        self._loaded_from = 0.0  # время начала загрузки опубликованного снимка
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self._state["updated_at"])
+
+    @property
+    def stale(self) -> bool:
+        return self.interval is not None and time.monotonic() - self._state["updated_at"] > 2 * self.interval
+
+    def snapshot(self) -> dict:
+        """Согласованный снимок {"balances", "positions", "orders", "version", "updated_at"}; изменять его нельзя."""
+        return self._state
+
+    def _publish(self, **sections):
+        # вызывается под self._lock: новое состояние собирается целиком и подменяет прежнее
+        state = dict(self._state, **sections)
+        state["version"] += 1
+        state["updated_at"] = time.monotonic()
+        self._state = state
+
+    def load(self, account: dict, positions, orders: list, started: None|float = None) -> int:
+        """Сверка с ответами /account, /tradingPositions и /openOrders; меняются только отличающиеся разделы.
+        started - время начала загрузки (time.monotonic()): подтверждения собственных запросов, пришедшие
+        после него, накладываются на загруженные данные, а загрузка, начатая раньше уже опубликованной,
+        отбрасывается. Возвращает число изменённых записей."""
+        if isinstance(positions, dict):
+            positions = positions.get("positions")
+        fresh = {
+            "balances": account.get("balances") or [],
+            "positions": positions or [],
+            "orders": orders or [],
+        }
+        fresh = {section: {entry.get(key): entry for entry in fresh[section]} for section, key in self.SECTIONS}
+        with self._lock:
+            if started is not None:
+                if started < self._loaded_from:
+                    return 0
+                self._loaded_from = started
+                self._journal = deque(change for change in self._journal if change[0] > started)
+                for _, section, name, entry in self._journal:
+                    if entry is None:
+                        fresh[section].pop(name, None)
+                    else:
+                        fresh[section][name] = entry
+            changed, sections = 0, {}
+            for section, _ in self.SECTIONS:
+                current = self._state[section]
+                entries = fresh[section]
+                delta = sum(current.get(name) != entry for name, entry in entries.items())
+                delta += sum(name not in entries for name in current)
+                if delta:
+                    sections[section] = entries
+                    changed += delta
+            if sections or not self.loaded:
+                self._publish(**sections)
+            else:
+                self._state = dict(self._state, updated_at=time.monotonic())
+        return changed
+
+    @property
+    def dirty(self) -> bool:
+        """Запрошено досрочное обновление (после подтверждений, которые нельзя учесть локально)."""
+        return self._wake.is_set()
+
+    def begin_refresh(self) -> float:
+        """Отметка начала загрузки; результат передаётся в load как started."""
+        self._wake.clear()
+        return time.monotonic()
+
+    def refresh(self) -> bool:
+        """Синхронная загрузка состояния через loader."""
+        started = self.begin_refresh()
+        account, positions, orders = self._loader()
+        if "error" in account or "error" in positions or "error" in orders:
+            return False
+        self.load(account["data"], positions["data"], orders["data"], started)
+        return True
+
+    def apply(self, name: str, params: dict, response: dict):
+        """Учёт ответа собственного запроса name (имя из ENDPOINTS) без обращения к API.
+        Изменения, которые нельзя вывести из ответа (исполнение ордера, P&L), запрашивают досрочное обновление."""
+        if name not in self.TRACKED or "error" in response:
+            return
+        data = response.get("data") or {}
+        with self._lock:
+            if name == "CreateOrder" and data.get("status") in ("NEW", "PARTIALLY_FILLED"):
+                self._change("orders", data["orderId"], data)
+                if data["status"] == "NEW":
+                    return
+            elif name == "CancelOrder":
+                self._change("orders", params.get("order_id"), None)
+                return
+            elif name == "TradingPositionClose":
+                self._change("positions", params.get("position_id"), None)
+        self._wake.set()
+
+    def _change(self, section: str, name, entry: None|dict):
+        # вызывается под self._lock; изменение запоминается, чтобы наложить его на загрузку, идущую сейчас.
+        # Записи не новее начала опубликованной загрузки или старше JOURNAL_TTL уже не нужны ни одной загрузке
+        now = time.monotonic()
+        horizon = max(self._loaded_from, now - self.JOURNAL_TTL)
+        while self._journal and self._journal[0][0] <= horizon:
+            self._journal.popleft()
+        self._journal.append((now, section, name, entry))
+        entries = dict(self._state[section])
+        if entry is not None:
+            entries[name] = entry
+        elif entries.pop(name, None) is None:
+            return
+        self._publish(**{section: entries})
+
+    def balance(self, asset: str) -> None|dict:
+        """Запись баланса по коду валюты asset."""
+        return self._state["balances"].get(asset)
+
+    def free(self, asset: str) -> float:
+        """Свободный остаток asset (0, если валюты нет)."""
+        balance = self._state["balances"].get(asset)
+        return float(balance.get("free") or 0) if balance else 0.0
+
+    def positions(self, symbol: None|str = None) -> list:
+        """Открытые позиции (по symbol или все)."""
+        positions = self._state["positions"].values()
+        return [position for position in positions if symbol is None or position.get("symbol") == symbol]
+
+    def open_orders(self, symbol: None|str = None) -> list:
+        """Открытые ордера (по symbol или все)."""
+        orders = self._state["orders"].values()
+        return [order for order in orders if symbol is None or order.get("symbol") == symbol]
+
+    def start(self):
+        """Запуск фонового обновления (однократно)."""
+        with self._lock:
+            if self._thread is not None or self.interval is None:
+                return
+            self._thread = threading.Thread(target=self._run, name="dzg-account", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                pass  # до следующей попытки читаем прежнее состояние
+            self._wake.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+
+def _record(item) -> dict:
+    """Словарь из записи ответа: модели (models) переводятся обратно в ключи JSON."""
+    return item.to_dict() if hasattr(item, "to_dict") else dict(item)
+
+
+class OrderTracker:
+    """Отслеживание жизненного цикла ордеров одним опросом на аккаунт вместо опроса каждого ордера.
+
+    Ордера регистрируются по ответам CreateOrder/EditOrder (apply). Цикл опроса: /openOrders
+    (по символам или одним запросом - что дешевле по весу), для исчезнувших из него ордеров - сверка
+    с /myTrades (исполнен полностью или отменён), для исполненных ордеров со stopLoss/takeProfit -
+    слежение за позицией по /tradingPositions, а когда её там нет - поиск по orderId в
+    /tradingPositionsHistory (не найденная за MAX_MISSES опросов позиция снимается с слежения).
+    Интервал опроса - fast сразу после регистрации и растёт в backoff раз после каждого опроса
+    без изменений, до slow.
+
+    События: "fill", "partial_fill", "cancel" (запись ордера), "stop_loss", "take_profit", "close"
+    (запись позиции); обработчики on(событие, callback) вызываются как callback(событие, запись),
+    их исключения записываются в журнал logging и не прерывают запрос или опрос.
+    """
+
+    EVENTS = ("fill", "partial_fill", "cancel", "stop_loss", "take_profit", "close")
+    MAX_MISSES = 3
+    PAGE = 1000  # размер страницы /myTrades при сверке исчезнувших ордеров
+
+    def __init__(self, call=None, weight=None, fast: float = 0.5, slow: float = 10.0, backoff: float = 2.0):
+        """call - функция, выполняющая список вызовов [(метод клиента, kwargs)] и возвращающая ответы
+        в том же порядке (для фонового опроса в потоке; AsyncTrade передаёт свою функцию в poll_async);
+        weight - RateLimiter.weight для выбора между запросами /openOrders по символам и по всему аккаунту;
+        fast, slow - границы интервала опроса в секундах, backoff - множитель интервала;
+        """
+        self._call = call
+        self._weight = weight
+        self.fast = fast
+        self.slow = slow
+        self.backoff = backoff
+        self.interval = slow
+        self._due = 0.0  # время (time.monotonic()) следующего опроса
+        self.orders: dict = {}  # orderId -> последняя известная запись открытого ордера
+        self.positions: dict = {}  # orderId исполненного ордера -> позиция (None, пока не найдена)
+        self.done: dict = {}  # orderId -> итоговая запись исполненного или отменённого ордера
+        self._misses: dict = {}  # orderId -> число опросов, не нашедших закрытую позицию в истории
+        self._callbacks = {event: [] for event in self.EVENTS}
+        self._lock = threading.Lock()
+        self._finished = threading.Condition(self._lock)
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def on(self, event: str, callback):
+        """Регистрация обработчика события (можно использовать как декоратор через functools.partial)."""
+        if event not in self._callbacks:
+            raise ValueError(f"unknown event {event!r}, expected one of {self.EVENTS}")
+        self._callbacks[event].append(callback)
+        return callback
+
+    @property
+    def active(self) -> bool:
+        return bool(self.orders or self.positions)
+
+    def _emit(self, events: list):
+        # ошибка обработчика не должна прерывать запрос, на который пришёл ответ (CreateOrder и т. п.)
+        for event, record in events:
+            for callback in self._callbacks[event]:
+                try:
+                    result = callback(event, record)
+                    if hasattr(result, "__await__"):
+                        asyncio.ensure_future(self._await(event, result))  # корутина-обработчик в AsyncTrade
+                except Exception:
+                    logging.getLogger(__name__).exception("OrderTracker callback for %r failed", event)
+
+    @staticmethod
+    async def _await(event: str, result):
+        try:
+            await result
+        except Exception:
+            logging.getLogger(__name__).exception("OrderTracker callback for %r failed", event)
+
+    def _finish(self, order: dict, event: str, events: list):
+        # вызывается под self._lock
+        self.orders.pop(order["orderId"], None)
+        self.done[order["orderId"]] = order
+        events.append((event, order))
+        if event == "fill" and (order.get("stopLoss") or order.get("takeProfit")):
+            self.positions[order["orderId"]] = None
+        self._finished.notify_all()
+
+    def register(self, order) -> list:
+        """Постановка ордера на отслеживание по записи из ответа CreateOrder/EditOrder.
+        Уже исполненный ордер (MARKET) сразу даёт событие fill. Возвращает список событий."""
+        order = _record(order)
+        events = []
+        with self._lock:
+            was_active = self.active
+            if order.get("status") == "FILLED":
+                self._finish(order, "fill", events)
+            elif order.get("status") in ("NEW", "PARTIALLY_FILLED"):
+                self.orders[order["orderId"]] = order
+            self.interval = self.fast
+            due = time.monotonic() + self.fast
+            self._due = min(self._due, due) if was_active else due
+        self._wake.set()
+        self._emit(events)
+        return events
+
+    def apply(self, name: str, params: dict, response: dict):
+        """Учёт ответа собственного запроса name (имя из ENDPOINTS)."""
+        if "error" in response or name not in ("CreateOrder", "EditOrder", "CancelOrder"):
+            return
+        data = _record(response.get("data") or {})
+        if name == "CancelOrder":
+            events = []
+            with self._lock:
+                order = self.orders.get(params.get("order_id"))
+                if order is not None:
+                    self._finish(dict(order, **{**data, "status": "CANCELED"}), "cancel", events)
+            self._emit(events)
+            return
+        for key, arg in (("stopLoss", "stop_loss"), ("takeProfit", "take_profit")):
+            if data.get(key) is None and params.get(arg) is not None:
+                data[key] = params[arg]  # уровни нужны для слежения за позицией, но не всегда есть в ответе
+        if name == "EditOrder" and data.get("orderId") != params.get("order_id"):
+            with self._lock:
+                self.orders.pop(params.get("order_id"), None)
+        self.register(data)
+
+    def _open_orders_calls(self) -> list:
+        symbols = sorted({order["symbol"] for order in self.orders.values()})
+        path = ENDPOINTS["ListOfOpenOrders"].path
+        if self._weight is not None and len(symbols) * self._weight(path, "symbol=") < self._weight(path):
+            return [("ListOfOpenOrders", {"symbol": symbol}) for symbol in symbols]
+        return [("ListOfOpenOrders", {})]
+
+    def cycle(self):
+        """Один цикл опроса как генератор: отдаёт списки вызовов [(метод, kwargs)], принимает списки
+        ответов и возвращает (StopIteration.value) список событий. Так один и тот же цикл выполняют
+        поток Trade и задача AsyncTrade."""
+        events = []
+        with self._lock:
+            orders = dict(self.orders)
+        if orders:
+            responses = yield self._open_orders_calls()
+            if any("error" in response for response in responses):
+                return events
+            listed = {}
+            for response in responses:
+                for item in response["data"]:
+                    item = _record(item)
+                    listed[item["orderId"]] = item
+            vanished = {order_id: order for order_id, order in orders.items() if order_id not in listed}
+            fills = {}
+            if vanished:
+                starts = {}
+                for order in vanished.values():
+                    starts.setdefault(order["symbol"], []).append(order.get("transactTime") or order.get("time"))
+                # страницы /myTrades по всем символам сразу, как в Trade._iter_history: следующая страница
+                # начинается с времени последней сделки, уже учтённые сделки на границе отбрасываются по id
+                pages = {symbol: (None if None in times else min(times), set()) for symbol, times in starts.items()}
+                while pages:
+                    calls = [
+                        ("ListOfTrades", {"symbol": symbol, "start_time": cursor, "limit": self.PAGE})
+                        for symbol, (cursor, _) in pages.items()
+                    ]
+                    responses = yield calls
+                    if any("error" in response for response in responses):
+                        return events
+                    following = {}
+                    for (symbol, (cursor, seen)), response in zip(pages.items(), responses):
+                        page = sorted(map(_record, response["data"]), key=lambda trade: trade["time"])
+                        fresh = [trade for trade in page if trade["id"] not in seen]
+                        for trade in fresh:
+                            quantity, notional = fills.get(trade["orderId"], (0.0, 0.0))
+                            fills[trade["orderId"]] = (quantity + float(trade["qty"]), notional + float(trade["qty"]) * float(trade["price"]))
+                        if len(page) >= self.PAGE and fresh:
+                            last = fresh[-1]["time"]
+                            boundary = {trade["id"] for trade in fresh if trade["time"] == last}
+                            following[symbol] = (last, seen | boundary if last == cursor else boundary)
+                    pages = following
+            with self._lock:
+                for order_id, item in listed.items():
+                    order = self.orders.get(order_id)
+                    if order is not None and float(item.get("executedQty") or 0) > float(order.get("executedQty") or 0):
+                        order = self.orders[order_id] = dict(order, **item)
+                        events.append(("partial_fill", order))
+                for order_id, order in vanished.items():
+                    if order_id not in self.orders:
+                        continue  # уже учтён по ответу CancelOrder
+                    quantity, notional = fills.get(order_id, (0.0, 0.0))
+                    order = dict(order, executedQty=quantity)
+                    if quantity:
+                        order["avgPrice"] = notional / quantity
+                    if quantity >= float(order["origQty"]) * (1 - 1e-9):
+                        self._finish(dict(order, status="FILLED"), "fill", events)
+                    else:
+                        if quantity > float(self.orders[order_id].get("executedQty") or 0):
+                            events.append(("partial_fill", order))
+                        self._finish(dict(order, status="CANCELED"), "cancel", events)
+        with self._lock:
+            watched = dict(self.positions)
+        if watched:
+            responses = yield [("ListOfLeverageTrades", {})]
+            if "error" in responses[0]:
+                return events
+            data = responses[0]["data"] or {}
+            current = {position.get("orderId"): position for position in map(_record, data.get("positions") or [])}
+            missing = {}
+            with self._lock:
+                for order_id in watched:
+                    if order_id in current:
+                        self.positions[order_id] = current[order_id]
+                        self._misses.pop(order_id, None)
+                    elif order_id in self.positions:
+                        # позиция закрыта или открылась и закрылась между опросами
+                        missing[order_id] = self.positions[order_id] or self.done.get(order_id) or {}
+            if missing:
+                calls = [
+                    ("ListOfHistoricalPositions", {
+                        "symbol": record.get("symbol"),
+                        "from_": record.get("openTimestamp") or record.get("transactTime") or record.get("time"),
+                    })
+                    for record in missing.values()
+                ]
+                responses = yield calls
+                with self._lock:
+                    for (order_id, record), response in zip(missing.items(), responses):
+                        if "error" in response:
+                            continue
+                        history = map(_record, (response["data"] or {}).get("history") or [])
+                        final = next((item for item in history if item.get("orderId") == order_id
+                                      or record.get("id") and item.get("id") == record.get("id")), None)
+                        if final is None:
+                            # в истории позиции ещё нет - несколько попыток, затем слежение прекращается
+                            self._misses[order_id] = self._misses.get(order_id, 0) + 1
+                            if self._misses[order_id] < self.MAX_MISSES:
+                                continue
+                        self.positions.pop(order_id, None)
+                        self._misses.pop(order_id, None)
+                        if final is not None:
+                            final = dict(final, orderId=final.get("orderId") or order_id)
+                            events.append((self._close_reason(self.done.get(order_id) or {}, final), final))
+        return events
+
+    @staticmethod
+    def _close_reason(order: dict, position: dict) -> str:
+        """stop_loss или take_profit, если цена закрытия достигла уровня ордера, иначе close."""
+        price = float(position.get("closePrice") or 0)
+        long = float(position.get("openQuantity") or 0) > 0
+        stop_loss = position.get("stopLoss") or order.get("stopLoss")
+        take_profit = position.get("takeProfit") or order.get("takeProfit")
+        if stop_loss and (price <= float(stop_loss) if long else price >= float(stop_loss)):
+            return "stop_loss"
+        if take_profit and (price >= float(take_profit) if long else price <= float(take_profit)):
+            return "take_profit"
+        return "close"
+
+    def _adapt(self, events: list):
+        with self._lock:
+            self.interval = self.fast if events else min(self.interval * self.backoff, self.slow)
+            self._due = time.monotonic() + self.interval
+
+    def delay(self) -> None|float:
+        """Секунды до следующего опроса (0 - пора), None - отслеживать нечего."""
+        if not self.active:
+            return None
+        return max(0.0, self._due - time.monotonic())
+
+    def poll(self) -> list:
+        """Синхронный цикл опроса через call; возвращает события (обработчики уже вызваны).
+        При сбое опроса следующий откладывается по backoff, исключение пробрасывается."""
+        steps = self.cycle()
+        try:
+            calls = next(steps)
+            while True:
+                calls = steps.send(self._call(calls))
+        except StopIteration as stop:
+            events = stop.value
+        except Exception:
+            self._adapt([])
+            raise
+        self._adapt(events)
+        self._emit(events)
+        return events
+
+    async def poll_async(self, call) -> list:
+        """Асинхронный вариант poll: call - корутина-функция, выполняющая список вызовов
+        [(метод, kwargs)] и возвращающая ответы в том же порядке (AsyncTrade.PollOrders)."""
+        steps = self.cycle()
+        try:
+            calls = next(steps)
+            while True:
+                calls = steps.send(await call(calls))
+        except StopIteration as stop:
+            events = stop.value
+        except Exception:
+            self._adapt([])
+            raise
+        self._adapt(events)
+        self._emit(events)
+        return events
+
+    def wait(self, order_id: str, timeout: None|float = None) -> None|dict:
+        """Ожидание исполнения или отмены ордера; итоговая запись или None по таймауту."""
+        with self._finished:
+            self._finished.wait_for(lambda: order_id in self.done, timeout)
+            return self.done.get(order_id)
+
+    def start(self):
+        """Запуск фонового опроса (однократно)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="dzg-orders", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.delay())
+            self._wake.clear()
+            if self._stop.is_set() or self.delay() != 0:
+                continue
+            try:
+                self.poll()
+            except Exception:
+                pass  # сбой опроса - повтор позже (poll уже отложил его)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+
+def _clone(value):
+    """Глубокая копия ответа: словари и списки JSON копируются напрямую (быстрее copy.deepcopy),
+    прочее (модели из models) - через copy.deepcopy."""
+    if isinstance(value, dict):
+        return {key: _clone(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_clone(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return copy.deepcopy(value)
+
+
+class ResponseCache:
+    """Кэш ответов GET-эндпоинтов с объединением одинаковых одновременных запросов.
+
+    Одинаковые запросы (эндпоинт и параметры), пришедшие, пока первый ещё выполняется,
+    ждут его ответа вместо отправки своего. Успешные ответы хранятся cache_ttl эндпоинта
+    (ttls переопределяет по имени; 0 - только объединение), не больше max_entries записей
+    с вытеснением давно не читанных. Запросы кроме GET не кэшируются и не объединяются.
+    Хранится отдельная глубокая копия ответа, и каждый вызов получает свою копию, так что
+    изменение ответа одним получателем не видно другим.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttls: None|dict = None):
+        self.max_entries = max_entries
+        self.ttls = ttls or {}
+        self.hits = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()  # ключ -> (истекает, эндпоинт, symbol, ответ), от давних к свежим
+        self._inflight: dict = {}  # ключ -> [Event, ответ] для Trade
+        self._pending: dict = {}  # ключ -> Future для AsyncTrade
+        self._lock = threading.Lock()
+
+    def ttl(self, endpoint: Endpoint) -> None|float:
+        """Время хранения ответа endpoint; None - запрос идёт мимо кэша."""
+        if endpoint.method != "GET":
+            return None
+        return self.ttls.get(endpoint.name, endpoint.cache_ttl)
+
+    def _lookup(self, key) -> None|dict:
+        # вызывается под self._lock
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return _clone(entry[3])
+
+    def _store(self, key, ttl: float, name: str, symbol: None|str, result: dict):
+        # вызывается под self._lock; result - уже отдельная копия ответа
+        if not ttl or "error" in result:
+            return
+        self._entries[key] = (time.monotonic() + ttl, name, symbol, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def fetch(self, key, ttl: float, request, name: str, symbol: None|str = None) -> dict:
+        """Ответ из кэша, ответ уже идущего такого же запроса или результат request()."""
+        with self._lock:
+            result = self._lookup(key)
+            if result is not None:
+                return result
+            waiter = self._inflight.get(key)
+            owner = waiter is None
+            if owner:
+                waiter = self._inflight[key] = [threading.Event(), None]
+            else:
+                self.coalesced += 1
+        if not owner:
+            waiter[0].wait()
+            return _clone(waiter[1]) if waiter[1] is not None else request()
+        result = None
+        try:
+            result = request()
+            waiter[1] = _clone(result)  # копия для ожидающих и кэша, result остаётся у владельца
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                if waiter[1] is not None:
+                    self._store(key, ttl, name, symbol, waiter[1])
+            waiter[0].set()
+        return result
+
+    async def fetch_async(self, key, ttl: float, request, name: str, symbol: None|str = None) -> dict:
+        """То же, что fetch, для корутины request()."""
+        with self._lock:
+            result = self._lookup(key)
+            if result is not None:
+                return result
+            future = self._pending.get(key)
+            if future is not None:
+                self.coalesced += 1
+        if future is not None:
+            return _clone(await asyncio.shield(future))
+        future = self._pending[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await request()
+        except BaseException as ex:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(ex)
+            future.exception()  # ожидающих может не быть: исключение считается полученным
+            raise
+        shared = _clone(result)
+        with self._lock:
+            del self._pending[key]
+            self._store(key, ttl, name, symbol, shared)
+        future.set_result(shared)
+        return result
+
+    def invalidate(self, names: None|tuple = None, symbol: None|str = None):
+        """Удаление записей эндпоинтов names (None - всех) по symbol; записи без symbol
+        (данные по всем инструментам) удаляются при любом symbol."""
+        with self._lock:
+            for key in [
+                key for key, (_, name, entry_symbol, _) in self._entries.items()
+                if (names is None or name in names) and (symbol is None or entry_symbol in (symbol, None))
+            ]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class Histogram:
+    """Гистограмма значений (мс) с фиксированными границами корзин."""
+
+    BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: tuple = BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # последняя корзина - больше всех границ
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> None|float:
+        """Оценка квантиля q сверху - граница корзины, в которую он попадает (inf для последней)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    """Реестр метрик запросов в памяти процесса.
+
+    По каждому эндпоинту (имя из ENDPOINTS) собираются гистограммы времени по фазам PHASES
+    и счётчики запросов, ошибок (по коду ответа), повторов и переданных байт.
+    Экспорт - to_dict (JSON) и to_prometheus (текстовый формат Prometheus).
+    """
+
+    # total - вся попытка, wait - ожидание RateLimiter, dns и connect - разрешение имени и установка
+    # соединения с TLS (только AsyncTrade), server - от отправки до заголовков ответа, parse - разбор тела
+    PHASES = ("total", "wait", "dns", "connect", "server", "parse")
+
+    def __init__(self, buckets: tuple = Histogram.BUCKETS):
+        self.buckets = buckets
+        self.histograms: dict = {}  # (эндпоинт, фаза) -> Histogram
+        self.counters: dict = {}  # (метрика, эндпоинт, код) -> значение
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, phase: str, value: float):
+        with self._lock:
+            histogram = self.histograms.get((name, phase))
+            if histogram is None:
+                histogram = self.histograms[(name, phase)] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def inc(self, metric: str, name: str, value: float = 1, code: None|str = None):
+        with self._lock:
+            key = (metric, name, code)
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def record(self, name: str, info: dict):
+        """Учёт одной попытки запроса по словарю info из конвейера запросов."""
+        for phase in self.PHASES:
+            if info.get(phase) is not None:
+                self.observe(name, phase, info[phase])
+        self.inc("requests", name)
+        self.inc("bytes_out", name, info.get("bytes_out", 0))
+        self.inc("bytes_in", name, info.get("bytes_in", 0))
+        if info.get("attempt"):
+            self.inc("retries", name)
+        if info.get("error"):
+            self.inc("errors", name, code=str(info.get("status_code") or "network"))
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def to_dict(self) -> dict:
+        """{"latency_ms": {эндпоинт: {фаза: {count, sum, p50, p95, p99}}}, "counters": {метрика: {эндпоинт: ...}}}."""
+        with self._lock:
+            latency, counters = {}, {}
+            for (name, phase), histogram in self.histograms.items():
+                latency.setdefault(name, {})[phase] = {
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "p50": histogram.quantile(0.5),
+                    "p95": histogram.quantile(0.95),
+                    "p99": histogram.quantile(0.99),
+                }
+            for (metric, name, code), value in self.counters.items():
+                target = counters.setdefault(metric, {})
+                if code is None:
+                    target[name] = value
+                else:
+                    target.setdefault(name, {})[code] = value
+        return {"latency_ms": latency, "counters": counters}
+
+    def to_prometheus(self, prefix: str = "dzg") -> str:
+        """Метрики в текстовом формате Prometheus."""
+        lines = [f"# TYPE {prefix}_request_duration_ms histogram"]
+        with self._lock:
+            for (name, phase), histogram in sorted(self.histograms.items()):
+                labels = f'endpoint="{name}",phase="{phase}"'
+                cumulative = 0
+                for bound, count in zip(histogram.bounds + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{prefix}_request_duration_ms_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{prefix}_request_duration_ms_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{prefix}_request_duration_ms_count{{{labels}}} {histogram.count}")
+            for metric in sorted({metric for metric, _, _ in self.counters}):
+                lines.append(f"# TYPE {prefix}_{metric}_total counter")
+                for (counter, name, code), value in sorted(self.counters.items(), key=str):
+                    if counter == metric:
+                        labels = f'endpoint="{name}"' + (f',code="{code}"' if code is not None else "")
+                        lines.append(f"{prefix}_{metric}_total{{{labels}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class BaseTrade:
+    """Общая часть Trade и AsyncTrade: ключи, подпись и сборка строки запроса по Endpoint."""
+
+    # разделы snapshot и методы, которыми они запрашиваются
+    SNAPSHOT_METHODS = {"ticker": "PriceChange", "depth": "OrderBook", "klines": "Klines"}
+
+    def __init__(
+        self,
+        api_key: None|str,
+        secret_key: None|str,
+        url: None|str,
+        rate_limiter: None|RateLimiter = None,
+        recv_window: int = 5000,
+        clock_sync_interval: None|float = 60.0,
+        retry_policy: None|RetryPolicy = None,
+        circuit_breaker: None|CircuitBreaker = None,
+        config: None|Config = None,
+        ):
+        # без явного config параметры, не переданные аргументами, берутся из окружения;
+        # если переданы все три, окружение и .env не читаются
+        if config is None:
+            config = Config(api_key, secret_key, url=url)
+            if None in (api_key, secret_key, url):
+                env = Config.from_env()
+                config = Config(api_key or env.api_key, secret_key or env.secret_key, env.account_id, url or env.url)
+        self.config = config
+        self.api_key = api_key or config.api_key
+        self.secret_key = secret_key or config.secret_key
+        self.url = url or config.url
+        self.recv_window = recv_window
+        self.account_id = config.account_id
+        self.clock = ClockSync(interval=clock_sync_interval)
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.validate_orders = True  # проверка ордеров по SymbolRules до отправки (см. _check_order)
+        self.metrics = Metrics()  # может быть общим для нескольких клиентов; None - без метрик
+        self.before_request: list = []  # hook(имя эндпоинта, params) перед каждой попыткой запроса
+        self.after_request: list = []  # hook(имя эндпоинта, params, ответ, info) после каждой попытки
+
+    @property
+    def secret_key(self) -> str:
+        return self._secret_key
+
+    @secret_key.setter
+    def secret_key(self, value: str):
+        # ключ HMAC готовится один раз, для каждой подписи копируется уже инициализированный объект
+        self._secret_key = value
+        self._hmac = hmac.new((value or "").encode('utf-8'), digestmod=hashlib.sha256)
 
     def _generate_signature(self, query_string: str):
         """Генерация подписи HMAC SHA256 для строки запроса."""
-        return hmac.new(
-            self.secret_key.encode('utf-8'),
-            query_string.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
+        signature = self._hmac.copy()
+        signature.update(query_string.encode('utf-8'))
+        return signature.hexdigest()
 
-    def AccountInfo(self):
-        """Получение информации об аккаунте через GET-запрос к /api/v2/account."""
-        timestamp = int(time.time() * 1000)
-        query_string = f"timestamp={timestamp}&recvWindow={self.recv_window}"
-        signature = self._generate_signature(query_string)
-        url = f"{self.url}/account?{query_string}&signature={signature}"
+    def _timestamp(self) -> int:
+        """Метка времени для подписанных запросов с поправкой на смещение часов сервера."""
+        return self.clock.now_ms()
+
+    def _encode_params(self, endpoint: Endpoint, params: dict) -> str:
+        """Параметры запроса без подписи; пустые значения пропускаются."""
+        query_params = [f"{name}={params[arg]}" for arg, name in endpoint.params if params.get(arg)]
+        if endpoint.account and self.account_id:
+            query_params.append(f"accountId={self.account_id}")
+        return "&".join(query_params)
+
+    def _sign(self, endpoint: Endpoint, query_string: str) -> str:
+        """Добавление timestamp, recvWindow и подписи для подписанных эндпоинтов."""
+        if not endpoint.signed:
+            return query_string
+        query_params = [query_string] if query_string else []
+        query_params += [f"timestamp={self._timestamp()}", f"recvWindow={self.recv_window}"]
+        query_string = "&".join(query_params)
+        return f"{query_string}&signature={self._generate_signature(query_string)}"
+
+    def _url(self, endpoint: Endpoint, query_string: str) -> str:
+        return f"{self.url}/{endpoint.path}?{query_string}" if query_string else f"{self.url}/{endpoint.path}"
+
+    def _headers(self, endpoint: Endpoint) -> None|dict:
+        return {"X-MBX-APIKEY": self.api_key} if endpoint.signed else None
+
+    def _begin_attempt(self, endpoint: Endpoint, params: dict, attempt: int) -> dict:
+        """Вызов before_request и заготовка info попытки (времена в мс, байты, номер попытки)."""
+        for hook in self.before_request:
+            hook(endpoint.name, params)
+        return {"attempt": attempt, "started": time.perf_counter()}
+
+    def _end_attempt(self, endpoint: Endpoint, params: dict, result: dict, info: dict):
+        """Учёт попытки в self.metrics и вызов after_request."""
+        info["total"] = (time.perf_counter() - info.pop("started")) * 1000
+        info["status_code"] = result.get("status_code")
+        info["error"] = "error" in result
+        if self.metrics is not None:
+            self.metrics.record(endpoint.name, info)
+        for hook in self.after_request:
+            hook(endpoint.name, params, result, info)
+
+    def _circuit_open_error(self) -> dict:
+        """Ответ для запроса, отклонённого без отправки из-за разомкнутой цепи."""
+        return {
+            "status_code": None,
+            "error": f"Request failed: circuit open for {self.url}",
+            "response_text": None
+        }
+
+    def _record_outcome(self, status_code: None|int):
+        """Учёт результата запроса в CircuitBreaker: сбоем считаются ошибки сети и 5xx."""
+        if status_code is None or status_code >= 500:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+
+    def _parser(self, endpoint: Endpoint, parse=None):
+        """Функция разбора ответа: явная parse, модель эндпоинта при self.models или None (json)."""
+        if parse is not None or not (self.models and endpoint.model):
+            return parse
+        import models
+
+        return models.parser(getattr(models, endpoint.model))
+
+    def _cache_key(self, endpoint: Endpoint, params: dict) -> tuple:
+        key = None if endpoint.public else self.api_key  # ответы по аккаунту не делятся между ключами
+        return self.url, endpoint.name, self._encode_params(endpoint, params), self.models, key
+
+    def _after_call(self, name: str, params: dict, result: dict):
+        """Учёт ответа собственного запроса: AccountState, OrderTracker и сброс кэша рыночных данных по символу
+        после запросов, меняющих ордера и позиции."""
+        if self.account_state is not None:
+            self.account_state.apply(name, params, result)
+        if self.order_tracker is not None:
+            self.order_tracker.apply(name, params, result)
+        if self.cache is not None and name in AccountState.TRACKED and "error" not in result:
+            self.cache.invalidate(("OrderBook", "PriceChange"), params.get("symbol"))
 
-        headers = {"X-MBX-APIKEY": self.api_key}
+    def _check_order(self, endpoint: Endpoint, params: dict) -> None|dict:
+        """Локальная проверка ордера по SymbolRules с округлением quantity и price в params.
+        Возвращает словарь ошибки, если ордер будет отклонён, иначе None."""
+        if not (endpoint.validated and self.validate_orders):
+            return None
+        rules = self.symbols.rules(params["symbol"])
+        if rules is None:
+            return None
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()  # Проверяем, нет ли ошибок HTTP
-            return {
-                "status_code": response.status_code,
-                "data": response.json()
-            }
-        except requests.exceptions.HTTPError as http_err:
-            return {
-                "status_code": response.status_code,
-                "error": f"HTTP error: {http_err}",
-                "response_text": response.text
-            }
-        except requests.exceptions.RequestException as req_err:
+            params["quantity"], params["price"] = rules.check(
+                params.get("type_"), params.get("quantity"), params.get("price"), params.get("leverage")
+            )
+        except ValueError as ex:
             return {
                 "status_code": None,
-                "error": f"Request failed: {req_err}",
+                "error": f"Order rejected: {ex}",
                 "response_text": None
             }
+        return None
 
-    def CancelOrder(self, order_id:str, symbol:str):
-        """Удаление ордера через DELETE-запрос к /api/v2/order."""
-        timestamp = int(time.time() * 1000)
-        query_params = [
-            f"orderId={order_id}",
-            f"symbol={self.GetSymbol(symbol)}",
-            f"timestamp={timestamp}",
-            f"recvWindow={self.recv_window}",
-            f"accountId={self.account_id}"
-        ]
+    def _snapshot_plan(self, symbols: list, codes: list, include: tuple, interval: str, limit: None|int) -> tuple:
+        """Начальный результат snapshot и список запросов (name, раздел, метод, аргументы).
+        Тикеры запрашиваются одним /ticker/24hr без symbol (name=None), если это дешевле по весу."""
+        result = {name: {"errors": {}} for name in symbols}
+        resolved = {}
+        for name, code in zip(symbols, codes):
+            if isinstance(code, dict):
+                result[name]["errors"]["symbol"] = self._symbol_error(code)
+            else:
+                resolved[name] = code
+        path = ENDPOINTS["PriceChange"].path
+        ticker_all = "ticker" in include and len(resolved) > 1 \
+            and self.rate_limiter.weight(path) <= len(resolved) * self.rate_limiter.weight(path, "symbol=")
+        calls = [(None, "ticker", "PriceChange", {})] if ticker_all else []
+        for name, code in resolved.items():
+            for kind in include:
+                if kind == "ticker" and ticker_all:
+                    continue
+                kwargs = {"symbol": code, "interval": interval, "limit": limit} if kind == "klines" else {"symbol": code}
+                calls.append((name, kind, self.SNAPSHOT_METHODS[kind], kwargs))
+        return result, resolved, calls
 
-        query_string = "&".join(query_params)
-        signature = self._generate_signature(query_string)
-        url = f"{self.url}/order?{query_string}&signature={signature}"
+    @staticmethod
+    def _snapshot_merge(result: dict, resolved: dict, calls: list, responses: list) -> dict:
+        """Раскладка ответов по символам: данные - в раздел, ошибки - в errors[раздел]."""
+        for (name, kind, _, _), response in zip(calls, responses):
+            if "error" in response:
+                for target in (resolved if name is None else [name]):
+                    result[target]["errors"][kind] = response
+            elif name is None:
+                tickers = {ticker.get("symbol"): ticker for ticker in response["data"]}
+                for target, code in resolved.items():
+                    result[target][kind] = tickers.get(code)
+            else:
+                result[name][kind] = response["data"]
+        return result
+
+    @staticmethod
+    def _symbol_error(symbol: dict) -> dict:
+        """Ответ для запроса, символ которого не удалось определить."""
+        return {
+            "status_code": None,
+            "error": symbol.get("error"),
+            "response_text": None
+        }
+
+
+class Trade(BaseTrade):
+    def __init__(
+        self,
+        api_key: None|str = None,
+        secret_key: None|str = None,
+        url: None|str = None,
+        symbols_ttl: None|float = 300.0,
+        pool_size: int = 10,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        keep_alive: bool = True,
+        rate_limiter: None|RateLimiter = None,
+        recv_window: int = 5000,
+        clock_sync_interval: None|float = 60.0,
+        retry_policy: None|RetryPolicy = None,
+        circuit_breaker: None|CircuitBreaker = None,
+        config: None|Config = None,
+        models: bool = False,
+        cache: None|ResponseCache = None,
+        session=None,
+        symbols: None|SymbolRegistry = None,
+        clock: None|ClockSync = None,
+        ):
+        """Инициализация класса Trade с API-ключами и выбором режима (демо или реальный).
+        api_key, secret_key, url по умолчанию берутся из config, а без него - из окружения/.env (Config.from_env);
+        если все три переданы явно, окружение не читается (account_id тогда задаётся только через config);
+        symbols_ttl период фонового обновления кэша символов в секундах (None - без обновления);
+        pool_size максимальное число соединений в пуле;
+        connect_timeout, read_timeout таймауты соединения и чтения ответа в секундах;
+        rate_limiter общий ограничитель частоты (по умолчанию - собственный, настраивается по /exchangeInfo);
+        recv_window допустимое расхождение времени запроса с сервером в мс;
+        clock_sync_interval период фоновой синхронизации часов с /time в секундах (None - без синхронизации);
+        retry_policy политика повторов при временных сбоях (RetryPolicy(attempts=1) - без повторов);
+        circuit_breaker размыкатель цепи, может быть общим для нескольких клиентов одного хоста;
+        config явные параметры подключения (см. Config);
+        models разбирать ответы в компактные модели из models (Order, Position, Fill, Kline, Ticker, SymbolInfo)
+        вместо словарей; списки отдаются как ModelList с преобразованием при обращении;
+        cache кэш ответов рыночных данных с объединением одинаковых запросов (по умолчанию - собственный;
+        может быть общим для нескольких клиентов; trade.cache = None - без кэша);
+        session, symbols, clock - общие для нескольких клиентов сессия requests, кэш символов и синхронизация
+        часов (см. TradeManager); переданные сессия и clock не закрываются в close;
+        """
+        # url = "https://demo-api-adapter.dzengi.com/api/v2"
+        super().__init__(
+            api_key, secret_key, url, rate_limiter, recv_window, clock_sync_interval, retry_policy, circuit_breaker,
+            config,
+        )
+        self.models = models
+        self.cache = cache if cache is not None else ResponseCache()
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self._session = session
+        self._own_session = session is None
+        self._session_lock = threading.Lock()
+        self._executor = None
+        self.symbols = symbols if symbols is not None else SymbolRegistry(self._load_exchange_info, ttl=symbols_ttl)
+        self._own_clock = clock is None
+        if clock is not None:
+            self.clock = clock
+        self.account_state = None
+        self.order_tracker = None
+
+    @property
+    def session(self):
+        """Общая сессия requests; создаётся при первом запросе, чтобы не импортировать requests заранее."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._create_session(self.pool_size, self.keep_alive)
+        return self._session
+
+    @staticmethod
+    def _create_session(pool_size: int, keep_alive: bool = True):
+        """Создание общей сессии с пулом keep-alive соединений для всех запросов."""
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=False)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Connection"] = "keep-alive" if keep_alive else "close"
+        return session
+
+    def _timestamp(self) -> int:
+        """Метка времени для подписанных запросов с поправкой на смещение часов сервера."""
+        self.clock.start(self._time_probe)
+        return self.clock.now_ms()
+
+    def _time_probe(self) -> dict:
+        """Запрос /time для ClockSync мимо self.cache и без повторов: ответ, полученный чужим запросом
+        или после повтора, исказил бы замер задержки и смещения."""
+        return self._send(ENDPOINTS["ServerTime"], {})[0]
+
+    def close(self):
+        """Закрытие всех соединений пула."""
+        if self._own_clock:
+            self.clock.stop()
+        if self.account_state is not None:
+            self.account_state.stop()
+        if self.order_tracker is not None:
+            self.order_tracker.stop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._session is not None and self._own_session:
+            self._session.close()
+            self._session = None
+
+    def _get_executor(self):
+        """Общий пул потоков для параллельных запросов, по потоку на соединение."""
+        if self._executor is None:
+            self._executor = futures.ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="dzg")
+        return self._executor
+
+    def _dispatch(self, method, items: list) -> list:
+        """Параллельный вызов method(**item) для каждого item; результаты в порядке items."""
+        if len(items) <= 1:
+            return [method(**item) for item in items]
+        executor = self._get_executor()
+        return [future.result() for future in [executor.submit(method, **item) for item in items]]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _call(self, name: str, parse=None, **params):
+        """Вызов эндпоинта ENDPOINTS[name]; symbol переводится в код через GetSymbol."""
+        if params.get("symbol"):
+            params["symbol"] = self.GetSymbol(params["symbol"])
+            if isinstance(params["symbol"], dict):
+                return self._symbol_error(params["symbol"])
+        endpoint = ENDPOINTS[name]
+        error = self._check_order(endpoint, params)
+        if error is not None:
+            return error
+        parse = self._parser(endpoint, parse)
+        ttl = self.cache.ttl(endpoint) if self.cache is not None else None
+        if ttl is None:
+            result = self._request(endpoint, params, parse)
+        else:
+            result = self.cache.fetch(
+                self._cache_key(endpoint, params), ttl, lambda: self._request(endpoint, params, parse),
+                name, params.get("symbol"),
+            )
+        self._after_call(name, params, result)
+        return result
 
-        headers  = {"X-MBX-APIKEY": self.api_key}
+    def _request(self, endpoint: Endpoint, params: dict, parse=None):
+        """Единый путь запроса: ограничение частоты, подпись, отправка через пул и упаковка ответа,
+        с повторами по self.retry_policy. parse - функция разбора тела ответа (bytes) вместо json.
+        """
+        attempt = 0
+        while True:
+            result, failure = self._send(endpoint, params, parse, attempt)
+            if not self.retry_policy.should_retry(endpoint, params, failure, attempt):
+                return result
+            time.sleep(self.retry_policy.delay(attempt))
+            attempt += 1
+
+    def _send(self, endpoint: Endpoint, params: dict, parse=None, attempt: int = 0) -> tuple:
+        """Одна попытка запроса с учётом в метриках и хуках; возвращает (ответ, вид сбоя для RetryPolicy или None)."""
+        info = self._begin_attempt(endpoint, params, attempt)
+        result, failure = self._transmit(endpoint, params, parse, info)
+        self._end_attempt(endpoint, params, result, info)
+        return result, failure
+
+    def _transmit(self, endpoint: Endpoint, params: dict, parse, info: dict) -> tuple:
+        if not self.circuit_breaker.allow():
+            return self._circuit_open_error(), None
+        query_string = self._encode_params(endpoint, params)
+        # ждём разрешения до подписи, чтобы timestamp не устарел за время ожидания
+        info["wait"] = self.rate_limiter.acquire(endpoint.path, query_string, key=self.api_key) * 1000
+        query_string = self._sign(endpoint, query_string)
+        url = self._url(endpoint, query_string)
+        info["bytes_out"] = len(url)
         try:
-            response = requests.delete(url, headers=headers)
-            response.raise_for_status()
-            return {
+            response = self.session.request(endpoint.method, url, headers=self._headers(endpoint), timeout=self.timeout)
+            info["server"] = response.elapsed.total_seconds() * 1000
+            info["bytes_in"] = len(response.content)
+            self._record_outcome(response.status_code)
+            if response.status_code in (418, 429):
+                self.rate_limiter.block(_retry_after(response.headers))
+            response.raise_for_status()  # Проверяем, нет ли ошибок HTTP
+            parse_started = time.perf_counter()
+            result = {
                 "status_code": response.status_code,
-                "data": response.json(),
+                "data": parse(response.content) if parse else response.json(),
             }
+            info["parse"] = (time.perf_counter() - parse_started) * 1000
+            if endpoint.url_key:
+                result[endpoint.url_key] = url
+            return result, None
+        except ValueError as parse_err:  # тело не JSON (страница прокси и т. п.), в том числе ошибки orjson
+            return {
+                "status_code": response.status_code,
+                "error": f"Invalid JSON: {parse_err}",
+                "response_text": response.text
+            }, RetryPolicy.FAILED
         except requests.exceptions.HTTPError as http_err:
             return {
                 "status_code": response.status_code,
                 "error": f"HTTP error: {http_err}",
                 "response_text": response.text
-            }
+            }, self.retry_policy.classify(response.status_code)
         except requests.exceptions.RequestException as req_err:
+            self._record_outcome(None)
             return {
                 "status_code": None,
                 "error": f"Request failed: {req_err}",
                 "response_text": None
-            }
+            }, RetryPolicy.UNSENT if _unsent(req_err) else RetryPolicy.FAILED
+
+    def AccountInfo(self):
+        """Получение информации об аккаунте через GET-запрос к /api/v2/account."""
+        return self._call("AccountInfo")
+
+    def CancelOrder(self, order_id:str, symbol:str):
+        """Удаление ордера через DELETE-запрос к /api/v2/order."""
+        return self._call("CancelOrder", order_id=order_id, symbol=symbol)
 
     def CreateOrder(
-        self, 
-        symbol: str, 
-        side: str, 
-        type_: str, 
-        quantity: float, 
-        resp_type: None|str=None, 
-        leverage: None|int=None, 
-        price: None|float=None, 
-        stop_loss: None|float=None, 
-        take_profit: None|float=None):
-        """Создание ордера через POST-запрос к /api/v2/order. 
-        side = BUY or SELL; 
+        self,
+        symbol: str,
+        side: str,
+        type_: str,
+        quantity: float,
+        resp_type: None|str=None,
+        leverage: None|int=None,
+        price: None|float=None,
+        stop_loss: None|float=None,
+        take_profit: None|float=None,
+        client_order_id: None|str=None):
+        """Создание ордера через POST-запрос к /api/v2/order.
+        side = BUY or SELL;
         type = MARKET, LIMIT or STOP;
         take_profit цена продажи (напрмер покупка 100, продать, когда цена будет 105);
         leverage размер плеча int;
+        client_order_id клиентский id ордера (newClientOrderId); с ним ордер повторяется при сбоях без риска дубля;
         """
-        timestamp = int(time.time() * 1000)
-        query_params = [
-            f"symbol={self.GetSymbol(symbol)}",
-            f"side={side}",
-            f"type={type_}",
-            f"quantity={quantity}",
-            f"timestamp={timestamp}",
-            f"recvWindow={self.recv_window}",
-            f"accountId={self.account_id}"
-        ]
-        if resp_type:
-            query_params.append(f"newOrderRespType={resp_type}")
-        if price:
-            query_params.append(f"price={price}")
-        if leverage:
-            query_params.append(f"leverage={leverage}")
-        if stop_loss:
-            query_params.append(f"stopLoss={stop_loss}")
-        if take_profit:
-            query_params.append(f"takeProfit={take_profit}")
-
-        query_string = "&".join(query_params)
-        signature = self._generate_signature(query_string)
-        url = f"{self.url}/order?{query_string}&signature={signature}"
-
-        headers  = {"X-MBX-APIKEY": self.api_key}
-        try:
-            response = requests.post(url, headers=headers)
-            response.raise_for_status()
-            return {
-                "status_code": response.status_code,
-                "data": response.json(),
-                "url": url
-            }
-        except requests.exceptions.HTTPError as http_err:
-            return {
-                "status_code": response.status_code,
-                "error": f"HTTP error: {http_err}",
-                "response_text": response.text
-            }
-        except requests.exceptions.RequestException as req_err:
-            return {
-                "status_code": None,
-                "error": f"Request failed: {req_err}",
-                "response_text": None
-            }
+        return self._call(
+            "CreateOrder",
+            symbol=symbol,
+            side=side,
+            type_=type_,
+            quantity=quantity,
+            resp_type=resp_type,
+            leverage=leverage,
+            price=price,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+            client_order_id=client_order_id,
+        )
 
     def EditOrder(
-        self, 
-        order_id: str, 
-        symbol: str, 
-        side: str, 
-        type_: str, 
-        quantity: float, 
-        price: None|float=None, 
-        stop_loss: None|float=None, 
+        self,
+        order_id: str,
+        symbol: str,
+        side: str,
+        type_: str,
+        quantity: float,
+        price: None|float=None,
+        stop_loss: None|float=None,
         take_profit: None|float=None
         ):
-        """Изменение ордера через POST-запрос к /api/v2/order. 
-        side = BUY or SELL; 
+        """Изменение ордера через POST-запрос к /api/v2/order.
+        side = BUY or SELL;
         type = MARKET, LIMIT or STOP;
         take_profit цена продажи (напрмер покупка 100, продать, когда цена будет 105);
         leverage размер плеча int;
         """
-        timestamp = int(time.time() * 1000)
-        query_params = [
-            f"orderId={order_id}",
-            f"type={type_}",
-            f"symbol={self.GetSymbol(symbol)}",
-            f"side={side}",
-            f"quantity={quantity}",
-            f"timestamp={timestamp}",
-            f"recvWindow={self.recv_window}",
-            f"accountId={self.account_id}"
-        ]
-        if price:
-            query_params.append(f"price={price}")
-        if stop_loss:
-            query_params.append(f"stopLoss={stop_loss}")
-        if take_profit:
-            query_params.append(f"takeProfit={take_profit}")
-
-        query_string = "&".join(query_params)
-        signature = self._generate_signature(query_string)
-        url = f"{self.url}/order?{query_string}&signature={signature}"
-
-        headers  = {"X-MBX-APIKEY": self.api_key}
-        try:
-            response = requests.post(url, headers=headers)
-            response.raise_for_status()
-            return {
-                "status_code": response.status_code,
-                "data": response.json(),
-            }
-        except requests.exceptions.HTTPError as http_err:
-            return {
-                "status_code": response.status_code,
-                "error": f"HTTP error: {http_err}",
-                "response_text": response.text
-            }
-        except requests.exceptions.RequestException as req_err:
-            return {
-                "status_code": None,
-                "error": f"Request failed: {req_err}",
-                "response_text": None
-            }
+        return self._call(
+            "EditOrder",
+            order_id=order_id,
+            symbol=symbol,
+            side=side,
+            type_=type_,
+            quantity=quantity,
+            price=price,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+        )
 
     def ExchangeInfo(self):
         """Получение информации об актуальных курсах через GET-запрос к /api/v2/exchangeInfo."""
-        timestamp = int(time.time() * 1000)
-        query_string = f"timestamp={timestamp}&recvWindow={self.recv_window}"
-        signature = self._generate_signature(query_string)
-        url = f"{self.url}/exchangeInfo?{query_string}&signature={signature}"
-      
-        headers = {"X-MBX-APIKEY": self.api_key}
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()  # Проверяем, нет ли ошибок HTTP
-            return {
-                "status_code": response.status_code,
-                "data": response.json(),
-                "link": url,
-            }
-        except requests.exceptions.HTTPError as http_err:
-            return {
-                "status_code": response.status_code,
-                "error": f"HTTP error: {http_err}",
-                "response_text": response.text
-            }
-        except requests.exceptions.RequestException as req_err:
-            return {
-                "status_code": None,
-                "error": f"Request failed: {req_err}",
-                "response_text": None
-            } 
+        return self._call("ExchangeInfo")
 
     def GetSymbol(self, name: str):
-        """Получение информации о символе необходимом для открытия ордера."""
+        """Получение информации о символе необходимом для открытия ордера.
+        Берётся из кэша self.symbols, /exchangeInfo не запрашивается на каждый вызов."""
         try:
-            response = self.ExchangeInfo()
-            symbols_list = response.get("data").get("symbols")
-            for element in symbols_list:
-                if element.get("name") == name:
-                    symbol = element.get("symbol")
-                    break
-            return symbol
+            symbol = self.symbols.symbol(name)
         except Exception as ex:
             return {
                 "error": f"HTTP error: {ex}",
             }
+        if symbol is None:
+            return {"error": f"unknown symbol {name!r}"}
+        return symbol
+
+    def RefreshSymbols(self):
+        """Принудительное обновление кэша символов из /exchangeInfo."""
+        return self.symbols.refresh()
+
+    def trading_rules(self, symbol: str, limits: bool = True):
+        """Торговые правила символа (SymbolRules) из кэша /exchangeInfo; limits=True - однократно
+        дополнить их /tradingLimits и /tradingFees. Возвращает словарь ошибки, если символ не найден."""
+        code = self.GetSymbol(symbol)
+        if isinstance(code, dict):
+            return self._symbol_error(code)
+        rules = self.symbols.rules(code)
+        if limits and not rules.limits_loaded:
+            trading_limits, fees = self.ListOfLimits(code), self.ListOfFees(code)
+            if "error" not in trading_limits and "error" not in fees:
+                rules.update(trading_limits["data"], fees["data"])
+        return rules
+
+    def _load_exchange_info(self):
+        """Загрузка /exchangeInfo для кэша символов с настройкой ограничителя по rateLimits.
+        Всегда запрашивает сервер: ответ ExchangeInfo в self.cache сбрасывается."""
+        if self.cache is not None:
+            self.cache.invalidate(("ExchangeInfo",))
+        response = self.ExchangeInfo()
+        rate_limits = (response.get("data") or {}).get("rateLimits")
+        if rate_limits:
+            self.rate_limiter.configure(rate_limits)
+        return response
 
     def Klines(
-        self, 
+        self,
         symbol: str,
         interval: str,
-        start_time: None| int = None, 
-        end_time: None| int = None,  
+        start_time: None| int = None,
+        end_time: None| int = None,
         limit: None| int = None,
         price_type: None| int = None,
         type_: None| int = None,
+        frame: bool = False,
         ):
-        """Получение информации о клайн/свечках по символу через GET-запрос к /api/v2/klines."""
-        timestamp = int(time.time() * 1000)
-        query_params = [f"timestamp={timestamp}", f"recvWindow={self.recv_window}", f"symbol={self.GetSymbol(symbol)}", f"interval={interval }"]
-        if start_time:
-            query_params.append(f"startTime={start_time}")
-        if end_time:
-            query_params.append(f"endTime={end_time}")
-        if limit:
-            query_params.append(f"limit={limit}")
-        if price_type:
-            query_params.append(f"priceType={price_type}")
-        if type_:
-            query_params.append(f"type={type_}")
-        query_string = "&".join(query_params)
-        signature = self._generate_signature(query_string)
-        url = f"{self.url}/klines?{query_string}&signature={signature}"
+        """Получение информации о клайн/свечках по символу через GET-запрос к /api/v2/klines.
+        frame=True - data возвращается как klines.KlineFrame (колонки NumPy) вместо списка списков.
+        """
+        parse = None
+        if frame:
+            from klines import KlineFrame
+
+            parse = KlineFrame.from_json
+        return self._call(
+            "Klines",
+            parse=parse,
+            symbol=symbol,
+            interval=interval,
+            start_time=start_time,
+            end_time=end_time,
+            limit=limit,
+            price_type=price_type,
+            type_=type_,
+        )
 
-        headers = {"X-MBX-APIKEY": self.api_key}
+    def iter_klines(
+        self,
+        symbol: str,
+        interval: str,
+        start: int|datetime,
+        end: None|int|datetime = None,
+        limit: int = 1000,
+        price_type: None|int = None,
+        type_: None|int = None,
+        concurrency: int = 1,
+        ):
+        """Постраничная выгрузка свечей за период [start, end] с выдачей по мере получения.
+        start, end время в миллисекундах или datetime (end по умолчанию - текущее время);
+        limit размер страницы (сервер может вернуть меньше - тогда отрезок догружается следующими страницами);
+        concurrency число параллельно загружаемых отрезков в общем пуле клиента (pool_size) и в пределах RateLimiter;
+        При ошибке запроса выбрасывается DzengiError.
+        """
+        start = to_ms(start)
+        end = to_ms(end) if end is not None else int(time.time() * 1000)
+        step = interval_ms(interval)
+
+        def pages(cursor: int, page_end: int):
+            while cursor <= page_end:
+                response = self.Klines(symbol, interval, cursor, page_end, limit, price_type, type_)
+                if "error" in response:
+                    raise DzengiError(response)
+                rows = [row for row in response["data"] if cursor <= row[0] <= page_end]
+                if not rows:
+                    return
+                yield from rows
+                cursor = rows[-1][0] + step
+
+        if concurrency <= 1:
+            yield from pages(start, end)
+            return
+
+        # отрезки по limit свечей; окно задач ограничено, чтобы память не росла с длиной периода
+        chunk = step * limit
+        chunks = ((chunk_start, min(chunk_start + chunk - step, end)) for chunk_start in range(start, end + 1, chunk))
+        executor = self._get_executor()
+        pending = deque()
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()  # Проверяем, нет ли ошибок HTTP
-            return {
-                "status_code": response.status_code,
-                "data": response.json(),
-            }
-        except requests.exceptions.HTTPError as http_err:
-            return {
-                "status_code": response.status_code,
-                "error": f"HTTP error: {http_err}",
-                "response_text": response.text
-            }
-        except requests.exceptions.RequestException as req_err:
-            return {
-                "status_code": None,
-                "error": f"Request failed: {req_err}",
-                "response_text": None
-            }
+            for bounds in chunks:
+                pending.append(executor.submit(lambda bounds: list(pages(*bounds)), bounds))
+                if len(pending) >= concurrency:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()  # выдача прервана - незапущенные отрезки не загружаются
+
+    def iter_trades(
+        self,
+        symbol: str,
+        start: int|datetime,
+        end: None|int|datetime = None,
+        limit: int = 1000,
+        window: int = 86_400_000,
+        ):
+        """Постраничная выгрузка сделок аккаунта (/myTrades) за период [start, end] с выдачей по мере получения.
+        start, end время в миллисекундах или datetime (end по умолчанию - текущее время);
+        limit размер страницы; window длина окна запроса в мс (по умолчанию сутки);
+        Сделки на границах страниц не повторяются (сверка по id). При ошибке запроса выбрасывается DzengiError.
+        """
+        def fetch(page_start: int, page_end: int, page_limit: int):
+            return self.ListOfTrades(symbol, page_start, page_end, page_limit)
+
+        return self._iter_history(fetch, start, end, limit, window, "time", ("id",))
+
+    def iter_historical_positions(
+        self,
+        start: int|datetime,
+        end: None|int|datetime = None,
+        symbol: None|str = None,
+        limit: int = 500,
+        window: None|int = None,
+        ):
+        """Постраничная выгрузка истории позиций (/tradingPositionsHistory) за период [start, end],
+        по аналогии с iter_trades; window по умолчанию - весь период одним окном."""
+        def fetch(page_start: int, page_end: int, page_limit: int):
+            return self.ListOfHistoricalPositions(page_start, symbol, page_end, page_limit)
+
+        return self._iter_history(fetch, start, end, limit, window, "createdTimestamp", ("id", "createdTimestamp"))
+
+    @staticmethod
+    def _iter_history(fetch, start, end, limit: int, window: None|int, time_key: str, id_keys: tuple):
+        """Обход периода окнами window, а внутри окна - страницами limit записей по возрастанию времени.
+        Следующая страница начинается с времени последней записи; записи с этим временем,
+        уже выданные, отбрасываются по id_keys."""
+        start = to_ms(start)
+        end = to_ms(end) if end is not None else int(time.time() * 1000)
+        window = window or end - start + 1
+        for window_start in range(start, end + 1, window):
+            window_end = min(window_start + window - 1, end)
+            cursor, seen = window_start, set()
+            while True:
+                response = fetch(cursor, window_end, limit)
+                if "error" in response:
+                    raise DzengiError(response)
+                data = response["data"]
+                records = (data.get("history") or data.get("positions") or []) if isinstance(data, dict) else data
+                page = sorted(
+                    (record for record in records if cursor <= record[time_key] <= window_end),
+                    key=lambda record: record[time_key],
+                )
+                fresh = [record for record in page if tuple(record.get(key) for key in id_keys) not in seen]
+                yield from fresh
+                if len(records) < limit or not fresh:
+                    break
+                last = fresh[-1][time_key]
+                boundary = {tuple(record.get(key) for key in id_keys) for record in fresh if record[time_key] == last}
+                seen = seen | boundary if last == cursor else boundary
+                cursor = last
 
     def LeverageOrdersEdit(
-        self, 
+        self,
         order_id: str,
-        exp_time: None|str=None, 
-        guarant_stop_loss: bool=False, 
-        new_price: None|float=None, 
+        exp_time: None|str=None,
+        guarant_stop_loss: bool=False,
+        new_price: None|float=None,
         profit_distance: None|int=None,
         stop_distance: None|int=None,
         stop_loss: None|float=None,
-        take_profit: None|float=None, 
-        trailing_stop_loss: bool=False,        
+        take_profit: None|float=None,
+        trailing_stop_loss: bool=False,
         ):
-        """Изменение ордера через POST-запрос к /api/v2/updateTradingOrder. 
+        """Изменение ордера через POST-запрос к /api/v2/updateTradingOrder.
         take_profit цена продажи (напрмер покупка 100, продать, когда цена будет 105);
         """
-        timestamp = int(time.time() * 1000)
-        query_params = [
-            f"orderId={order_id}",
-            f"timestamp={timestamp}",
-            f"recvWindow={self.recv_window}",
-            f"accountId={self.account_id}"
-        ]
-        if exp_time:
-            query_params.append(f"expireTimestamp={exp_time}")
-        if new_price:
-            query_params.append(f"newPrice={new_price}")
-        if take_profit:
-            query_params.append(f"takeProfit={take_profit}")
-        if guarant_stop_loss:
-            query_params.append(f"guaranteedStopLoss={guarant_stop_loss}")
-        if stop_loss:
-            query_params.append(f"stopLoss={stop_loss}")
-        if profit_distance:
-            query_params.append(f"profitDistance={profit_distance}")
-        if stop_distance:
-            query_params.append(f"stopDistance={stop_distance}")
-        if trailing_stop_loss:
-            query_params.append(f"trailingStopLoss={trailing_stop_loss}")
-
-        query_string = "&".join(query_params)
-        signature = self._generate_signature(query_string)
-        url = f"{self.url}/updateTradingOrder?{query_string}&signature={signature}"
-
-        headers  = {"X-MBX-APIKEY": self.api_key}
-        try:
-            response = requests.post(url, headers=headers)
-            response.raise_for_status()
-            return {
-                "status_code": response.status_code,
-                "data": response.json(),
-                "url": url
-            }
-        except requests.exceptions.HTTPError as http_err:
-            return {
-                "status_code": response.status_code,
-                "error": f"HTTP error: {http_err}",
-                "response_text": response.text
-            }
-        except requests.exceptions.RequestException as req_err:
-            return {
-                "status_code": None,
-                "error": f"Request failed: {req_err}",
-                "response_text": None
-            }
+        return self._call(
+            "LeverageOrdersEdit",
+            order_id=order_id,
+            exp_time=exp_time,
+            guarant_stop_loss=guarant_stop_loss,
+            new_price=new_price,
+            profit_distance=profit_distance,
+            stop_distance=stop_distance,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+            trailing_stop_loss=trailing_stop_loss,
+        )
 
     def LeverageTradeEdit(
-        self, 
+        self,
         position_id: str,
-        exp_time: None|str=None, 
-        guarant_stop_loss: bool=False, 
-        new_price: None|float=None, 
+        exp_time: None|str=None,
+        guarant_stop_loss: bool=False,
+        new_price: None|float=None,
         profit_distance: None|int=None,
         stop_distance: None|int=None,
         stop_loss: None|float=None,
-        take_profit: None|float=None, 
-        trailing_stop_loss: bool=False,        
+        take_profit: None|float=None,
+        trailing_stop_loss: bool=False,
         ):
-        """Изменение текущей сделки через POST-запрос к /api/v2/updateTradingPosition. 
+        """Изменение текущей сделки через POST-запрос к /api/v2/updateTradingPosition.
         take_profit цена продажи (напрмер покупка 100, продать, когда цена будет 105);
         """
-        timestamp = int(time.time() * 1000)
-        query_params = [
-            f"positionId={position_id}",
-            f"timestamp={timestamp}",
-            f"recvWindow={self.recv_window}",
-            f"accountId={self.account_id}"
-        ]
-        if exp_time:
-            query_params.append(f"expireTimestamp={exp_time}")
-        if new_price:
-            query_params.append(f"newPrice={new_price}")
-        if take_profit:
-            query_params.append(f"takeProfit={take_profit}")
-        if guarant_stop_loss:
-            query_params.append(f"guaranteedStopLoss={guarant_stop_loss}")
-        if stop_loss:
-            query_params.append(f"stopLoss={stop_loss}")
-        if profit_distance:
-            query_params.append(f"profitDistance={profit_distance}")
-        if stop_distance:
-            query_params.append(f"stopDistance={stop_distance}")
-        if trailing_stop_loss:
-            query_params.append(f"trailingStopLoss={trailing_stop_loss}")
-
-        query_string = "&".join(query_params)
-        signature = self._generate_signature(query_string)
-        url = f"{self.url}/updateTradingPosition?{query_string}&signature={signature}"
-
-        headers  = {"X-MBX-APIKEY": self.api_key}
-        try:
-            response = requests.post(url, headers=headers)
-            response.raise_for_status()
-            return {
-                "status_code": response.status_code,
-                "data": response.json(),
-                "url": url
-            }
-        except requests.exceptions.HTTPError as http_err:
-            return {
-                "status_code": response.status_code,
-                "error": f"HTTP error: {http_err}",
-                "response_text": response.text
-            }
-        except requests.exceptions.RequestException as req_err:
-            return {
-                "status_code": None,
-                "error": f"Request failed: {req_err}",
-                "response_text": None
-            }
+        return self._call(
+            "LeverageTradeEdit",
+            position_id=position_id,
+            exp_time=exp_time,
+            guarant_stop_loss=guarant_stop_loss,
+            new_price=new_price,
+            profit_distance=profit_distance,
+            stop_distance=stop_distance,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+            trailing_stop_loss=trailing_stop_loss,
+        )
 
     def ListOfCurrencies(self):
         """Получение информации обо всех валютах GET-запрос к /api/v2/currencies."""
-        timestamp = int(time.time() * 1000)
-        query_string = f"timestamp={timestamp}&recvWindow={self.recv_window}"
-        signature = self._generate_signature(query_string)
-        url = f"{self.url}/currencies?{query_string}&signature={signature}"
-      
-        headers = {"X-MBX-APIKEY": self.api_key}
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()  # Проверяем, нет ли ошибок HTTP
-            return {
-                "status_code": response.status_code,
-                "data": response.json()
-            }
-        except requests.exceptions.HTTPError as http_err:
-            return {
-                "status_code": response.status_code,
-                "error": f"HTTP error: {http_err}",
-                "response_text": response.text
-            }
-        except requests.exceptions.RequestException as req_err:
-            return {
-                "status_code": None,
-                "error": f"Request failed: {req_err}",
-                "response_text": None
-            }
+        return self._call("ListOfCurrencies")
 
     def ListOfFees(self, symbol: str):
         """Получение информации обо всех системных сборах GET-запрос к /api/v2/tradingFees.
-        symbol можно найти на ExchangeInfo"""
-        url = f"{self.url}/tradingFees?symbol={self.GetSymbol(symbol)}"
-
-        try:
-            response = requests.get(url)
-            response.raise_for_status()  # Проверяем, нет ли ошибок HTTP
-            return {
-                "status_code": response.status_code,
-                "data": response.json()
-            }
-        except requests.exceptions.HTTPError as http_err:
-            return {
-                "status_code": response.status_code,
-                "error": f"HTTP error: {http_err}",
-                "response_text": response.text
-            }
-        except requests.exceptions.RequestException as req_err:
-            return {
-                "status_code": None,
-                "error": f"Request failed: {req_err}",
-                "response_text": None
-            }
-
-    def ListOfHistoricalPositions(
-        self, 
-        from_: None| int = None, 
-        symbol: None| str = None, 
-        to: None| int = None, 
-        limit: None| int = None
-        ):
-        """Получение информации обо всех закрытых сделках на аккаунте через GET-запрос к /api/v2/tradingPositionsHistory."""
-        timestamp = int(time.time() * 1000)
-        query_params = [f"timestamp={timestamp}", f"recvWindow={self.recv_window}"]
-        if symbol:
-            query_params.append(f"symbol={self.GetSymbol(symbol)}")
-        if from_:
-            query_params.append(f"from={from_}")
-        if to:
-            query_params.append(f"to={to}")
-        if limit:
-            query_params.append(f"limit={limit}")
-        query_string = "&".join(query_params)
-        signature = self._generate_signature(query_string)
-        url = f"{self.url}/tradingPositionsHistory?{query_string}&signature={signature}"
-
-        headers = {"X-MBX-APIKEY": self.api_key}
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()  # Проверяем, нет ли ошибок HTTP
-            return {
-                "status_code": response.status_code,
-                "data": response.json(),
-                "url": url,
-            }
-        except requests.exceptions.HTTPError as http_err:
-            return {
-                "status_code": response.status_code,
-                "error": f"HTTP error: {http_err}",
-                "response_text": response.text
-            }
-        except requests.exceptions.RequestException as req_err:
-            return {
-                "status_code": None,
-                "error": f"Request failed: {req_err}",
-                "response_text": None
-            }
+        symbol можно найти на ExchangeInfo"""
+        return self._call("ListOfFees", symbol=symbol)
+
+    def ListOfHistoricalPositions(
+        self,
+        from_: None| int = None,
+        symbol: None| str = None,
+        to: None| int = None,
+        limit: None| int = None
+        ):
+        """Получение информации обо всех закрытых сделках на аккаунте через GET-запрос к /api/v2/tradingPositionsHistory."""
+        return self._call("ListOfHistoricalPositions", from_=from_, symbol=symbol, to=to, limit=limit)
 
     def ListOfLeverageTrades(self):
         """Получение информации обо всех открытых сделках на аккаунте через GET-запрос к /api/v2/tradingPositions."""
-        timestamp = int(time.time() * 1000)
-        query_string = f"timestamp={timestamp}&recvWindow={self.recv_window}"
-        signature = self._generate_signature(query_string)
-        url = f"{self.url}/account?{query_string}&signature={signature}"
-
-        headers = {"X-MBX-APIKEY": self.api_key}
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()  # Проверяем, нет ли ошибок HTTP
-            return {
-                "status_code": response.status_code,
-                "data": response.json()
-            }
-        except requests.exceptions.HTTPError as http_err:
-            return {
-                "status_code": response.status_code,
-                "error": f"HTTP error: {http_err}",
-                "response_text": response.text
-            }
-        except requests.exceptions.RequestException as req_err:
-            return {
-                "status_code": None,
-                "error": f"Request failed: {req_err}",
-                "response_text": None
-            }
+        return self._call("ListOfLeverageTrades")
 
     def ListOfLimits(self, symbol: str):
         """Получение информации обо всех системных ограничениях GET-запрос к /api/v2/tradingLimits.
         symbol можно найти на ExchangeInfo"""
-        url = f"{self.url}/tradingLimits?symbol={self.GetSymbol(symbol)}"
-
-        try:
-            response = requests.get(url)
-            response.raise_for_status()  # Проверяем, нет ли ошибок HTTP
-            return {
-                "status_code": response.status_code,
-                "data": response.json()
-            }
-        except requests.exceptions.HTTPError as http_err:
-            return {
-                "status_code": response.status_code,
-                "error": f"HTTP error: {http_err}",
-                "response_text": response.text
-            }
-        except requests.exceptions.RequestException as req_err:
-            return {
-                "status_code": None,
-                "error": f"Request failed: {req_err}",
-                "response_text": None
-            }
+        return self._call("ListOfLimits", symbol=symbol)
 
     def ListOfOpenOrders(self, symbol: None|str = None):
         """Получение информации обо всех открытых заявках на аккаунте через GET-запрос к /api/v2/openOrders."""
-        timestamp = int(time.time() * 1000)
-        query_params = [f"timestamp={timestamp}", f"recvWindow={self.recv_window}"]
-        if symbol:
-            query_params.append(f"symbol={self.GetSymbol(symbol)}")
-        query_string = "&".join(query_params)
-        signature = self._generate_signature(query_string)
-        url = f"{self.url}/openOrders?{query_string}&signature={signature}"
-
-        headers = {"X-MBX-APIKEY": self.api_key}
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()  # Проверяем, нет ли ошибок HTTP
-            return {
-                "status_code": response.status_code,
-                "data": response.json(),
-            }
-        except requests.exceptions.HTTPError as http_err:
-            return {
-                "status_code": response.status_code,
-                "error": f"HTTP error: {http_err}",
-                "response_text": response.text
-            }
-        except requests.exceptions.RequestException as req_err:
-            return {
-                "status_code": None,
-                "error": f"Request failed: {req_err}",
-                "response_text": None
-            }
+        return self._call("ListOfOpenOrders", symbol=symbol)
 
     def ListOfTrades(
-        self, 
+        self,
         symbol: str,
-        start_time: None| int = None, 
-        end_time: None| int = None,  
+        start_time: None| int = None,
+        end_time: None| int = None,
         limit: None| int = None
         ):
         """Получение информации обо всех сделках по symbol на аккаунте через GET-запрос к /api/v2/myTrades."""
-        timestamp = int(time.time() * 1000)
-        query_params = [f"timestamp={timestamp}", f"recvWindow={self.recv_window}", f"symbol={self.GetSymbol(symbol)}"]
-        if start_time:
-            query_params.append(f"startTime={start_time}")
-        if end_time:
-            query_params.append(f"endTime={end_time}")
-        if limit:
-            query_params.append(f"limit={limit}")
-        query_string = "&".join(query_params)
-        signature = self._generate_signature(query_string)
-        url = f"{self.url}/myTrades?{query_string}&signature={signature}"
-
-        headers = {"X-MBX-APIKEY": self.api_key}
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()  # Проверяем, нет ли ошибок HTTP
-            return {
-                "status_code": response.status_code,
-                "data": response.json(),
-            }
-        except requests.exceptions.HTTPError as http_err:
-            return {
-                "status_code": response.status_code,
-                "error": f"HTTP error: {http_err}",
-                "response_text": response.text
-            }
-        except requests.exceptions.RequestException as req_err:
-            return {
-                "status_code": None,
-                "error": f"Request failed: {req_err}",
-                "response_text": None
-            }
+        return self._call("ListOfTrades", symbol=symbol, start_time=start_time, end_time=end_time, limit=limit)
 
     def OrderBook(self, symbol: str):
         """Получение информации обо всех заявках на аккаунте через GET-запрос к /api/v2/depth"""
-        timestamp = int(time.time() * 1000)
-        query_params = [f"timestamp={timestamp}", f"recvWindow={self.recv_window}", f"symbol={self.GetSymbol(symbol)}"]
-        query_string = "&".join(query_params)
-        signature = self._generate_signature(query_string)
-        url = f"{self.url}/depth?{query_string}&signature={signature}"
+        return self._call("OrderBook", symbol=symbol)
 
-        headers = {"X-MBX-APIKEY": self.api_key}
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()  # Проверяем, нет ли ошибок HTTP
-            return {
-                "status_code": response.status_code,
-                "data": response.json(),
-            }
-        except requests.exceptions.HTTPError as http_err:
-            return {
-                "status_code": response.status_code,
-                "error": f"HTTP error: {http_err}",
-                "response_text": response.text
-            }
-        except requests.exceptions.RequestException as req_err:
-            return {
-                "status_code": None,
-                "error": f"Request failed: {req_err}",
-                "response_text": None
-            }    
+    def order_book(self, symbol: str, book: None|LocalOrderBook = None):
+        """Обновление локального стакана снимком /depth (см. LocalOrderBook).
+        Возвращает book (новый, если не передан) или словарь ошибки OrderBook."""
+        response = self.OrderBook(symbol)
+        if "error" in response:
+            return response
+        book = book if book is not None else LocalOrderBook(symbol)
+        book.apply_snapshot(response["data"])
+        return book
 
     def PriceChange(self, symbol: None|str = None):
         """Получение информации статистике изменения цен за последние 24ч через GET-запрос к /api/v2/ticker/24h"""
-        timestamp = int(time.time() * 1000)
-        query_params = [f"timestamp={timestamp}", f"recvWindow={self.recv_window}",]
-        if symbol:
-            query_params.append(f"symbol={self.GetSymbol(symbol)}")
-        query_string = "&".join(query_params)
-        signature = self._generate_signature(query_string)
-        url = f"{self.url}/ticker/24hr?{query_string}&signature={signature}"
-
-        headers = {"X-MBX-APIKEY": self.api_key}
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()  # Проверяем, нет ли ошибок HTTP
-            return {
-                "status_code": response.status_code,
-                "data": response.json(),
-            }
-        except requests.exceptions.HTTPError as http_err:
-            return {
-                "status_code": response.status_code,
-                "error": f"HTTP error: {http_err}",
-                "response_text": response.text
-            }
-        except requests.exceptions.RequestException as req_err:
-            return {
-                "status_code": None,
-                "error": f"Request failed: {req_err}",
-                "response_text": None
-            }    
+        return self._call("PriceChange", symbol=symbol)
 
     def ServerTime(self):
         """Тест соединения с сервером и получение севрерного времени/api/v2/time."""
-        url = f"{self.url}/time"
+        return self._call("ServerTime")
+
+    def TradingPositionClose(self, position_id):
+        """Закрытие позиции через запрос к /api/v2/closeTradingPosition"""
+        return self._call("TradingPositionClose", position_id=position_id)
+
+    def create_orders(self, orders: list) -> list:
+        """Параллельное создание ордеров; orders - список словарей с аргументами CreateOrder.
+        Результаты в том же порядке, что и orders."""
+        return self._dispatch(self.CreateOrder, orders)
+
+    def cancel_orders(self, orders: list) -> list:
+        """Параллельная отмена ордеров; orders - список словарей {"order_id", "symbol"}."""
+        return self._dispatch(self.CancelOrder, orders)
+
+    def cancel_all(self, symbol: None|str = None):
+        """Отмена всех открытых ордеров (по symbol или по всему аккаунту) на основе ListOfOpenOrders.
+        Возвращает список результатов CancelOrder или ответ ListOfOpenOrders при его ошибке."""
+        response = self.ListOfOpenOrders(symbol)
+        if "error" in response:
+            return response
+        return self.cancel_orders([
+            {"order_id": order["orderId"], "symbol": order["symbol"]} for order in response["data"]
+        ])
+
+    def close_positions(self, position_ids: list) -> list:
+        """Параллельное закрытие позиций по списку position_id."""
+        return self._dispatch(self.TradingPositionClose, [{"position_id": position_id} for position_id in position_ids])
+
+    def snapshot(
+        self,
+        symbols: list,
+        include: tuple = ("ticker", "depth", "klines"),
+        interval: str = "1h",
+        limit: None|int = None,
+        ) -> dict:
+        """Рыночные данные по списку символов одним вызовом: {name: {"ticker", "depth", "klines", "errors"}}.
+        include - нужные разделы; interval, limit - параметры Klines.
+        Запросы выполняются параллельно через пул в пределах rate_limiter; тикеры по многим символам
+        берутся одним запросом /ticker/24hr по всем инструментам."""
+        result, resolved, calls = self._snapshot_plan(
+            symbols, [self.GetSymbol(name) for name in symbols], include, interval, limit
+        )
+        responses = self._dispatch(
+            lambda method, kwargs: getattr(self, method)(**kwargs),
+            [{"method": method, "kwargs": kwargs} for _, _, method, kwargs in calls],
+        )
+        return self._snapshot_merge(result, resolved, calls, responses)
+
+    def track_account(self, interval: None|float = 5.0) -> AccountState:
+        """Локальное состояние аккаунта (см. AccountState), обновляемое в фоне раз в interval секунд
+        и по ответам собственных запросов. Первая загрузка синхронная."""
+        if self.account_state is None:
+            self.account_state = AccountState(self._load_account, interval=interval)
+            self.account_state.refresh()
+            self.account_state.start()
+        return self.account_state
+
+    def _load_account(self) -> tuple:
+        """Ответы /account (балансы), /tradingPositions и /openOrders для AccountState, запрашиваемые параллельно."""
+        executor = self._get_executor()
+        positions, orders = executor.submit(self.ListOfLeverageTrades), executor.submit(self.ListOfOpenOrders)
+        return self.AccountInfo(), positions.result(), orders.result()
+
+    def track_orders(self, fast: float = 0.5, slow: float = 10.0, backoff: float = 2.0) -> OrderTracker:
+        """Отслеживание ордеров из CreateOrder/EditOrder этого клиента (см. OrderTracker) с фоновым опросом
+        в потоке; обработчики событий - tracker.on(событие, callback)."""
+        if self.order_tracker is None:
+            self.order_tracker = OrderTracker(self._call_many, self.rate_limiter.weight, fast, slow, backoff)
+            self.order_tracker.start()
+        return self.order_tracker
+
+    def _call_many(self, calls: list) -> list:
+        """Параллельное выполнение [(метод, kwargs)]; ответы в том же порядке."""
+        return self._dispatch(
+            lambda method, kwargs: getattr(self, method)(**kwargs),
+            [{"method": method, "kwargs": kwargs} for method, kwargs in calls],
+        )
+
 
+class AsyncTrade(BaseTrade):
+    """Асинхронный клиент с тем же набором методов, что и Trade, поверх общего пула aiohttp.
+    Все методы - корутины и возвращают словари того же вида, что и Trade.
+    """
+
+    def __init__(
+        self,
+        api_key: None|str = None,
+        secret_key: None|str = None,
+        url: None|str = None,
+        symbols_ttl: None|float = 300.0,
+        pool_size: int = 100,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        keep_alive: bool = True,
+        rate_limiter: None|RateLimiter = None,
+        recv_window: int = 5000,
+        clock_sync_interval: None|float = 60.0,
+        retry_policy: None|RetryPolicy = None,
+        circuit_breaker: None|CircuitBreaker = None,
+        config: None|Config = None,
+        models: bool = False,
+        cache: None|ResponseCache = None,
+        ):
+        """Инициализация асинхронного клиента. Параметры те же, что и у Trade;
+        pool_size ограничивает число одновременных соединений aiohttp.
+        """
+        super().__init__(
+            api_key, secret_key, url, rate_limiter, recv_window, clock_sync_interval, retry_policy, circuit_breaker,
+            config,
+        )
+        self.models = models
+        self.cache = cache if cache is not None else ResponseCache()
+        self._clock_task = None
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.symbols = SymbolRegistry(ttl=symbols_ttl)
+        self._symbols_lock = asyncio.Lock()
+        self._symbols_task = None
+        self._session = None
+        self.account_state = None
+        self._account_task = None
+        self._account_wake = None
+        self.order_tracker = None
+        self._orders_task = None
+        self._orders_wake = None
+
+    async def _get_session(self):
+        """Ленивое создание сессии aiohttp внутри работающего event loop."""
+        if self._session is None or self._session.closed:
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(limit=self.pool_size, force_close=not self.keep_alive)
+            timeout = aiohttp.ClientTimeout(sock_connect=self.connect_timeout, sock_read=self.read_timeout)
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=timeout, trace_configs=[self._trace_config(aiohttp)]
+            )
+        return self._session
+
+    @staticmethod
+    def _trace_config(aiohttp):
+        """Трассировка aiohttp: время DNS и установки соединения (включая DNS и TLS) в info попытки, мс."""
+        def phase(name: str, mark: str):
+            async def handler(session, context, params):
+                info = context.trace_request_ctx
+                if not isinstance(info, dict):
+                    return
+                if mark == "start":
+                    info[f"_{name}"] = time.perf_counter()
+                elif f"_{name}" in info:
+                    info[name] = (time.perf_counter() - info.pop(f"_{name}")) * 1000
+            return handler
+
+        trace = aiohttp.TraceConfig()
+        trace.on_dns_resolvehost_start.append(phase("dns", "start"))
+        trace.on_dns_resolvehost_end.append(phase("dns", "end"))
+        trace.on_connection_create_start.append(phase("connect", "start"))
+        trace.on_connection_create_end.append(phase("connect", "end"))
+        return trace
+
+    async def close(self):
+        """Закрытие всех соединений пула."""
+        if self._account_task is not None:
+            self._account_task.cancel()
+            self._account_task = None
+        if self._orders_task is not None:
+            self._orders_task.cancel()
+            self._orders_task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _call(self, name: str, parse=None, **params):
+        """См. Trade._call."""
+        if params.get("symbol"):
+            params["symbol"] = await self.GetSymbol(params["symbol"])
+            if isinstance(params["symbol"], dict):
+                return self._symbol_error(params["symbol"])
+        endpoint = ENDPOINTS[name]
+        error = self._check_order(endpoint, params)
+        if error is not None:
+            return error
+        parse = self._parser(endpoint, parse)
+        ttl = self.cache.ttl(endpoint) if self.cache is not None else None
+        if ttl is None:
+            result = await self._request(endpoint, params, parse)
+        else:
+            result = await self.cache.fetch_async(
+                self._cache_key(endpoint, params), ttl, lambda: self._request(endpoint, params, parse),
+                name, params.get("symbol"),
+            )
+        self._after_call(name, params, result)
+        if self.account_state is not None and self.account_state.dirty:
+            self._account_wake.set()
+        if self.order_tracker is not None and name in ("CreateOrder", "EditOrder"):
+            self._orders_wake.set()
+        return result
+
+    async def _request(self, endpoint: Endpoint, params: dict, parse=None):
+        """Выполнение запроса с повторами и упаковка ответа в словарь, как в Trade._request."""
+        if endpoint.signed and self.clock.stale and (self._clock_task is None or self._clock_task.done()):
+            self._clock_task = asyncio.ensure_future(self.SyncClock())
+        attempt = 0
+        while True:
+            result, failure = await self._send(endpoint, params, parse, attempt)
+            if not self.retry_policy.should_retry(endpoint, params, failure, attempt):
+                return result
+            await asyncio.sleep(self.retry_policy.delay(attempt))
+            attempt += 1
+
+    async def _send(self, endpoint: Endpoint, params: dict, parse=None, attempt: int = 0) -> tuple:
+        """См. Trade._send."""
+        info = self._begin_attempt(endpoint, params, attempt)
+        result, failure = await self._transmit(endpoint, params, parse, info)
+        self._end_attempt(endpoint, params, result, info)
+        return result, failure
+
+    async def _transmit(self, endpoint: Endpoint, params: dict, parse, info: dict) -> tuple:
+        import aiohttp
+
+        if not self.circuit_breaker.allow():
+            return self._circuit_open_error(), None
+        session = await self._get_session()
+        query_string = self._encode_params(endpoint, params)
+        info["wait"] = await self.rate_limiter.acquire_async(endpoint.path, query_string, key=self.api_key) * 1000
+        query_string = self._sign(endpoint, query_string)
+        url = self._url(endpoint, query_string)
+        info["bytes_out"] = len(url)
         try:
-            response = requests.get(url)
-            response.raise_for_status()  # Проверяем, нет ли ошибок HTTP
-            return {
-                "status_code": response.status_code,
-                "data": response.json()
-            }
-        except requests.exceptions.HTTPError as http_err:
-            return {
-                "status_code": response.status_code,
-                "error": f"HTTP error: {http_err}",
-                "response_text": response.text
-            }
-        except requests.exceptions.RequestException as req_err:
+            sent = time.perf_counter()
+            # info передаётся в трассировку aiohttp, которая добавляет фазы dns и connect
+            async with session.request(
+                endpoint.method, url, headers=self._headers(endpoint), trace_request_ctx=info
+            ) as response:
+                info["server"] = (time.perf_counter() - sent) * 1000 - info.get("connect", 0)
+                self._record_outcome(response.status)
+                if response.status in (418, 429):
+                    self.rate_limiter.block(_retry_after(response.headers))
+                if response.status >= 400:
+                    return {
+                        "status_code": response.status,
+                        "error": f"HTTP error: {response.status} {response.reason} for url: {url}",
+                        "response_text": await response.text()
+                    }, self.retry_policy.classify(response.status)
+                body = await response.read()
+                info["bytes_in"] = len(body)
+                parse_started = time.perf_counter()
+                try:
+                    data = parse(body) if parse else json.loads(body) if body.strip() else None
+                except ValueError as parse_err:  # тело не JSON (страница прокси и т. п.), в том числе ошибки orjson
+                    return {
+                        "status_code": response.status,
+                        "error": f"Invalid JSON: {parse_err}",
+                        "response_text": body.decode(errors="replace")
+                    }, RetryPolicy.FAILED
+                result = {"status_code": response.status, "data": data}
+                info["parse"] = (time.perf_counter() - parse_started) * 1000
+                if endpoint.url_key:
+                    result[endpoint.url_key] = url
+                return result, None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as req_err:
+            self._record_outcome(None)
+            unsent = isinstance(req_err, aiohttp.ClientConnectorError)
             return {
                 "status_code": None,
-                "error": f"Request failed: {req_err}",
+                "error": f"Request failed: {req_err!r}",
                 "response_text": None
-            }
+            }, RetryPolicy.UNSENT if unsent else RetryPolicy.FAILED
 
-    def TradingPositionClose(self, position_id):
-        """Закрытие позиции через запрос к /api/v2/closeTradingPosition"""
-        timestamp = int(time.time() * 1000)
-        query_params = [
-            f"positionId={position_id}",
-            f"timestamp={timestamp}",
-            f"recvWindow={self.recv_window}",
-            f"accountId={self.account_id}"
-        ]
+    async def SyncClock(self) -> bool:
+        """Замер смещения часов по /time (см. ClockSync)."""
+        sent = time.time()
+        response, _ = await self._send(ENDPOINTS["ServerTime"], {})  # мимо кэша и без повторов (см. Trade._time_probe)
+        received = time.time()
+        server_ms = (response.get("data") or {}).get("serverTime")
+        if server_ms is None:
+            return False
+        self.clock.add_sample(sent, server_ms, received)
+        return True
 
-        query_string = "&".join(query_params)
-        signature = self._generate_signature(query_string)
-        url = f"{self.url}/closeTradingPosition?{query_string}&signature={signature}"
+    async def RefreshSymbols(self) -> bool:
+        """Принудительное обновление кэша символов из /exchangeInfo (мимо self.cache)."""
+        if self.cache is not None:
+            self.cache.invalidate(("ExchangeInfo",))
+        response = await self.ExchangeInfo()
+        rate_limits = (response.get("data") or {}).get("rateLimits")
+        if rate_limits:
+            self.rate_limiter.configure(rate_limits)
+        return self.symbols.load(response.get("data"))
+
+    async def _ensure_symbols(self):
+        if not self.symbols.loaded:
+            async with self._symbols_lock:
+                if not self.symbols.loaded:
+                    await self.RefreshSymbols()
+        elif self.symbols.expired and (self._symbols_task is None or self._symbols_task.done()):
+            self._symbols_task = asyncio.ensure_future(self.RefreshSymbols())
 
-        headers  = {"X-MBX-APIKEY": self.api_key}
+    async def GetSymbol(self, name: str):
+        """Получение кода символа из кэша (см. Trade.GetSymbol)."""
         try:
-            response = requests.post(url, headers=headers)
-            response.raise_for_status()
-            return {
-                "status_code": response.status_code,
-                "data": response.json(),
-            }
-        except requests.exceptions.HTTPError as http_err:
+            await self._ensure_symbols()
+            symbol = self.symbols.symbol(name)
+        except Exception as ex:
             return {
-                "status_code": response.status_code,
-                "error": f"HTTP error: {http_err}",
-                "response_text": response.text
+                "error": f"HTTP error: {ex}",
             }
-        except requests.exceptions.RequestException as req_err:
+        if symbol is None:
+            return {"error": f"unknown symbol {name!r}"}
+        return symbol
+
+    async def trading_rules(self, symbol: str, limits: bool = True):
+        """См. Trade.trading_rules."""
+        code = await self.GetSymbol(symbol)
+        if isinstance(code, dict):
+            return self._symbol_error(code)
+        rules = self.symbols.rules(code)
+        if limits and not rules.limits_loaded:
+            trading_limits, fees = await asyncio.gather(self.ListOfLimits(code), self.ListOfFees(code))
+            if "error" not in trading_limits and "error" not in fees:
+                rules.update(trading_limits["data"], fees["data"])
+        return rules
+
+    async def AccountInfo(self):
+        """См. Trade.AccountInfo."""
+        return await self._call("AccountInfo")
+
+    async def CancelOrder(self, order_id: str, symbol: str):
+        """См. Trade.CancelOrder."""
+        return await self._call("CancelOrder", order_id=order_id, symbol=symbol)
+
+    async def CreateOrder(
+        self,
+        symbol: str,
+        side: str,
+        type_: str,
+        quantity: float,
+        resp_type: None|str=None,
+        leverage: None|int=None,
+        price: None|float=None,
+        stop_loss: None|float=None,
+        take_profit: None|float=None,
+        client_order_id: None|str=None):
+        """См. Trade.CreateOrder."""
+        return await self._call(
+            "CreateOrder",
+            symbol=symbol,
+            side=side,
+            type_=type_,
+            quantity=quantity,
+            resp_type=resp_type,
+            leverage=leverage,
+            price=price,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+            client_order_id=client_order_id,
+        )
+
+    async def EditOrder(
+        self,
+        order_id: str,
+        symbol: str,
+        side: str,
+        type_: str,
+        quantity: float,
+        price: None|float=None,
+        stop_loss: None|float=None,
+        take_profit: None|float=None
+        ):
+        """См. Trade.EditOrder."""
+        return await self._call(
+            "EditOrder",
+            order_id=order_id,
+            symbol=symbol,
+            side=side,
+            type_=type_,
+            quantity=quantity,
+            price=price,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+        )
+
+    async def ExchangeInfo(self):
+        """См. Trade.ExchangeInfo."""
+        return await self._call("ExchangeInfo")
+
+    async def Klines(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: None| int = None,
+        end_time: None| int = None,
+        limit: None| int = None,
+        price_type: None| int = None,
+        type_: None| int = None,
+        frame: bool = False,
+        ):
+        """См. Trade.Klines."""
+        parse = None
+        if frame:
+            from klines import KlineFrame
+
+            parse = KlineFrame.from_json
+        return await self._call(
+            "Klines",
+            parse=parse,
+            symbol=symbol,
+            interval=interval,
+            start_time=start_time,
+            end_time=end_time,
+            limit=limit,
+            price_type=price_type,
+            type_=type_,
+        )
+
+    async def LeverageOrdersEdit(
+        self,
+        order_id: str,
+        exp_time: None|str=None,
+        guarant_stop_loss: bool=False,
+        new_price: None|float=None,
+        profit_distance: None|int=None,
+        stop_distance: None|int=None,
+        stop_loss: None|float=None,
+        take_profit: None|float=None,
+        trailing_stop_loss: bool=False,
+        ):
+        """См. Trade.LeverageOrdersEdit."""
+        return await self._call(
+            "LeverageOrdersEdit",
+            order_id=order_id,
+            exp_time=exp_time,
+            guarant_stop_loss=guarant_stop_loss,
+            new_price=new_price,
+            profit_distance=profit_distance,
+            stop_distance=stop_distance,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+            trailing_stop_loss=trailing_stop_loss,
+        )
+
+    async def LeverageTradeEdit(
+        self,
+        position_id: str,
+        exp_time: None|str=None,
+        guarant_stop_loss: bool=False,
+        new_price: None|float=None,
+        profit_distance: None|int=None,
+        stop_distance: None|int=None,
+        stop_loss: None|float=None,
+        take_profit: None|float=None,
+        trailing_stop_loss: bool=False,
+        ):
+        """См. Trade.LeverageTradeEdit."""
+        return await self._call(
+            "LeverageTradeEdit",
+            position_id=position_id,
+            exp_time=exp_time,
+            guarant_stop_loss=guarant_stop_loss,
+            new_price=new_price,
+            profit_distance=profit_distance,
+            stop_distance=stop_distance,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+            trailing_stop_loss=trailing_stop_loss,
+        )
+
+    async def ListOfCurrencies(self):
+        """См. Trade.ListOfCurrencies."""
+        return await self._call("ListOfCurrencies")
+
+    async def ListOfFees(self, symbol: str):
+        """См. Trade.ListOfFees."""
+        return await self._call("ListOfFees", symbol=symbol)
+
+    async def ListOfHistoricalPositions(
+        self,
+        from_: None| int = None,
+        symbol: None| str = None,
+        to: None| int = None,
+        limit: None| int = None
+        ):
+        """См. Trade.ListOfHistoricalPositions."""
+        return await self._call("ListOfHistoricalPositions", from_=from_, symbol=symbol, to=to, limit=limit)
+
+    async def ListOfLeverageTrades(self):
+        """См. Trade.ListOfLeverageTrades."""
+        return await self._call("ListOfLeverageTrades")
+
+    async def ListOfLimits(self, symbol: str):
+        """См. Trade.ListOfLimits."""
+        return await self._call("ListOfLimits", symbol=symbol)
+
+    async def ListOfOpenOrders(self, symbol: None|str = None):
+        """См. Trade.ListOfOpenOrders."""
+        return await self._call("ListOfOpenOrders", symbol=symbol)
+
+    async def ListOfTrades(
+        self,
+        symbol: str,
+        start_time: None| int = None,
+        end_time: None| int = None,
+        limit: None| int = None
+        ):
+        """См. Trade.ListOfTrades."""
+        return await self._call("ListOfTrades", symbol=symbol, start_time=start_time, end_time=end_time, limit=limit)
+
+    async def OrderBook(self, symbol: str):
+        """См. Trade.OrderBook."""
+        return await self._call("OrderBook", symbol=symbol)
+
+    async def order_book(self, symbol: str, book: None|LocalOrderBook = None):
+        """См. Trade.order_book."""
+        response = await self.OrderBook(symbol)
+        if "error" in response:
+            return response
+        book = book if book is not None else LocalOrderBook(symbol)
+        book.apply_snapshot(response["data"])
+        return book
+
+    async def PriceChange(self, symbol: None|str = None):
+        """См. Trade.PriceChange."""
+        return await self._call("PriceChange", symbol=symbol)
+
+    async def ServerTime(self):
+        """См. Trade.ServerTime."""
+        return await self._call("ServerTime")
+
+    async def TradingPositionClose(self, position_id):
+        """См. Trade.TradingPositionClose."""
+        return await self._call("TradingPositionClose", position_id=position_id)
+
+    async def create_orders(self, orders: list) -> list:
+        """См. Trade.create_orders."""
+        return await asyncio.gather(*(self.CreateOrder(**order) for order in orders))
+
+    async def cancel_orders(self, orders: list) -> list:
+        """См. Trade.cancel_orders."""
+        return await asyncio.gather(*(self.CancelOrder(**order) for order in orders))
+
+    async def cancel_all(self, symbol: None|str = None):
+        """См. Trade.cancel_all."""
+        response = await self.ListOfOpenOrders(symbol)
+        if "error" in response:
+            return response
+        return await self.cancel_orders([
+            {"order_id": order["orderId"], "symbol": order["symbol"]} for order in response["data"]
+        ])
+
+    async def close_positions(self, position_ids: list) -> list:
+        """См. Trade.close_positions."""
+        return await asyncio.gather(*(self.TradingPositionClose(position_id) for position_id in position_ids))
+
+    async def snapshot(
+        self,
+        symbols: list,
+        include: tuple = ("ticker", "depth", "klines"),
+        interval: str = "1h",
+        limit: None|int = None,
+        ) -> dict:
+        """См. Trade.snapshot."""
+        codes = [await self.GetSymbol(name) for name in symbols]
+        result, resolved, calls = self._snapshot_plan(symbols, codes, include, interval, limit)
+        responses = await asyncio.gather(*(getattr(self, method)(**kwargs) for _, _, method, kwargs in calls))
+        return self._snapshot_merge(result, resolved, calls, responses)
+
+    async def track_account(self, interval: None|float = 5.0) -> AccountState:
+        """См. Trade.track_account; фоновое обновление - задача в текущем event loop."""
+        if self.account_state is None:
+            self.account_state = AccountState(interval=interval)
+            self._account_wake = asyncio.Event()
+            await self.RefreshAccount()
+            if interval is not None:
+                self._account_task = asyncio.ensure_future(self._account_loop())
+        return self.account_state
+
+    async def RefreshAccount(self) -> bool:
+        """Загрузка /account, /tradingPositions и /openOrders в AccountState (см. AccountState.refresh)."""
+        started = self.account_state.begin_refresh()
+        self._account_wake.clear()
+        account, positions, orders = await asyncio.gather(
+            self.AccountInfo(), self.ListOfLeverageTrades(), self.ListOfOpenOrders()
+        )
+        if "error" in account or "error" in positions or "error" in orders:
+            return False
+        self.account_state.load(account["data"], positions["data"], orders["data"], started)
+        if self.account_state.dirty:
+            self._account_wake.set()
+        return True
+
+    async def _account_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._account_wake.wait(), self.account_state.interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.RefreshAccount()
+            except Exception:
+                pass  # до следующей попытки читаем прежнее состояние
+
+    async def track_orders(self, fast: float = 0.5, slow: float = 10.0, backoff: float = 2.0) -> OrderTracker:
+        """См. Trade.track_orders; опрос - задача в текущем event loop, обработчики могут быть корутинами."""
+        if self.order_tracker is None:
+            self.order_tracker = OrderTracker(weight=self.rate_limiter.weight, fast=fast, slow=slow, backoff=backoff)
+            self._orders_wake = asyncio.Event()
+            self._orders_task = asyncio.ensure_future(self._orders_loop())
+        return self.order_tracker
+
+    async def PollOrders(self) -> list:
+        """Один цикл опроса OrderTracker (см. OrderTracker.poll_async)."""
+        return await self.order_tracker.poll_async(self._call_many)
+
+    async def _call_many(self, calls: list) -> list:
+        """См. Trade._call_many."""
+        return list(await asyncio.gather(*(getattr(self, method)(**kwargs) for method, kwargs in calls)))
+
+    async def _orders_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._orders_wake.wait(), self.order_tracker.delay())
+            except asyncio.TimeoutError:
+                pass
+            self._orders_wake.clear()
+            if self.order_tracker.delay() != 0:
+                continue
+            try:
+                await self.PollOrders()
+            except Exception:
+                pass  # сбой опроса - повтор позже (poll_async уже отложил его)
+
+
+class TradeManager:
+    """Клиенты Trade для нескольких аккаунтов и ключей API с общими ресурсами.
+
+    У каждого клиента свои ключи, подпись и account_id; сессия requests (пул соединений),
+    кэш символов, кэш рыночных данных, синхронизация часов, ограничитель частоты и размыкатель
+    цепи - общие. Ограничитель ведёт общий бюджет веса запросов и отдельные корзины ORDERS
+    по каждому ключу. Операции по многим аккаунтам (map, cancel_all) выполняются параллельно.
+    """
+
+    def __init__(
+        self,
+        accounts: dict,
+        url: None|str = None,
+        pool_size: int = 20,
+        symbols_ttl: None|float = 300.0,
+        clock_sync_interval: None|float = 60.0,
+        rate_limiter: None|RateLimiter = None,
+        circuit_breaker: None|CircuitBreaker = None,
+        cache: None|ResponseCache = None,
+        **options,
+        ):
+        """accounts - {имя: Config или словарь с api_key, secret_key, account_id};
+        url адрес API (по умолчанию - из конфигурации аккаунтов, а если там его нет - из окружения/.env,
+        см. Config.from_env);
+        pool_size размер общего пула соединений и пула потоков для операций по аккаунтам;
+        options - прочие аргументы Trade (read_timeout, retry_policy, models, ...);
+        """
+        accounts = {name: self._config(config) for name, config in accounts.items()}
+        self.url = url or next((config.url for config in accounts.values() if config.url), None) \
+            or Config.from_env().url
+        self.pool_size = pool_size
+        self.options = options
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.cache = cache if cache is not None else ResponseCache()
+        self.clock = ClockSync(interval=clock_sync_interval)
+        self.symbols = SymbolRegistry(self._load_exchange_info, ttl=symbols_ttl)
+        self.session = Trade._create_session(pool_size, options.get("keep_alive", True))
+        self.clients: dict = {}
+        self._public = None  # клиент без ключей для /exchangeInfo, пока нет ни одного аккаунта
+        self._executor = None
+        for name, config in accounts.items():
+            self.add(name, config)
+
+    @staticmethod
+    def _config(config: Config|dict) -> Config:
+        return Config(**config) if isinstance(config, dict) else config
+
+    def add(self, name: str, config: Config|dict) -> Trade:
+        """Клиент для ещё одного аккаунта на общих ресурсах."""
+        client = self.clients[name] = self._client(self._config(config))
+        return client
+
+    def _client(self, config: Config) -> Trade:
+        return Trade(
+            url=self.url,
+            pool_size=self.pool_size,
+            rate_limiter=self.rate_limiter,
+            circuit_breaker=self.circuit_breaker,
+            config=config,
+            cache=self.cache,
+            session=self.session,
+            symbols=self.symbols,
+            clock=self.clock,
+            **self.options,
+        )
+
+    def _load_exchange_info(self):
+        # /exchangeInfo одинаков для всех аккаунтов и не требует ключей - загружается через любой клиент,
+        # а без аккаунтов - через клиент без ключей на общих ресурсах
+        client = next(iter(self.clients.values()), None)
+        if client is None:
+            if self._public is None:
+                self._public = self._client(Config(url=self.url))
+            client = self._public
+        return client._load_exchange_info()
+
+    def __getitem__(self, name: str) -> Trade:
+        return self.clients[name]
+
+    def __iter__(self):
+        return iter(self.clients)
+
+    def __len__(self):
+        return len(self.clients)
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = futures.ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="dzg-manager")
+        return self._executor
+
+    @staticmethod
+    def _result(future) -> dict:
+        try:
+            return future.result()
+        except Exception as ex:
             return {
                 "status_code": None,
-                "error": f"Request failed: {req_err}",
+                "error": f"Request failed: {ex}",
                 "response_text": None
             }
+
+    def map(self, method: str, *args, accounts: None|list = None, **kwargs) -> dict:
+        """Параллельный вызов метода Trade method(*args, **kwargs) для аккаунтов accounts (по умолчанию - всех).
+        Возвращает {имя: результат}; исключение клиента возвращается словарём ошибки."""
+        names = list(self.clients) if accounts is None else list(accounts)
+        executor = self._get_executor()
+        submitted = {name: executor.submit(getattr(self.clients[name], method), *args, **kwargs) for name in names}
+        return {name: self._result(future) for name, future in submitted.items()}
+
+    def cancel_all(self, symbol: None|str = None, accounts: None|list = None) -> dict:
+        """Отмена всех открытых ордеров (по symbol или всех) на всех аккаунтах; {имя: результат Trade.cancel_all}."""
+        return self.map("cancel_all", symbol, accounts=accounts)
+
+    def account_info(self, accounts: None|list = None) -> dict:
+        """AccountInfo всех аккаунтов: {имя: ответ}."""
+        return self.map("AccountInfo", accounts=accounts)
+
+    def close(self):
+        """Закрытие клиентов, общего пула соединений и фоновых потоков."""
+        for client in self.clients.values():
+            client.close()
+        if self._public is not None:
+            self._public.close()
+        self.clock.stop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,295 @@
+"""Технические индикаторы над массивами свечей (KlineFrame.close и т. п.).
+
+Функции векторизованы по последней оси: на вход можно подать ряд (n,) или пачку рядов
+(символы, n) - все символы считаются одним проходом. Вместо одного периода можно передать
+список периодов - результат получит дополнительную первую ось по периодам.
+Значения до накопления полного окна - NaN; длина результата равна длине входа.
+
+Классы SMA, EMA, RSI, ATR, Bollinger хранят состояние и обновляются по одной новой свече
+за O(1) (from_history - начальное состояние по истории), без пересчёта всего ряда.
+"""
+
+import numpy as np
+
+
+def _array(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _each(period, compute):
+    """compute(period) для одного периода или np.stack по списку периодов."""
+    if np.ndim(period) == 0:
+        return compute(int(period))
+    return np.stack([compute(int(item)) for item in period])
+
+
+def _ewm(values: np.ndarray, alpha: float, seed: int) -> np.ndarray:
+    """Экспоненциальное сглаживание y = y + alpha * (x - y) по последней оси.
+    Начальное значение - среднее первых seed элементов (позиция seed - 1), раньше - NaN.
+
+    Рекурсия вычисляется через накопленные суммы: в пределах отрезка
+    y[i] = (1-alpha)^(i+1) * (y[-1] + alpha * sum(x[k] / (1-alpha)^(k+1))),
+    длина отрезка ограничена, чтобы степени не переполнялись.
+    """
+    out = np.full(values.shape, np.nan)
+    length = values.shape[-1]
+    if seed > length:
+        return out
+    previous = values[..., :seed].mean(axis=-1)
+    out[..., seed - 1] = previous
+    decay = 1.0 - alpha
+    if decay <= 0:
+        out[..., seed:] = values[..., seed:]
+        return out
+    chunk = max(1, int(600 / -np.log(decay)))
+    for start in range(seed, length, chunk):
+        segment = values[..., start:start + chunk]
+        powers = decay ** np.arange(1, segment.shape[-1] + 1)
+        smoothed = powers * (previous[..., None] + alpha * np.cumsum(segment / powers, axis=-1))
+        out[..., start:start + segment.shape[-1]] = smoothed
+        previous = smoothed[..., -1]
+    return out
+
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(values.shape, np.nan)
+    if window > values.shape[-1]:
+        return out
+    total = np.cumsum(values, axis=-1)
+    out[..., window - 1] = total[..., window - 1]
+    out[..., window:] = total[..., window:] - total[..., :-window]
+    return out
+
+
+def sma(values, window):
+    """Простое скользящее среднее за window свечей."""
+    values = _array(values)
+    return _each(window, lambda window: _rolling_sum(values, window) / window)
+
+
+def ema(values, period):
+    """Экспоненциальное скользящее среднее, alpha = 2 / (period + 1), начало - SMA первых period значений."""
+    values = _array(values)
+    return _each(period, lambda period: _ewm(values, 2.0 / (period + 1), period))
+
+
+def _rsi(close: np.ndarray, period: int) -> np.ndarray:
+    change = np.diff(close, axis=-1)
+    average_gain = _ewm(np.clip(change, 0, None), 1.0 / period, period)
+    average_loss = _ewm(np.clip(-change, 0, None), 1.0 / period, period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + average_gain / average_loss)
+    rsi = np.where(average_loss == 0, np.where(average_gain == 0, 50.0, 100.0), rsi)
+    return np.concatenate([np.full(close.shape[:-1] + (1,), np.nan), rsi], axis=-1)
+
+
+def rsi(close, period=14):
+    """Индекс относительной силы со сглаживанием Уайлдера (alpha = 1 / period)."""
+    close = _array(close)
+    return _each(period, lambda period: _rsi(close, period))
+
+
+def true_range(high, low, close) -> np.ndarray:
+    """Истинный диапазон; для первой свечи - high - low."""
+    high, low, close = _array(high), _array(low), _array(close)
+    previous = np.concatenate([close[..., :1], close[..., :-1]], axis=-1)
+    ranges = np.maximum(high - low, np.maximum(np.abs(high - previous), np.abs(low - previous)))
+    ranges[..., 0] = high[..., 0] - low[..., 0]
+    return ranges
+
+
+def atr(high, low, close, period=14):
+    """Средний истинный диапазон со сглаживанием Уайлдера."""
+    ranges = true_range(high, low, close)
+    return _each(period, lambda period: _ewm(ranges, 1.0 / period, period))
+
+
+def _bollinger(values: np.ndarray, window: int, k: float) -> np.ndarray:
+    # сдвиг на первое значение уменьшает потерю точности в разности сумм квадратов
+    shifted = values - values[..., :1]
+    mean = _rolling_sum(shifted, window) / window
+    variance = np.maximum(_rolling_sum(shifted * shifted, window) / window - mean * mean, 0.0)
+    middle = mean + values[..., :1]
+    deviation = k * np.sqrt(variance)
+    return np.stack([middle, middle + deviation, middle - deviation])
+
+
+def bollinger(values, window=20, k=2.0):
+    """Полосы Боллинджера: массив (3, ...) - средняя, верхняя и нижняя (стандартное отклонение по окну)."""
+    values = _array(values)
+    return _each(window, lambda window: _bollinger(values, window, k))
+
+
+class _Smoother:
+    """Состояние _ewm для обновления по одному значению (скаляр или массив по символам)."""
+
+    __slots__ = ("period", "alpha", "count", "total", "value")
+
+    def __init__(self, period: int, alpha: float):
+        self.period = period
+        self.alpha = alpha
+        self.count = 0
+        self.total = 0.0  # сумма первых period значений для начального среднего
+        self.value = None
+
+    def restore(self, history: np.ndarray):
+        self.count = history.shape[-1]
+        if self.count >= self.period:
+            self.value = _ewm(history, self.alpha, self.period)[..., -1]
+        else:
+            self.total = history.sum(axis=-1)
+
+    def update(self, value):
+        self.count += 1
+        if self.count < self.period:
+            self.total = self.total + value
+        elif self.count == self.period:
+            self.value = (self.total + value) / self.period
+        else:
+            self.value = self.value + self.alpha * (value - self.value)
+        return self.value if self.value is not None else np.full(np.shape(value), np.nan)
+
+
+class _Window:
+    """Кольцевой буфер последних window значений с суммой и суммой квадратов."""
+
+    __slots__ = ("window", "buffer", "index", "count", "total", "squares")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.buffer = None
+        self.index = 0
+        self.count = 0
+
+    def update(self, value):
+        value = _array(value)
+        if self.buffer is None:
+            self.buffer = np.zeros((self.window,) + value.shape)
+            self.total = np.zeros(value.shape)
+            self.squares = np.zeros(value.shape)
+        previous = self.buffer[self.index].copy()
+        self.buffer[self.index] = value
+        self.index = (self.index + 1) % self.window
+        self.count += 1
+        if self.index == 0:
+            # раз в окно суммы пересчитываются по буферу, чтобы ошибка округления не накапливалась
+            self.total = self.buffer.sum(axis=0)
+            self.squares = (self.buffer * self.buffer).sum(axis=0)
+        else:
+            self.total = self.total + value - previous
+            self.squares = self.squares + value * value - previous * previous
+        return self.count >= self.window
+
+    def restore(self, history: np.ndarray):
+        for value in np.moveaxis(history[..., -self.window:], -1, 0):
+            self.update(value)
+        self.count = history.shape[-1]
+
+
+class SMA:
+    """Инкрементальная SMA: update(значение) возвращает текущее среднее (NaN до заполнения окна)."""
+
+    def __init__(self, window: int):
+        self._window = _Window(window)
+
+    @classmethod
+    def from_history(cls, values, window: int):
+        indicator = cls(window)
+        indicator._window.restore(_array(values))
+        return indicator
+
+    def update(self, value):
+        ready = self._window.update(value)
+        return self._window.total / self._window.window if ready else np.full(np.shape(value), np.nan)
+
+
+class EMA:
+    """Инкрементальная EMA с тем же началом, что у ema."""
+
+    def __init__(self, period: int):
+        self._smoother = _Smoother(period, 2.0 / (period + 1))
+
+    @classmethod
+    def from_history(cls, values, period: int):
+        indicator = cls(period)
+        indicator._smoother.restore(_array(values))
+        return indicator
+
+    def update(self, value):
+        return self._smoother.update(_array(value))
+
+
+class RSI:
+    """Инкрементальный RSI по ценам закрытия."""
+
+    def __init__(self, period: int = 14):
+        self._gain = _Smoother(period, 1.0 / period)
+        self._loss = _Smoother(period, 1.0 / period)
+        self._previous = None
+
+    @classmethod
+    def from_history(cls, close, period: int = 14):
+        indicator = cls(period)
+        close = _array(close)
+        change = np.diff(close, axis=-1)
+        indicator._gain.restore(np.clip(change, 0, None))
+        indicator._loss.restore(np.clip(-change, 0, None))
+        indicator._previous = close[..., -1]
+        return indicator
+
+    def update(self, close):
+        close = _array(close)
+        previous, self._previous = self._previous, close
+        if previous is None:
+            return np.full(close.shape, np.nan)
+        change = close - previous
+        gain = self._gain.update(np.clip(change, 0, None))
+        loss = self._loss.update(np.clip(-change, 0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            value = 100.0 - 100.0 / (1.0 + gain / loss)
+        return np.where(loss == 0, np.where(gain == 0, 50.0, 100.0), value)
+
+
+class ATR:
+    """Инкрементальный ATR по (high, low, close) новой свечи."""
+
+    def __init__(self, period: int = 14):
+        self._smoother = _Smoother(period, 1.0 / period)
+        self._previous = None
+
+    @classmethod
+    def from_history(cls, high, low, close, period: int = 14):
+        indicator = cls(period)
+        indicator._smoother.restore(true_range(high, low, close))
+        indicator._previous = _array(close)[..., -1]
+        return indicator
+
+    def update(self, high, low, close):
+        high, low, close = _array(high), _array(low), _array(close)
+        if self._previous is None:
+            value = high - low
+        else:
+            value = np.maximum(high - low, np.maximum(np.abs(high - self._previous), np.abs(low - self._previous)))
+        self._previous = close
+        return self._smoother.update(value)
+
+
+class Bollinger:
+    """Инкрементальные полосы Боллинджера: update возвращает массив (средняя, верхняя, нижняя)."""
+
+    def __init__(self, window: int = 20, k: float = 2.0):
+        self._window = _Window(window)
+        self.k = k
+
+    @classmethod
+    def from_history(cls, values, window: int = 20, k: float = 2.0):
+        indicator = cls(window, k)
+        indicator._window.restore(_array(values))
+        return indicator
+
+    def update(self, value):
+        if not self._window.update(value):
+            return np.full((3,) + np.shape(value), np.nan)
+        mean = self._window.total / self._window.window
+        deviation = self.k * np.sqrt(np.maximum(self._window.squares / self._window.window - mean * mean, 0.0))
+        return np.stack([mean, mean + deviation, mean - deviation])
@@ -0,0 +1,264 @@
+import json
+import os
+import threading
+import time
+from urllib.parse import quote
+
+import numpy as np
+
+from dzg import DzengiError, interval_ms, to_ms
+
+
+class KlineFrame:
+    """Колоночное хранение свечей в массивах NumPy.
+
+    open_time - время открытия в миллисекундах (int64),
+    open, high, low, close, volume - float64.
+    """
+
+    __slots__ = ("open_time", "open", "high", "low", "close", "volume")
+    COLUMNS = __slots__
+
+    def __init__(self, open_time, open, high, low, close, volume):
+        self.open_time = np.asarray(open_time, dtype=np.int64)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+
+    @classmethod
+    def empty(cls):
+        return cls(*([] for _ in cls.COLUMNS))
+
+    @classmethod
+    def _from_matrix(cls, matrix: np.ndarray):
+        if not len(matrix):
+            return cls.empty()
+        return cls(matrix[:, 0].astype(np.int64), *(matrix[:, i] for i in range(1, 6)))
+
+    @classmethod
+    def from_rows(cls, rows: list):
+        """Создание из ответа Klines в виде списка списков [openTime, o, h, l, c, v, ...]."""
+        if not rows:
+            return cls.empty()
+        return cls._from_matrix(np.array([row[:6] for row in rows], dtype=np.float64))
+
+    @classmethod
+    def from_json(cls, content: bytes|str):
+        """Быстрый разбор тела ответа /klines сразу в массивы, без промежуточных списков Python."""
+        if isinstance(content, str):
+            content = content.encode()
+        content = content.strip()
+        if content in (b"", b"[]"):
+            return cls.empty()
+        first_row = content[content.index(b"[", 1):content.index(b"]") + 1]
+        width = first_row.count(b",") + 1
+        flat = content.translate(None, b'[]" \n\r\t').decode("ascii")
+        values = np.fromstring(flat, dtype=np.float64, sep=",")
+        return cls._from_matrix(values.reshape(-1, width)[:, :6])
+
+    @classmethod
+    def concat(cls, frames: list):
+        """Склейка нескольких фреймов в один."""
+        frames = [frame for frame in frames if len(frame)]
+        if not frames:
+            return cls.empty()
+        return cls(*(np.concatenate([getattr(frame, name) for frame in frames]) for name in cls.COLUMNS))
+
+    def __len__(self):
+        return len(self.open_time)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return tuple(getattr(self, name)[key] for name in self.COLUMNS)
+        return KlineFrame(*(getattr(self, name)[key] for name in self.COLUMNS))
+
+    def __repr__(self):
+        return f"KlineFrame(rows={len(self)})"
+
+    def to_rows(self) -> list:
+        """Обратное преобразование в список списков, как в ответе Klines."""
+        return [list(row) for row in zip(self.open_time.tolist(), *(getattr(self, name).tolist() for name in self.COLUMNS[1:]))]
+
+    def resample(self, interval: str):
+        """Агрегация свечей в более крупный интервал (например, 1m -> 1h)."""
+        if not len(self):
+            return KlineFrame.empty()
+        step = interval_ms(interval)
+        buckets = self.open_time // step
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(self)] - 1
+        return KlineFrame(
+            buckets[starts] * step,
+            self.open[starts],
+            np.maximum.reduceat(self.high, starts),
+            np.minimum.reduceat(self.low, starts),
+            self.close[ends],
+            np.add.reduceat(self.volume, starts),
+        )
+
+    def returns(self, log: bool = False) -> np.ndarray:
+        """Доходности по цене закрытия (простые или логарифмические), длина len - 1."""
+        if log:
+            return np.diff(np.log(self.close))
+        return self.close[1:] / self.close[:-1] - 1.0
+
+    def vwap(self, window: None|int = None) -> np.ndarray:
+        """VWAP по типичной цене (high + low + close) / 3.
+        window None - накопительный с начала фрейма, иначе скользящий по window свечам.
+        """
+        typical = (self.high + self.low + self.close) / 3.0
+        pv = np.cumsum(typical * self.volume)
+        vol = np.cumsum(self.volume)
+        if window is not None:
+            pv[window:] = pv[window:] - pv[:-window]
+            vol[window:] = vol[window:] - vol[:-window]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return pv / vol
+
+
+class KlineStore:
+    """Локальное хранилище свечей: по файлу на (symbol, interval, priceType).
+
+    Файлы - бинарные записи RECORD, отсортированные по open_time, только дозапись;
+    чтение идёт через np.memmap, так что повторные выборки не читают файл целиком.
+    Сохраняются только закрытые свечи - текущая незавершённая всегда берётся с сервера.
+    Файлы лежат по коду символа; коды, найденные по name, запоминаются в ALIASES,
+    чтобы чтение сохранённого диапазона не запрашивало /exchangeInfo.
+    """
+
+    RECORD = np.dtype([(name, "<i8" if name == "open_time" else "<f8") for name in KlineFrame.COLUMNS])
+    ALIASES = "symbols.json"
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        self._aliases = None  # name -> код символа, читается из ALIASES при первом обращении
+
+    def _alias(self, symbol: str) -> None|str:
+        with self._lock:
+            if self._aliases is None:
+                try:
+                    with open(os.path.join(self.root, self.ALIASES), encoding="utf-8") as file:
+                        self._aliases = json.load(file)
+                except (OSError, ValueError):
+                    self._aliases = {}
+            return self._aliases.get(symbol)
+
+    def _code(self, trade, symbol: str) -> str:
+        """Код символа: из ALIASES, по уже сохранённому каталогу или через trade.GetSymbol."""
+        code = self._alias(symbol)
+        if code is not None:
+            return code
+        if os.path.isdir(os.path.join(self.root, quote(symbol, safe=""))):
+            return symbol
+        code = trade.GetSymbol(symbol)
+        if isinstance(code, dict):
+            raise DzengiError(code)
+        if code != symbol:
+            with self._lock:
+                self._aliases[symbol] = code
+                os.makedirs(self.root, exist_ok=True)
+                path = os.path.join(self.root, self.ALIASES)
+                with open(path + ".tmp", "w", encoding="utf-8") as file:
+                    json.dump(self._aliases, file)
+                os.replace(path + ".tmp", path)
+        return code
+
+    def path(self, symbol: str, interval: str, price_type: None|str = None) -> str:
+        return os.path.join(self.root, quote(symbol, safe=""), f"{interval}_{price_type or 'default'}.bin")
+
+    def _records(self, path: str):
+        if not os.path.exists(path):
+            return np.empty(0, dtype=self.RECORD)
+        count = os.path.getsize(path) // self.RECORD.itemsize  # хвост от оборванной записи игнорируется
+        if not count:
+            return np.empty(0, dtype=self.RECORD)
+        return np.memmap(path, dtype=self.RECORD, mode="r", shape=(count,))
+
+    def read(
+        self,
+        symbol: str,
+        interval: str,
+        price_type: None|str = None,
+        start: None|int = None,
+        end: None|int = None,
+        ) -> KlineFrame:
+        """Выборка сохранённых свечей с open_time в [start, end]."""
+        records = self._records(self.path(symbol, interval, price_type))
+        lo = np.searchsorted(records["open_time"], start, "left") if start is not None else 0
+        hi = np.searchsorted(records["open_time"], end, "right") if end is not None else len(records)
+        records = records[lo:hi]
+        return KlineFrame(*(records[name] for name in KlineFrame.COLUMNS))
+
+    def bounds(self, symbol: str, interval: str, price_type: None|str = None) -> None|tuple:
+        """(первое, последнее) сохранённое open_time или None."""
+        open_time = self._records(self.path(symbol, interval, price_type))["open_time"]
+        return (int(open_time[0]), int(open_time[-1])) if len(open_time) else None
+
+    def write(self, symbol: str, interval: str, frame: KlineFrame, price_type: None|str = None):
+        """Дозапись свечей новее последней сохранённой; если frame начинается раньше
+        сохранённого диапазона, файл перезаписывается объединёнными данными."""
+        if not len(frame):
+            return
+        path = self.path(symbol, interval, price_type)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            stored = self._records(path)
+            if len(stored) and frame.open_time[0] < stored["open_time"][0]:
+                tail = self.read(symbol, interval, price_type, start=int(frame.open_time[-1]) + 1)
+                merged = KlineFrame.concat([frame, tail])
+                self._dump(path + ".tmp", merged, "wb")
+                os.replace(path + ".tmp", path)
+                return
+            if len(stored):
+                frame = frame[frame.open_time > stored["open_time"][-1]]
+            self._dump(path, frame, "ab")
+
+    def _dump(self, path: str, frame: KlineFrame, mode: str):
+        records = np.empty(len(frame), dtype=self.RECORD)
+        for name in KlineFrame.COLUMNS:
+            records[name] = getattr(frame, name)
+        with open(path, mode) as file:
+            file.write(records.tobytes())
+
+    def klines(
+        self,
+        trade,
+        symbol: str,
+        interval: str,
+        start: int,
+        end: None|int = None,
+        price_type: None|str = None,
+        concurrency: int = 1,
+        ) -> KlineFrame:
+        """Свечи за [start, end]: сохранённый диапазон читается с диска,
+        с сервера (trade.iter_klines) догружается только недостающее.
+        """
+        start = to_ms(start)
+        end = to_ms(end) if end is not None else int(time.time() * 1000)
+        step = interval_ms(interval)
+        code = self._code(trade, symbol)
+
+        def fetch(fetch_start: int, fetch_end: int) -> KlineFrame:
+            rows = trade.iter_klines(symbol, interval, fetch_start, fetch_end, price_type=price_type, concurrency=concurrency)
+            return KlineFrame.from_rows(list(rows))
+
+        closed_before = int(time.time() * 1000) - step  # свечи, открытые позже, ещё не закрыты
+        stored = self.bounds(code, interval, price_type)
+        if stored is None or start < stored[0]:
+            head_end = end if stored is None else stored[0] - step
+            head = fetch(start, head_end)
+            self.write(code, interval, head[head.open_time <= closed_before], price_type)
+            stored = self.bounds(code, interval, price_type)
+        fresh = KlineFrame.empty()
+        if stored is None or end > stored[1]:
+            # догружаем от последней сохранённой свечи, чтобы в файле не было разрывов
+            fresh_start = start if stored is None else stored[1] + step
+            fresh = fetch(fresh_start, end)
+            self.write(code, interval, fresh[fresh.open_time <= closed_before], price_type)
+        cached = self.read(code, interval, price_type, start, end)
+        if len(fresh) and len(cached):
+            fresh = fresh[fresh.open_time > cached.open_time[-1]]  # незакрытая свеча, не попавшая на диск
+        return KlineFrame.concat([cached, fresh])
@@ -0,0 +1,270 @@
+from collections.abc import Sequence
+from typing import NamedTuple
+
+try:
+    from orjson import loads  # быстрый разбор JSON, если установлен extra "fast"
+except ImportError:
+    from json import loads
+
+
+def _int(value) -> int:
+    """int из числа или строки ответа API (в том числе вида "5.0")."""
+    return value if isinstance(value, int) else int(float(value))
+
+
+class Model:
+    """Компактная запись ответа API: значения в __slots__ вместо словаря.
+
+    FIELDS - тройки (атрибут, ключ JSON, преобразование); ключи, не описанные в FIELDS,
+    отбрасываются. Для совместимости с кодом, работающим со словарями, поддерживаются
+    record["ключ JSON"] и record.get("ключ JSON").
+    """
+
+    __slots__ = ()
+    FIELDS: tuple = ()
+    KEY: None|str = None  # ключ JSON, по которому одиночная запись отличается от обёртки со списками
+    CONTAINERS: tuple = ()  # ключи обёртки, под которыми лежат списки записей
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._ATTRS = {key: attr for attr, key, _ in cls.FIELDS}
+
+    @classmethod
+    def from_raw(cls, data: dict):
+        record = cls.__new__(cls)
+        for attr, key, convert in cls.FIELDS:
+            value = data.get(key)
+            setattr(record, attr, convert(value) if convert is not None and value is not None else value)
+        return record
+
+    def __getitem__(self, key: str):
+        if key not in self._ATTRS:
+            raise KeyError(key)
+        return getattr(self, self._ATTRS[key])
+
+    def get(self, key: str, default=None):
+        value = getattr(self, self._ATTRS[key]) if key in self._ATTRS else None
+        return default if value is None else value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def to_dict(self) -> dict:
+        """Словарь с ключами JSON (пропущенные поля не включаются)."""
+        return {key: getattr(self, attr) for attr, key, _ in self.FIELDS if getattr(self, attr) is not None}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, attr) == getattr(other, attr) for attr in self.__slots__)
+
+    def __repr__(self):
+        fields = ", ".join(f"{attr}={getattr(self, attr)!r}" for attr in self.__slots__ if getattr(self, attr) is not None)
+        return f"{type(self).__name__}({fields})"
+
+
+class Order(Model):
+    """Ордер из /order и /openOrders."""
+
+    FIELDS = (
+        ("symbol", "symbol", None),
+        ("order_id", "orderId", None),
+        ("client_order_id", "clientOrderId", None),
+        ("account_id", "accountId", None),
+        ("side", "side", None),
+        ("type", "type", None),
+        ("status", "status", None),
+        ("time_in_force", "timeInForce", None),
+        ("price", "price", float),
+        ("quantity", "origQty", float),
+        ("executed_quantity", "executedQty", float),
+        ("leverage", "leverage", _int),
+        ("stop_loss", "stopLoss", float),
+        ("take_profit", "takeProfit", float),
+        ("time", "time", _int),
+        ("transact_time", "transactTime", _int),
+    )
+    __slots__ = tuple(field[0] for field in FIELDS)
+    KEY = "orderId"
+
+
+class Position(Model):
+    """Позиция из /tradingPositions и /tradingPositionsHistory."""
+
+    FIELDS = (
+        ("id", "id", None),
+        ("symbol", "symbol", None),
+        ("account_id", "accountId", None),
+        ("order_id", "orderId", None),
+        ("state", "state", None),
+        ("currency", "currency", None),
+        ("open_quantity", "openQuantity", float),
+        ("open_price", "openPrice", float),
+        ("close_quantity", "closeQuantity", float),
+        ("close_price", "closePrice", float),
+        ("stop_loss", "stopLoss", float),
+        ("take_profit", "takeProfit", float),
+        ("margin", "margin", float),
+        ("upl", "upl", float),
+        ("rpl", "rpl", float),
+        ("swap", "swap", float),
+        ("fee", "fee", float),
+        ("created_timestamp", "createdTimestamp", _int),
+        ("open_timestamp", "openTimestamp", _int),
+        ("close_timestamp", "closeTimestamp", _int),
+    )
+    __slots__ = tuple(field[0] for field in FIELDS)
+    KEY = "id"
+    CONTAINERS = ("positions", "history")
+
+
+class Fill(Model):
+    """Сделка из /myTrades."""
+
+    FIELDS = (
+        ("id", "id", None),
+        ("symbol", "symbol", None),
+        ("order_id", "orderId", None),
+        ("price", "price", float),
+        ("quantity", "qty", float),
+        ("quote_quantity", "quoteQty", float),
+        ("commission", "commission", float),
+        ("commission_asset", "commissionAsset", None),
+        ("time", "time", _int),
+        ("buyer", "buyer", None),
+        ("maker", "maker", None),
+    )
+    __slots__ = tuple(field[0] for field in FIELDS)
+    KEY = "id"
+
+
+class Ticker(Model):
+    """Статистика за 24ч из /ticker/24hr."""
+
+    FIELDS = (
+        ("symbol", "symbol", None),
+        ("price_change", "priceChange", float),
+        ("price_change_percent", "priceChangePercent", float),
+        ("weighted_avg_price", "weightedAvgPrice", float),
+        ("prev_close_price", "prevClosePrice", float),
+        ("last_price", "lastPrice", float),
+        ("last_qty", "lastQty", float),
+        ("bid_price", "bidPrice", float),
+        ("bid_qty", "bidQty", float),
+        ("ask_price", "askPrice", float),
+        ("ask_qty", "askQty", float),
+        ("open_price", "openPrice", float),
+        ("high_price", "highPrice", float),
+        ("low_price", "lowPrice", float),
+        ("volume", "volume", float),
+        ("quote_volume", "quoteVolume", float),
+        ("open_time", "openTime", _int),
+        ("close_time", "closeTime", _int),
+    )
+    __slots__ = tuple(field[0] for field in FIELDS)
+    KEY = "symbol"
+
+
+class SymbolInfo(Model):
+    """Описание символа из /exchangeInfo; filters и orderTypes хранятся как в ответе."""
+
+    FIELDS = (
+        ("symbol", "symbol", None),
+        ("name", "name", None),
+        ("status", "status", None),
+        ("type", "type", None),
+        ("market_type", "marketType", None),
+        ("base_asset", "baseAsset", None),
+        ("quote_asset", "quoteAsset", None),
+        ("tick_size", "tickSize", float),
+        ("tick_value", "tickValue", float),
+        ("exchange_fee", "exchangeFee", float),
+        ("maker_fee", "makerFee", float),
+        ("taker_fee", "takerFee", float),
+        ("trading_fee", "tradingFee", float),
+        ("min_leverage", "minLeverage", float),
+        ("max_leverage", "maxLeverage", float),
+        ("order_types", "orderTypes", None),
+        ("filters", "filters", None),
+    )
+    __slots__ = tuple(field[0] for field in FIELDS)
+    KEY = "symbol"
+    CONTAINERS = ("symbols",)
+
+
+class Kline(NamedTuple):
+    """Свеча из /klines; кортеж, поэтому kline[0] - время открытия, как в исходном ответе."""
+
+    open_time: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+    @classmethod
+    def from_raw(cls, row: list):
+        return cls(_int(row[0]), float(row[1]), float(row[2]), float(row[3]), float(row[4]), float(row[5]))
+
+
+class ModelList(Sequence):
+    """Список записей, которые превращаются в модели при первом обращении.
+
+    Исходный элемент (словарь или список из JSON) заменяется моделью на месте,
+    поэтому прочитанная часть ответа больше не держит промежуточные словари.
+    """
+
+    __slots__ = ("_items", "_model", "_converted")
+
+    def __init__(self, items: list, model):
+        self._items = items
+        self._model = model
+        self._converted = 0  # число уже преобразованных элементов (ускоряет повторный проход)
+
+    def __len__(self):
+        return len(self._items)
+
+    def _convert(self, index: int):
+        item = self._items[index]
+        if not isinstance(item, self._model):
+            item = self._items[index] = self._model.from_raw(item)
+            self._converted += 1
+        return item
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._convert(i) for i in range(*index.indices(len(self._items)))]
+        return self._convert(index)
+
+    def __iter__(self):
+        if self._converted == len(self._items):
+            return iter(self._items)
+        return (self._convert(i) for i in range(len(self._items)))
+
+    def __eq__(self, other):
+        return isinstance(other, (list, ModelList)) and list(self) == list(other)
+
+    def __repr__(self):
+        return f"ModelList({self._model.__name__}, {len(self._items)} items)"
+
+
+def wrap(data, model):
+    """Обёртка разобранного JSON: списки - в ModelList, одиночные записи - в модель."""
+    if isinstance(data, list):
+        return ModelList(data, model)
+    if not isinstance(data, dict):
+        return data
+    if getattr(model, "KEY", None) in data:
+        return model.from_raw(data)
+    containers = getattr(model, "CONTAINERS", ())
+    return {key: ModelList(value, model) if key in containers and isinstance(value, list) else value
+            for key, value in data.items()}
+
+
+def parser(model):
+    """Функция разбора тела ответа (bytes) для параметра parse конвейера запросов.
+
+    JSON разбирается сразу целиком (orjson, если установлен); лениво, при первом обращении,
+    выполняется только превращение записей списков в модели (ModelList).
+    """
+    return lambda content: wrap(loads(content), model)
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+from dzg import AsyncTrade, Config, RetryPolicy, Trade  # noqa: E402
+from mock_server import MockDzengi  # noqa: E402
+
+
+@pytest.fixture
+def mock():
+    with MockDzengi(symbols=5) as server:
+        server.url = server.start()
+        yield server
+
+
+@pytest.fixture
+def make_trade(mock):
+    """Trade против mock без фоновых потоков; make_trade(**options) - с другими параметрами."""
+    trades = []
+
+    def make(**options):
+        trade = Trade(**_options(mock, options))
+        trades.append(trade)
+        return trade
+
+    yield make
+    for trade in trades:
+        trade.close()
+
+
+@pytest.fixture
+def make_async_trade(mock):
+    """AsyncTrade против mock с теми же параметрами, что и make_trade; закрывается через async with."""
+    return lambda **options: AsyncTrade(**_options(mock, options))
+
+
+def _options(mock, options: dict) -> dict:
+    options.setdefault("clock_sync_interval", None)
+    options.setdefault("symbols_ttl", None)
+    options.setdefault("retry_policy", RetryPolicy(attempts=3, base_delay=0.0))
+    options.setdefault("config", Config(api_key="key", secret_key="secret", url=mock.url))
+    return options
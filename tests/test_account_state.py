@@ -0,0 +1,90 @@
+from dzg import AccountState
+
+
+def _market(trade, side="BUY"):
+    return trade.CreateOrder("Symbol 1", side, "MARKET", 0.5)["data"]
+
+
+def _limit(trade, price=100.0):
+    return trade.CreateOrder("Symbol 1", "BUY", "LIMIT", 0.1, price=price)["data"]
+
+
+def _during_refresh(state, action):
+    """Выполнение action между получением ответов и их загрузкой, как при подтверждении во время обновления."""
+    loader = state._loader
+
+    def load():
+        responses = loader()
+        action()
+        return responses
+
+    state._loader = load
+
+
+def test_positions_are_loaded_from_trading_positions(mock, make_trade):
+    trade = make_trade()
+    order = _market(trade)
+    state = trade.track_account(interval=None)
+    [position] = state.positions("SYM1.")
+    assert position["orderId"] == order["orderId"]
+    assert mock.calls["tradingPositions"] == 1
+
+
+def test_position_close_is_applied_locally(mock, make_trade):
+    trade = make_trade()
+    _market(trade)
+    state = trade.track_account(interval=None)
+    [position] = state.positions()
+    assert trade.TradingPositionClose(position["id"])["status_code"] == 200
+    assert state.positions() == [] and mock.positions == {}
+
+
+def test_order_acknowledged_during_refresh_is_merged(mock, make_trade):
+    trade = make_trade()
+    state = trade.track_account(interval=None)
+    mock.open_position({"orderId": "external", "symbol": "SYM2.", "side": "SELL", "origQty": "1", "price": "10"})
+    created = []
+    _during_refresh(state, lambda: created.append(_limit(trade)))
+    version = state.snapshot()["version"]
+    assert state.refresh()
+    assert [order["orderId"] for order in state.open_orders()] == [created[0]["orderId"]]
+    assert [position["orderId"] for position in state.positions()] == ["external"]  # загрузка не отброшена
+    assert state.snapshot()["version"] > version
+
+
+def test_cancel_acknowledged_during_refresh_is_merged(mock, make_trade):
+    trade = make_trade()
+    order = _limit(trade)
+    state = trade.track_account(interval=None)
+    assert len(state.open_orders()) == 1
+    _during_refresh(state, lambda: trade.CancelOrder(order["orderId"], "Symbol 1"))
+    assert state.refresh()
+    assert state.open_orders() == []
+    _during_refresh(state, lambda: None)
+    state.refresh()
+    assert state.open_orders() == []
+
+
+def test_refresh_started_before_published_snapshot_is_ignored(make_trade):
+    trade = make_trade()
+    state = trade.track_account(interval=None)
+    started = state.begin_refresh()
+    _limit(trade)
+    assert state.refresh()
+    account, positions, orders = state._loader()
+    assert state.load(account["data"], positions["data"], [], started) == 0
+    assert len(state.open_orders()) == 1
+
+
+def test_journal_keeps_only_changes_newer_than_the_last_load(mock, make_trade, monkeypatch):
+    trade = make_trade()
+    state = trade.track_account(interval=None)
+    for _ in range(5):
+        _limit(trade)
+    assert len(state._journal) == 5  # все новее начала последней загрузки
+    state.refresh()
+    _limit(trade)
+    assert len(state._journal) == 1
+    monkeypatch.setattr(AccountState, "JOURNAL_TTL", 0.0)
+    _limit(trade)
+    assert len(state._journal) == 1
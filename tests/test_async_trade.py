@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+
+def _run(make_async_trade, call, **options):
+    async def run():
+        async with make_async_trade(**options) as trade:
+            return await call(trade)
+
+    return asyncio.run(run())
+
+
+def test_requests_and_symbols(mock, make_async_trade):
+    async def call(trade):
+        return await trade.OrderBook("Symbol 1"), await trade.AccountInfo()
+
+    depth, account = _run(make_async_trade, call)
+    assert depth["status_code"] == 200 and len(depth["data"]["bids"]) == mock.depth
+    assert account["data"]["balances"][0]["asset"] == "USD"
+
+
+@pytest.mark.parametrize("models", [False, True])
+def test_non_json_body_is_an_error(mock, make_async_trade, models):
+    mock._any_ticker_24hr = lambda query: b"<html>bad gateway</html>"  # с models=True - разбор через models.parser
+    result = _run(make_async_trade, lambda trade: trade.PriceChange("Symbol 1"), models=models)
+    assert result["status_code"] == 200 and result["error"].startswith("Invalid JSON")
+    assert result["response_text"] == "<html>bad gateway</html>"
+
+
+def test_non_json_order_response_is_not_retried(mock, make_async_trade):
+    mock._post_order = lambda query: b"<html>bad gateway</html>"
+    result = _run(make_async_trade, lambda trade: trade.CreateOrder("Symbol 1", "BUY", "MARKET", 0.1))
+    assert "error" in result and mock.calls["order"] == 1
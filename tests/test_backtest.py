@@ -0,0 +1,33 @@
+import pytest
+
+np = pytest.importorskip("numpy")  # extra "numpy"
+
+from backtest import SimulatedTrade  # noqa: E402
+from klines import KlineFrame  # noqa: E402
+from mock_server import MockDzengi  # noqa: E402
+
+
+def _frame(bars: int = 10) -> KlineFrame:
+    close = 100.0 + np.arange(bars)
+    return KlineFrame(np.arange(bars) * 60_000, close, close + 0.5, close - 0.5, close, np.ones(bars))
+
+
+@pytest.fixture
+def simulated():
+    exchange_info = MockDzengi(symbols=2)._any_exchangeInfo({})
+    trade = SimulatedTrade({"SYM1.": _frame()}, exchange_info=exchange_info)
+    trade._advance(0)
+    return trade
+
+
+def test_lists_resolve_symbol_names(simulated):
+    order = simulated.CreateOrder("Symbol 1", "BUY", "LIMIT", 1, price=50.0)["data"]
+    simulated.CreateOrder("Symbol 1", "BUY", "MARKET", 1)
+    assert [item["orderId"] for item in simulated.ListOfOpenOrders("Symbol 1")["data"]] == [order["orderId"]]
+    assert len(simulated.ListOfTrades("Symbol 1")["data"]) == 1
+    assert simulated.ListOfTrades("Symbol 1") == simulated.ListOfTrades("SYM1.")
+
+
+def test_lists_report_unknown_symbol(simulated):
+    assert simulated.ListOfTrades("x")["error"] == "unknown symbol 'x'"
+    assert simulated.ListOfOpenOrders("x")["error"] == "unknown symbol 'x'"
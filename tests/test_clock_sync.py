@@ -0,0 +1,29 @@
+import asyncio
+
+from dzg import ResponseCache
+
+
+def test_probe_bypasses_response_cache(mock, make_trade):
+    trade = make_trade(cache=ResponseCache(ttls={"ServerTime": 60.0}))
+    assert trade.ServerTime()["status_code"] == 200
+    assert trade.clock.sync(trade._time_probe) and trade.clock.sync(trade._time_probe)
+    assert mock.calls["time"] == 3 and trade.clock.samples == 2
+    trade.ServerTime()
+    assert mock.calls["time"] == 3  # обычный вызов по-прежнему из кэша
+
+
+def test_failed_probe_is_not_retried(mock, make_trade):
+    mock.errors = {"time": 1.0}
+    trade = make_trade()
+    assert not trade.clock.sync(trade._time_probe)
+    assert mock.calls["time"] == 1 and trade.clock.samples == 0
+
+
+def test_async_sync_clock_bypasses_response_cache(mock, make_async_trade):
+    async def run():
+        async with make_async_trade(cache=ResponseCache(ttls={"ServerTime": 60.0})) as trade:
+            await trade.ServerTime()
+            return await trade.SyncClock(), trade.clock.samples
+
+    assert asyncio.run(run()) == (True, 1)
+    assert mock.calls["time"] == 2
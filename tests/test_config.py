@@ -0,0 +1,34 @@
+import pytest
+
+from dzg import Config, Trade
+
+
+@pytest.fixture
+def env(monkeypatch):
+    monkeypatch.setenv("API_key", "env-key")
+    monkeypatch.setenv("secret_key", "env-secret")
+    monkeypatch.setenv("account_id", "7")
+    monkeypatch.setenv("url", "http://env.invalid/api/v2")
+    return monkeypatch
+
+
+def test_explicit_arguments_do_not_read_environment(env):
+    def from_env(*args, **kwargs):
+        raise AssertionError("Config.from_env must not be called")
+
+    env.setattr(Config, "from_env", from_env)
+    trade = Trade("key", "secret", "http://127.0.0.1:1/api/v2", clock_sync_interval=None, symbols_ttl=None)
+    assert (trade.api_key, trade.url, trade.account_id) == ("key", "http://127.0.0.1:1/api/v2", None)
+    trade.close()
+
+
+def test_missing_arguments_fall_back_to_environment(env):
+    trade = Trade("key", clock_sync_interval=None, symbols_ttl=None)
+    assert (trade.api_key, trade.secret_key, trade.account_id, trade.url) == ("key", "env-secret", "7", "http://env.invalid/api/v2")
+    trade.close()
+
+
+def test_explicit_config_wins(env):
+    trade = Trade(config=Config("key", "secret", "1", "http://127.0.0.1:1/api/v2"), clock_sync_interval=None, symbols_ttl=None)
+    assert (trade.api_key, trade.account_id) == ("key", "1")
+    trade.close()
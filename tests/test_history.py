@@ -0,0 +1,42 @@
+import csv
+
+import pytest
+
+from dzg import DzengiError, write_csv
+
+START_MS = 1_704_067_200_000  # 2024-01-01
+DAY_MS = 86_400_000
+
+
+def test_iter_trades_pages_without_gaps_or_repeats(make_trade):
+    trade = make_trade()
+    expected = trade.ListOfTrades("Symbol 1", START_MS, START_MS + 2 * DAY_MS - 1, limit=1000)["data"]
+    trades = list(trade.iter_trades("Symbol 1", START_MS, START_MS + 2 * DAY_MS - 1, limit=100))
+    assert len(trades) == 1000
+    assert [item["id"] for item in trades] == [item["id"] for item in expected]
+
+
+def test_iter_historical_positions_pages(make_trade):
+    trade = make_trade()
+    positions = list(trade.iter_historical_positions(START_MS, START_MS + DAY_MS - 1, "Symbol 1", limit=64))
+    times = [item["createdTimestamp"] for item in positions]
+    assert len(positions) == 500 and times == sorted(set(times))
+
+
+def test_iter_trades_raises_on_error(mock, make_trade):
+    mock.errors = {"myTrades": 1.0}
+    trade = make_trade()
+    with pytest.raises(DzengiError):
+        next(trade.iter_trades("Symbol 1", START_MS, START_MS + DAY_MS))
+
+
+def test_write_csv_splits_files(make_trade, tmp_path):
+    trade = make_trade()
+    records = trade.iter_trades("Symbol 1", START_MS, START_MS + DAY_MS - 1, limit=200)
+    paths = write_csv(records, str(tmp_path / "trades.csv"), fields=["id", "price", "time"], rows_per_file=200)
+    assert len(paths) == 3
+    rows = []
+    for path in paths:
+        with open(path, newline="", encoding="utf-8") as file:
+            rows += list(csv.DictReader(file))
+    assert len(rows) == 500 and list(rows[0]) == ["id", "price", "time"]
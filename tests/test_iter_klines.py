@@ -0,0 +1,34 @@
+import threading
+
+import pytest
+
+START_MS = 1_704_067_200_000  # 2024-01-01
+MINUTE_MS = 60_000
+
+
+@pytest.mark.parametrize("limit", [500, 1000, 2000])
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_iter_klines_returns_every_candle(make_trade, limit, concurrency):
+    trade = make_trade()
+    end = START_MS + 5000 * MINUTE_MS - 1
+    rows = list(trade.iter_klines("Symbol 1", "1m", START_MS, end, limit=limit, concurrency=concurrency))
+    times = [row[0] for row in rows]
+    assert times == list(range(START_MS, end, MINUTE_MS))
+
+
+def test_parallel_chunks_use_client_pool(make_trade):
+    trade = make_trade(pool_size=3)
+    threads = set()
+    trade.before_request.append(lambda name, params: threads.add(threading.current_thread().name))
+    list(trade.iter_klines("Symbol 1", "1m", START_MS, START_MS + 4000 * MINUTE_MS, limit=1000, concurrency=4))
+    assert threads and all(name.startswith("dzg_") for name in threads)
+    assert trade._executor is not None and len(threads) <= 3
+
+
+def test_iter_klines_raises_on_error(mock, make_trade):
+    from dzg import DzengiError
+
+    mock.errors = {"klines": 1.0}
+    trade = make_trade()
+    with pytest.raises(DzengiError):
+        list(trade.iter_klines("Symbol 1", "1m", START_MS, START_MS + 3000 * MINUTE_MS, concurrency=2))
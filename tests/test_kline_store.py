@@ -0,0 +1,36 @@
+import pytest
+
+np = pytest.importorskip("numpy")  # extra "numpy"
+
+from klines import KlineStore  # noqa: E402
+
+START_MS = 1_704_067_200_000  # 2024-01-01
+HOUR_MS = 3_600_000
+
+
+def test_cached_range_is_read_without_requests(mock, make_trade, tmp_path):
+    first = KlineStore(str(tmp_path)).klines(make_trade(), "Symbol 1", "1m", START_MS, START_MS + HOUR_MS - 1)
+    assert len(first) == 60
+    calls = dict(mock.calls)
+    again = KlineStore(str(tmp_path)).klines(make_trade(), "Symbol 1", "1m", START_MS, START_MS + HOUR_MS - 1)
+    assert dict(mock.calls) == calls
+    assert np.array_equal(again.open_time, first.open_time) and np.array_equal(again.close, first.close)
+
+
+def test_only_missing_tail_is_fetched(mock, make_trade, tmp_path):
+    store = KlineStore(str(tmp_path))
+    trade = make_trade()
+    store.klines(trade, "Symbol 1", "1m", START_MS, START_MS + HOUR_MS - 1)
+    requested = []
+    trade.before_request.append(lambda name, params: requested.append((params["start_time"], params["end_time"])))
+    frame = store.klines(trade, "Symbol 1", "1m", START_MS, START_MS + 2 * HOUR_MS - 1)
+    assert requested == [(START_MS + HOUR_MS, START_MS + 2 * HOUR_MS - 1)]
+    assert len(frame) == 120 and np.all(np.diff(frame.open_time) == 60_000)
+    assert store.bounds("SYM1.", "1m") == (START_MS, START_MS + 2 * HOUR_MS - 60_000)
+
+
+def test_unknown_symbol_raises(make_trade, tmp_path):
+    from dzg import DzengiError
+
+    with pytest.raises(DzengiError):
+        KlineStore(str(tmp_path)).klines(make_trade(), "nope", "1m", START_MS, START_MS + HOUR_MS)
@@ -0,0 +1,26 @@
+import models
+from models import Fill, ModelList, Order, SymbolInfo
+
+
+def test_list_items_become_models_on_access(mock, make_trade):
+    trade = make_trade(models=True)
+    trade.CreateOrder("Symbol 1", "BUY", "LIMIT", 0.1, price=100.0)
+    orders = trade.ListOfOpenOrders()["data"]
+    assert isinstance(orders, ModelList) and orders._converted == 0
+    order = orders[0]
+    assert isinstance(order, Order) and orders._converted == 1
+    assert order.price == 100.0 and order["orderId"] == order.order_id and order.get("missing", 1) == 1
+
+
+def test_parser_wraps_records_and_containers():
+    parse = models.parser(Fill)
+    fill = parse(b'{"id": "1", "orderId": "o", "price": "2.5", "qty": "4", "time": "5.0", "extra": 1}')
+    assert isinstance(fill, Fill) and fill.price == 2.5 and fill.time == 5
+    assert fill.to_dict() == {"id": "1", "orderId": "o", "price": 2.5, "qty": 4.0, "time": 5}
+    wrapped = models.parser(SymbolInfo)(b'{"timezone": "UTC", "symbols": [{"symbol": "A", "takerFee": "0.2"}]}')
+    assert wrapped["timezone"] == "UTC" and wrapped["symbols"][0].taker_fee == 0.2
+
+
+def test_rules_read_fee_from_models(mock, make_trade):
+    plain, typed = make_trade(), make_trade(models=True)
+    assert typed.symbols.rules("Symbol 2").fee == plain.symbols.rules("Symbol 2").fee == 0.002
@@ -0,0 +1,41 @@
+from dzg import LocalOrderBook
+
+
+def _book() -> LocalOrderBook:
+    book = LocalOrderBook("SYM1.")
+    book.apply_snapshot({"bids": [["99.0", "1"], ["98.5", "2"], ["98.0", "3"]], "asks": [["100.0", "1"], ["101.0", "4"]]})
+    return book
+
+
+def test_queries_read_sorted_levels():
+    book = _book()
+    assert book.best_bid() == (99.0, 1.0) and book.best_ask() == (100.0, 1.0)
+    assert book.mid() == 99.5 and book.spread() == 1.0 and len(book) == 5
+    assert book.levels("bids", 2) == [(99.0, 1.0), (98.5, 2.0)]
+    assert book.cumulative_volume("bids", price=98.5) == 3.0
+    assert book.cumulative_volume("asks", count=2) == 5.0 and book.depth_at(101.0) == 4.0
+
+
+def test_snapshot_touches_only_changed_levels():
+    book = _book()
+    assert book.apply_snapshot({"bids": [["99.0", "1"], ["98.5", "5"], ["98.0", "3"]], "asks": [["100.0", "1"], ["101.0", "4"]]}) == 1
+    assert book.apply_snapshot({"bids": [["99.5", "1"], ["98.5", "5"]], "asks": [["100.0", "1"], ["101.0", "4"]]}) == 3
+    assert book.levels("bids") == [(99.5, 1.0), (98.5, 5.0)]
+    assert book.apply_snapshot({"bids": [["99.5", "1"], ["98.5", "5"]], "asks": [["100.0", "1"], ["101.0", "4"]]}) == 0
+
+
+def test_updates_insert_and_remove_levels():
+    book = _book()
+    book.apply_updates(bids=[["99.2", "7"], ["99.0", "0"]], asks=[["99.8", "2"]])
+    assert book.best_bid() == (99.2, 7.0) and book.best_ask() == (99.8, 2.0)
+    assert book.levels("bids") == [(99.2, 7.0), (98.5, 2.0), (98.0, 3.0)]
+    book.apply_updates(bids=[["97.0", "0"]])  # удаление отсутствующего уровня ничего не меняет
+    assert len(book) == 6
+
+
+def test_order_book_is_synced_from_depth(mock, make_trade):
+    trade = make_trade()
+    book = trade.order_book("Symbol 1")
+    assert len(book.levels("bids")) == len(book.levels("asks")) == mock.depth
+    assert book.best_bid()[0] < book.best_ask()[0]
+    assert trade.order_book("Symbol 1", book) is book
@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from dzg import OrderTracker
+
+
+@pytest.fixture
+def trade(make_trade):
+    trade = make_trade()
+    # опрос вручную через poll, без фонового потока
+    trade.order_tracker = OrderTracker(trade._call_many, trade.rate_limiter.weight)
+    return trade
+
+
+def _events(tracker) -> list:
+    events = []
+    for event in OrderTracker.EVENTS:
+        tracker.on(event, lambda event, record: events.append((event, record)))
+    return events
+
+
+def test_limit_fill_is_detected_by_poll(mock, trade):
+    tracker = trade.order_tracker
+    events = _events(tracker)
+    order = trade.CreateOrder("Symbol 1", "BUY", "LIMIT", 0.1, price=100.0)["data"]
+    assert tracker.poll() == [] and tracker.active
+    mock.fill(order["orderId"])
+    tracker.poll()
+    [(event, record)] = events
+    assert event == "fill" and record["status"] == "FILLED" and record["avgPrice"] == 100.0
+    assert tracker.wait(order["orderId"], timeout=0)["status"] == "FILLED"
+    assert not tracker.active
+
+
+def test_cancel_is_reported_from_acknowledgement(mock, trade):
+    events = _events(trade.order_tracker)
+    order = trade.CreateOrder("Symbol 1", "BUY", "LIMIT", 0.1, price=100.0)["data"]
+    trade.CancelOrder(order["orderId"], "Symbol 1")
+    assert [event for event, _ in events] == ["cancel"]
+    assert not trade.order_tracker.active
+
+
+def test_stop_loss_is_resolved_after_position_closes(mock, trade):
+    tracker = trade.order_tracker
+    events = _events(tracker)
+    order = trade.CreateOrder("Symbol 1", "BUY", "LIMIT", 0.1, price=100.0, stop_loss=90.0, take_profit=120.0)["data"]
+    mock.fill(order["orderId"])
+    tracker.poll()
+    [position] = mock.positions.values()
+    assert tracker.positions[order["orderId"]]["id"] == position["id"]
+    mock.close_position(position["id"], price=89.5)
+    tracker.poll()
+    assert [event for event, _ in events] == ["fill", "stop_loss"]
+    assert events[-1][1]["orderId"] == order["orderId"]
+    assert not tracker.active
+
+
+def test_position_opened_and_closed_between_polls_is_resolved(mock, trade):
+    tracker = trade.order_tracker
+    events = _events(tracker)
+    order = trade.CreateOrder("Symbol 1", "SELL", "MARKET", 0.1, take_profit=50.0)["data"]
+    [position] = mock.positions.values()
+    mock.close_position(position["id"], price=49.0)
+    tracker.poll()
+    assert [event for event, _ in events] == ["fill", "take_profit"]
+    assert events[-1][1]["id"] == position["id"]
+    assert not tracker.active
+
+
+def test_unresolved_position_stops_polling(mock, trade):
+    tracker = trade.order_tracker
+    trade.CreateOrder("Symbol 1", "BUY", "MARKET", 0.1, stop_loss=50.0)
+    mock.positions.clear()  # позиция исчезла, но в истории её нет
+    for _ in range(OrderTracker.MAX_MISSES):
+        assert tracker.active
+        tracker.poll()
+    assert not tracker.active
+    calls = mock.calls["tradingPositions"]
+    assert tracker.poll() == [] and mock.calls["tradingPositions"] == calls
+
+
+def test_callback_error_does_not_fail_create_order(mock, trade, caplog):
+    trade.order_tracker.on("fill", lambda event, order: order["missing"])
+    result = trade.CreateOrder("Symbol 1", "BUY", "MARKET", 0.1)
+    assert result["status_code"] == 200
+    assert "OrderTracker callback for 'fill' failed" in caplog.text
+
+
+def test_background_tracking_waits_for_fill(mock, make_trade):
+    trade = make_trade()
+    tracker = trade.track_orders(fast=0.01, slow=0.05)
+    order = trade.CreateOrder("Symbol 1", "BUY", "LIMIT", 0.1, price=100.0)["data"]
+    mock.fill(order["orderId"])
+    assert tracker.wait(order["orderId"], timeout=5)["status"] == "FILLED"
+
+
+def test_fill_beyond_first_trades_page_is_found(mock, trade):
+    tracker = trade.order_tracker
+    events = _events(tracker)
+    order = trade.CreateOrder("Symbol 1", "BUY", "LIMIT", 0.1, price=100.0)["data"]
+    tracker.poll()
+    # до сделки по ордеру - больше страницы /myTrades других сделок
+    at = tracker.orders[order["orderId"]]["transactTime"] = order["transactTime"] - OrderTracker.PAGE
+    mock.fills.extend(
+        {"symbol": "SYM1.", "id": f"other-{i}", "orderId": "other", "price": "1", "qty": "1", "time": at + i // 2}
+        for i in range(OrderTracker.PAGE + 5)
+    )
+    mock.fill(order["orderId"])
+    tracker.poll()
+    assert [event for event, _ in events] == ["fill"]
+    assert mock.calls["myTrades"] >= 2
+
+
+def test_async_poll_detects_fill(mock, make_async_trade):
+    async def run():
+        async with make_async_trade() as trade:
+            tracker = await trade.track_orders(fast=60.0, slow=60.0)  # опрос вручную через PollOrders
+            order = (await trade.CreateOrder("Symbol 1", "BUY", "LIMIT", 0.1, price=100.0))["data"]
+            assert await trade.PollOrders() == []
+            mock.fill(order["orderId"])
+            [(event, record)] = await trade.PollOrders()
+            return event, record, tracker.active
+
+    event, record, active = asyncio.run(run())
+    assert event == "fill" and record["status"] == "FILLED" and not active
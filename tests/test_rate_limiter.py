@@ -0,0 +1,28 @@
+from dzg import RateLimiter
+
+
+def _limits(weight: int) -> list:
+    return [{"rateLimitType": "REQUEST_WEIGHT", "interval": "MINUTE", "intervalNum": 1, "limit": weight}]
+
+
+def test_reconfigure_keeps_consumed_tokens():
+    limiter = RateLimiter(_limits(1200))
+    limiter.acquire("account")  # вес 5
+    limiter.configure(_limits(1_000_000))
+    [(_, bucket)] = limiter._buckets
+    assert 1_000_000 - 6 < bucket.tokens <= 1_000_000 - 5
+
+
+def test_larger_limit_does_not_delay_low_priority_requests():
+    limiter = RateLimiter(_limits(1200))
+    limiter.configure(_limits(1_000_000))
+    assert limiter.acquire("depth") == 0.0
+
+
+def test_smaller_limit_is_not_exceeded():
+    limiter = RateLimiter(_limits(1200))
+    for _ in range(10):
+        limiter.acquire("account")
+    limiter.configure(_limits(40))
+    [(_, bucket)] = limiter._buckets
+    assert bucket.tokens == 0.0
@@ -0,0 +1,56 @@
+import threading
+
+from dzg import ENDPOINTS, ResponseCache
+
+
+def test_callers_cannot_mutate_cached_response(mock, make_trade):
+    trade = make_trade()
+    first = trade.PriceChange("Symbol 1")
+    first["data"]["lastPrice"] = "MUTATED"
+    second = trade.PriceChange("Symbol 1")
+    assert second["data"]["lastPrice"] != "MUTATED" and mock.calls["ticker/24hr"] == 1
+    second["data"]["lastPrice"] = "AGAIN"
+    assert trade.PriceChange("Symbol 1")["data"]["lastPrice"] not in ("MUTATED", "AGAIN")
+
+
+def test_models_are_copied(make_trade):
+    trade = make_trade(models=True)
+    first = trade.PriceChange("Symbol 1")["data"]
+    second = trade.PriceChange("Symbol 1")["data"]
+    assert first == second and first is not second
+
+
+def test_coalesced_waiters_get_own_copies():
+    cache = ResponseCache()
+    release = threading.Event()
+    results = []
+
+    def request():
+        release.wait(5)
+        return {"status_code": 200, "data": {"items": [1]}}
+
+    threads = [threading.Thread(target=lambda: results.append(cache.fetch("key", 1.0, request, "OrderBook"))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len({id(result["data"]) for result in results}) == 3
+    assert cache.coalesced + cache.hits == 2
+
+
+def test_account_endpoints_are_cached_per_key(mock, make_trade):
+    cache = ResponseCache(ttls={"AccountInfo": 10.0})
+    first, second = make_trade(cache=cache), make_trade(cache=cache)
+    second.api_key = "other"
+    first.AccountInfo(), second.AccountInfo(), first.AccountInfo()
+    assert mock.calls["account"] == 2
+
+
+def test_market_data_is_shared_between_keys(mock, make_trade):
+    cache = ResponseCache()
+    first, second = make_trade(cache=cache), make_trade(cache=cache)
+    second.api_key = "other"
+    first.OrderBook("Symbol 1"), second.OrderBook("Symbol 1")
+    assert mock.calls["depth"] == 1
+    assert ENDPOINTS["OrderBook"].public and not ENDPOINTS["AccountInfo"].public
@@ -0,0 +1,62 @@
+import socket
+
+import pytest
+
+
+def test_disconnect_after_send_is_not_retried_for_create_order(mock, make_trade):
+    mock.disconnects = {"order": 1.0}
+    trade = make_trade()
+    result = trade.CreateOrder("Symbol 1", "BUY", "LIMIT", 0.1, price=100.0)
+    assert result["status_code"] is None and "error" in result
+    assert mock.calls["order"] == 1
+    assert len(mock.orders) == 1  # сервер принял ордер, повтор создал бы второй
+
+
+def test_disconnect_is_retried_with_idempotency_key(mock, make_trade):
+    mock.disconnects = {"order": 1.0}
+    trade = make_trade()
+    trade.CreateOrder("Symbol 1", "BUY", "LIMIT", 0.1, price=100.0, client_order_id="client-1")
+    assert mock.calls["order"] == 3
+
+
+def test_disconnect_is_retried_for_idempotent_endpoint(mock, make_trade):
+    mock.disconnects = {"account": 1.0}
+    trade = make_trade()
+    assert "error" in trade.AccountInfo()
+    assert mock.calls["account"] == 3
+
+
+def test_server_error_is_not_retried_for_create_order(mock, make_trade):
+    mock.errors = {"order": 1.0}
+    trade = make_trade()
+    assert trade.CreateOrder("Symbol 1", "BUY", "LIMIT", 0.1, price=100.0)["status_code"] == 503
+    assert mock.calls["order"] == 1
+
+
+def test_server_error_is_retried_until_success(mock, make_trade):
+    mock.errors = {"account": 1.0}
+    trade = make_trade()
+    trade.after_request.append(lambda name, params, result, info: info["attempt"] == 1 and mock.errors.clear())
+    assert trade.AccountInfo()["status_code"] == 200
+    assert mock.calls["account"] == 3
+
+
+def test_refused_connection_is_retried_for_create_order(mock, make_trade):
+    trade = make_trade()
+    trade.GetSymbol("Symbol 1")  # кэш символов загружен до смены адреса
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]  # после закрытия на порту никто не слушает
+    trade.url = f"http://127.0.0.1:{port}/api/v2"
+    attempts = []
+    trade.before_request.append(lambda name, params: attempts.append(name))
+    assert "error" in trade.CreateOrder("Symbol 1", "BUY", "LIMIT", 0.1, price=100.0)
+    assert attempts == ["CreateOrder"] * 3
+
+
+@pytest.mark.parametrize("models", [False, True])
+def test_non_json_body_is_an_error(mock, make_trade, models):
+    mock._any_ticker_24hr = lambda query: b"<html>bad gateway</html>"
+    result = make_trade(models=models).PriceChange("Symbol 1")
+    assert result["status_code"] == 200 and result["error"].startswith("Invalid JSON")
+    assert mock.calls["ticker/24hr"] == 3  # GET идемпотентен - повторы по retry_policy
@@ -0,0 +1,44 @@
+import asyncio
+
+SYMBOLS = ["Symbol 1", "Symbol 2", "Symbol 3"]
+
+
+def test_snapshot_collects_every_section(mock, make_trade):
+    trade = make_trade()
+    result = trade.snapshot(SYMBOLS, interval="1m", limit=5)
+    assert sorted(result) == SYMBOLS
+    for name in SYMBOLS:
+        section = result[name]
+        assert section["errors"] == {}
+        assert section["ticker"]["symbol"] == trade.GetSymbol(name)
+        assert len(section["depth"]["bids"]) == mock.depth and len(section["klines"]) == 5
+    assert mock.calls["ticker/24hr"] == mock.calls["depth"] == mock.calls["klines"] == 3
+
+
+def test_tickers_use_one_request_when_cheaper(mock, make_trade):
+    trade = make_trade()
+    trade.rate_limiter.weight = lambda path, query="": 1  # /ticker/24hr по всем символам - как один символ
+    result = trade.snapshot(SYMBOLS, include=("ticker",))
+    assert mock.calls["ticker/24hr"] == 1
+    assert [result[name]["ticker"]["symbol"] for name in SYMBOLS] == ["SYM1.", "SYM2.", "SYM3."]
+
+
+def test_errors_are_reported_per_symbol_and_section(mock, make_trade):
+    mock.errors = {"depth": 1.0}
+    trade = make_trade(retry_policy=None)
+    result = trade.snapshot(["Symbol 1", "Unknown"], include=("ticker", "depth"))
+    assert result["Symbol 1"]["ticker"]["symbol"] == "SYM1."
+    assert result["Symbol 1"]["errors"]["depth"]["status_code"] == 503
+    assert list(result["Unknown"]["errors"]) == ["symbol"] and "ticker" not in result["Unknown"]
+
+
+def test_async_snapshot_matches_sync(mock, make_trade, make_async_trade):
+    async def run():
+        async with make_async_trade() as trade:
+            return await trade.snapshot(SYMBOLS, include=("ticker", "depth"))
+
+    result, expected = asyncio.run(run()), make_trade().snapshot(SYMBOLS, include=("ticker", "depth"))
+    for name in SYMBOLS:  # цены mock зависят от времени - сравнивается состав ответа
+        assert result[name].keys() == expected[name].keys() and result[name]["errors"] == {}
+        assert result[name]["ticker"]["symbol"] == expected[name]["ticker"]["symbol"]
+        assert len(result[name]["depth"]["asks"]) == len(expected[name]["depth"]["asks"])
@@ -0,0 +1,23 @@
+def test_refresh_symbols_reaches_server_despite_cache(mock, make_trade):
+    trade = make_trade()
+    assert isinstance(trade.GetSymbol("Symbol 1"), str)
+    mock.symbols.append(mock._symbol(99))
+    calls = mock.calls["exchangeInfo"]
+    assert trade.RefreshSymbols()
+    assert mock.calls["exchangeInfo"] == calls + 1
+    assert trade.GetSymbol("Symbol 99") == "SYM99."
+
+
+def test_exchange_info_is_served_from_cache(mock, make_trade):
+    trade = make_trade()
+    trade.ExchangeInfo()
+    calls = mock.calls["exchangeInfo"]
+    trade.ExchangeInfo()
+    assert mock.calls["exchangeInfo"] == calls
+
+
+def test_unknown_symbol_error(mock, make_trade):
+    trade = make_trade()
+    assert trade.GetSymbol("x") == {"error": "unknown symbol 'x'"}
+    result = trade.Klines("x", "1m")
+    assert result["error"] == "unknown symbol 'x'" and mock.calls["klines"] == 0
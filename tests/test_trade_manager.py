@@ -0,0 +1,64 @@
+import pytest
+
+from dzg import Config, RetryPolicy, TradeManager
+
+
+@pytest.fixture
+def make_manager(mock):
+    managers = []
+
+    def make(accounts, **options):
+        options.setdefault("clock_sync_interval", None)
+        options.setdefault("symbols_ttl", None)
+        options.setdefault("retry_policy", RetryPolicy(attempts=3, base_delay=0.0))
+        manager = TradeManager(accounts, **options)
+        managers.append(manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        manager.close()
+
+
+@pytest.fixture
+def no_env(monkeypatch):
+    def from_env(*args, **kwargs):
+        raise AssertionError("Config.from_env must not be called")
+
+    monkeypatch.setattr(Config, "from_env", from_env)
+
+
+def _accounts(mock) -> dict:
+    return {
+        "first": {"api_key": "key-1", "secret_key": "secret", "account_id": "1", "url": mock.url},
+        "second": Config(api_key="key-2", secret_key="secret", account_id="2", url=mock.url),
+    }
+
+
+def test_url_is_taken_from_account_config(mock, make_manager, no_env):
+    manager = make_manager(_accounts(mock))
+    assert manager.url == mock.url and manager["first"].url == mock.url
+    assert {name: result["status_code"] for name, result in manager.account_info().items()} == {"first": 200, "second": 200}
+
+
+def test_symbols_load_without_accounts(mock, make_manager, no_env):
+    manager = make_manager({}, url=mock.url)
+    assert manager.symbols.symbol("Symbol 2") == "SYM2."
+    manager.add("late", Config(api_key="key", secret_key="secret", url=mock.url))
+    assert manager["late"].symbols is manager.symbols and mock.calls["exchangeInfo"] == 1
+
+
+@pytest.mark.parametrize("models", [False, True])
+def test_clients_share_symbols_and_rules(mock, make_manager, models):
+    manager = make_manager(_accounts(mock), models=models)
+    assert manager.symbols.rules("Symbol 2").fee == 0.002
+    assert manager["first"].GetSymbol("Symbol 2") == manager["second"].GetSymbol("Symbol 2") == "SYM2."
+    assert mock.calls["exchangeInfo"] == 1
+
+
+def test_cancel_all_runs_for_every_account(mock, make_manager):
+    manager = make_manager(_accounts(mock))
+    for name in manager:
+        manager[name].CreateOrder("Symbol 1", "BUY", "LIMIT", 0.1, price=100.0)
+    results = manager.cancel_all()
+    assert sorted(results) == ["first", "second"] and not mock.orders